@@ -40,6 +40,9 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 CITIES_LIGHT_INCLUDE_COUNTRIES = ['EC']
+# Snapshot en memoria de Cities Light: segundos entre reconstrucciones y max-age HTTP de los selects
+GEO_SNAPSHOT_TTL = 600
+GEO_CACHE_MAX_AGE = 86400
 
 # REST FRAMEWORK
 REST_FRAMEWORK = {
@@ -53,15 +56,37 @@ import sys
 sys.path.insert(0, os.path.join(BASE_DIR, 'apps'))
 
 MIDDLEWARE = [
+    'apps.core.middleware.sql_metrics.SQLMetricsMiddleware',
+    'apps.core.middleware.replicas.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.core.middleware.tenant.TenantMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Multi-tenant: dominio base para resolver la compañía por subdominio (acme.<dominio>)
+TENANT_BASE_DOMAIN = config('TENANT_BASE_DOMAIN', default='')
+TENANT_CACHE_ALIAS = config('TENANT_CACHE_ALIAS', default='default')
+TENANT_CACHE_TTL = config('TENANT_CACHE_TTL', default=300, cast=int)
+TENANT_CACHE_NEGATIVE_TTL = config('TENANT_CACHE_NEGATIVE_TTL', default=30, cast=int)
+
+# Caché de Django. Por defecto en memoria de cada proceso; con varios workers use un
+# backend compartido para que las invalidaciones (p. ej. de tenants) lleguen a todos
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
+# Métricas de SQL por solicitud (Server-Timing y log JSON); desactivado por defecto
+SQL_METRICS_ENABLED = config('SQL_METRICS_ENABLED', default=False, cast=bool)
+SQL_METRICS_N_PLUS_ONE_THRESHOLD = config('SQL_METRICS_N_PLUS_ONE_THRESHOLD', default=5, cast=int)
+
 ROOT_URLCONF = 'FleetHub.urls'
 
 TEMPLATES = [
@@ -94,6 +119,23 @@ DATABASES = {
     }
 }
 
+# Réplicas de lectura (host o host:puerto, separados por coma), con las mismas credenciales.
+# Las solicitudes GET/HEAD/OPTIONS leen de una réplica; un cliente que escribe lee de la
+# base principal durante REPLICA_PIN_SECONDS. En pruebas las réplicas apuntan a 'default'.
+DATABASE_REPLICAS = []
+for number, replica in enumerate(filter(None, config('DATABASE_REPLICA_HOSTS', default='').split(',')), start=1):
+    host, _, port = replica.strip().partition(':')
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{number}')
+
+DATABASE_ROUTERS = ['apps.core.db_router.ReplicaRouter'] if DATABASE_REPLICAS else []
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
+
+    def ready(self):
+        # Registrar los receptores de señales del core
+        from apps.core import signals  # noqa: F401
+        from apps.core.utils.vehicle_search import ensure_vehicle_search_indexes
+
+        # Índice GIN de trigramas para la búsqueda de vehículos (solo PostgreSQL)
+        post_migrate.connect(ensure_vehicle_search_indexes, sender=self)
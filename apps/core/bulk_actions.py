@@ -0,0 +1,78 @@
+from django.db import transaction
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+# Máximo de ids por solicitud
+BULK_MAX_ITEMS = 10000
+
+
+class BulkIdsSerializer(serializers.Serializer):
+    """Lista opcional de ids; sin ella se usan los filtros del listado."""
+
+    ids = serializers.ListField(
+        child=serializers.UUIDField(), required=False, allow_empty=False, max_length=BULK_MAX_ITEMS
+    )
+
+
+class BulkSoftDeleteMixin:
+    """Eliminación lógica y restauración masivas (``bulk_soft_delete`` y ``bulk_restore``).
+
+    Los registros se indican con ``ids`` en el cuerpo o con los filtros del
+    listado (``bulk_filter_params``); se exige al menos uno de los dos para no
+    afectar todos los registros por error. El cambio es un solo UPDATE dentro
+    de una transacción.
+    """
+
+    # Parámetros de listado que permiten seleccionar registros sin ``ids``
+    bulk_filter_params = ()
+
+    def get_bulk_targets(self, ids, is_active=True):
+        """Registros con ``is_active`` indicados por ``ids`` o por los filtros del listado.
+
+        Devuelve ``None`` si la solicitud no trae ids ni filtros.
+        """
+        if not ids and not any(self.request.query_params.get(param) for param in self.bulk_filter_params):
+            return None
+
+        # get_queryset aplica los filtros (y la compañía del subdominio) sobre este queryset base
+        self.queryset = self.queryset.model.all_objects.filter(is_active=is_active)
+        queryset = self.get_queryset().order_by()
+        if ids:
+            queryset = queryset.filter(pk__in=ids)
+        return queryset
+
+    def perform_bulk_set_active(self, queryset, is_active, user):
+        """Aplicar el cambio. Las subclases invalidan aquí sus cachés (no hay señales)."""
+        return queryset.restore(user) if is_active else queryset.soft_delete(user)
+
+    def bulk_set_active(self, request, is_active):
+        serializer = BulkIdsSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.get_bulk_targets(serializer.validated_data.get('ids'), is_active=not is_active)
+        if queryset is None:
+            return Response(
+                {'error': 'Se requiere una lista de ids o al menos un filtro.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        user = request.user if hasattr(request, 'user') and request.user.is_authenticated else None
+        with transaction.atomic():
+            updated = self.perform_bulk_set_active(queryset, is_active, user)
+
+        return Response({
+            'message': f'{updated} registros {"restaurados" if is_active else "desactivados"} exitosamente.',
+            'updated': updated
+        })
+
+    @action(detail=False, methods=['post'])
+    def bulk_soft_delete(self, request):
+        """Eliminación lógica masiva."""
+        return self.bulk_set_active(request, is_active=False)
+
+    @action(detail=False, methods=['post'])
+    def bulk_restore(self, request):
+        """Restauración masiva de registros eliminados lógicamente."""
+        return self.bulk_set_active(request, is_active=True)
@@ -0,0 +1,106 @@
+import hashlib
+from datetime import datetime, time as dt_time
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class ConditionalGetMixin:
+    """GET condicional (ETag / Last-Modified) para ``list`` y ``retrieve``.
+
+    Los validadores salen de una sola consulta de agregación sobre el queryset
+    filtrado: ``updated_at`` del registro en el detalle y ``MAX(updated_at)`` más
+    ``COUNT(*)`` en los listados. Si coinciden con ``If-None-Match`` o
+    ``If-Modified-Since`` se responde 304 sin cargar ni serializar los registros.
+
+    Los listados solo usan ETag: cuando un registro sale del listado (eliminación
+    lógica o deja de cumplir un filtro) ``MAX(updated_at)`` no aumenta, por lo
+    que Last-Modified no lo detectaría; el ETag sí, porque incluye la cantidad.
+    """
+
+    # Campos ``updated_at`` de relaciones que forman parte de la respuesta
+    conditional_related_fields = ()
+    # Los campos calculados respecto a la fecha actual cambian a medianoche
+    conditional_depends_on_date = False
+
+    def get_conditional_validators(self, queryset, many):
+        """Devuelve ``(etag, last_modified)`` o ``None`` si no hay registros.
+
+        En los listados ``last_modified`` es siempre ``None``.
+        """
+        aggregates = {'count': Count('pk'), 'updated_at': Max('updated_at')}
+        for index, field in enumerate(self.conditional_related_fields):
+            aggregates[f'related_{index}'] = Max(field)
+
+        values = queryset.order_by().aggregate(**aggregates)
+        if not many and not values['count']:
+            return None
+
+        timestamps = [value for key, value in values.items() if key != 'count' and value is not None]
+        parts = [
+            self.request.get_full_path() if many else self.request.path,
+            self.request.get_host(),
+            self.get_serializer_class().__name__,
+            self.request.accepted_media_type or '',
+            str(values['count']),
+        ]
+        parts.extend(value.isoformat() for value in timestamps)
+
+        if self.conditional_depends_on_date:
+            today = timezone.localdate()
+            parts.append(today.isoformat())
+            timestamps.append(timezone.make_aware(datetime.combine(today, dt_time.min)))
+
+        etag = quote_etag(hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:32])
+        last_modified = int(max(timestamps).timestamp()) if timestamps and not many else None
+        return etag, last_modified
+
+    def is_not_modified(self, etag, last_modified):
+        if_none_match = self.request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            etags = parse_etags(if_none_match)
+            return '*' in etags or etag in etags or f'W/{etag}' in etags
+
+        if_modified_since = parse_http_date_safe(self.request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        return bool(if_modified_since and last_modified and last_modified <= if_modified_since)
+
+    def conditional_headers(self, etag, last_modified):
+        # Los clientes pueden guardar la respuesta pero deben revalidarla siempre
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+        if last_modified:
+            headers['Last-Modified'] = http_date(last_modified)
+        return headers
+
+    def conditional_response(self, validators, handler, *args, **kwargs):
+        if validators is None:
+            return handler(self.request, *args, **kwargs)
+
+        headers = self.conditional_headers(*validators)
+        if self.is_not_modified(*validators):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        response = handler(self.request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            for header, value in headers.items():
+                response[header] = value
+        return response
+
+    def list(self, request, *args, **kwargs):
+        validators = self.get_conditional_validators(self.filter_queryset(self.get_queryset()), many=True)
+        return self.conditional_response(validators, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: kwargs[lookup_url_kwarg]}
+            )
+            validators = self.get_conditional_validators(queryset, many=False)
+        except (TypeError, ValueError, ValidationError):
+            # Identificador inválido: retrieve responde 404 como siempre
+            validators = None
+        return self.conditional_response(validators, super().retrieve, *args, **kwargs)
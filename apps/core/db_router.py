@@ -0,0 +1,71 @@
+"""Enrutamiento de lecturas a réplicas de la base de datos.
+
+``ReplicaRouter`` envía las lecturas a una réplica solo dentro de una solicitud
+marcada como de lectura por ``ReplicaRoutingMiddleware`` (métodos seguros de
+un cliente que no escribió recientemente). Todo lo demás (escrituras,
+comandos de gestión, tareas, transacciones abiertas) usa ``default``.
+
+El estado de cada solicitud vive en una ``ContextVar``, igual que las métricas
+de SQL: funciona con vistas síncronas y async y no se comparte entre hilos.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_state = ContextVar('replica_routing', default=None)
+
+
+class RoutingState:
+    """Réplica asignada a la solicitud y si la solicitud ya escribió en la base principal."""
+
+    __slots__ = ('replica', 'wrote')
+
+    def __init__(self, replica=None):
+        self.replica = replica
+        self.wrote = False
+
+
+def choose_replica():
+    """Réplica para una solicitud de lectura (``None`` si no hay réplicas configuradas)."""
+    replicas = getattr(settings, 'DATABASE_REPLICAS', ())
+    return random.choice(replicas) if replicas else None
+
+
+def begin_request(replica):
+    """Asignar ``replica`` (o ``None`` para usar la base principal) a la solicitud en curso."""
+    state = RoutingState(replica)
+    return state, _state.set(state)
+
+
+def end_request(token):
+    _state.reset(token)
+
+
+class ReplicaRouter:
+    """Lecturas a la réplica de la solicitud; escrituras y migraciones a ``default``."""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.replica is None or state.wrote:
+            return DEFAULT_DB_ALIAS
+        # Dentro de una transacción se lee de la base principal (bloqueos y datos propios)
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            # Lecturas posteriores de la misma solicitud ven lo escrito
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Las réplicas contienen los mismos datos que la base principal
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Las réplicas reciben el esquema por replicación
+        return db == DEFAULT_DB_ALIAS
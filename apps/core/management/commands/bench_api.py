@@ -0,0 +1,478 @@
+import json
+import random
+import statistics
+import time
+import uuid
+from collections import Counter, namedtuple
+from datetime import timedelta
+from urllib.parse import quote
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.core.management.commands.bench_concurrency import percentile
+from apps.core.models import Address, Company, Vehicle
+from apps.core.views.views_address import AddressViewSet
+from apps.core.views.views_company import CompanyViewSet
+from apps.core.views.views_vehicle import VehicleViewSet
+
+# Acción medida: ``path`` y ``data`` reciben el número de ejecución (0, 1, ...)
+Scenario = namedtuple('Scenario', 'viewset action label method path data')
+
+VIEWSETS = {'companies': CompanyViewSet, 'vehicles': VehicleViewSet, 'addresses': AddressViewSet}
+STANDARD_ACTIONS = ('list', 'create', 'retrieve', 'update', 'partial_update', 'destroy')
+
+BRANDS = ('Bajaj', 'Honda', 'Mahindra', 'Piaggio', 'TVS')
+COLORS = ('Rojo', 'Azul', 'Amarillo', 'Verde', 'Negro')
+# Vehículos por lote en las acciones masivas
+BULK_SIZE = 20
+
+
+class Command(BaseCommand):
+    help = ('Benchmark en proceso de las acciones de CompanyViewSet, VehicleViewSet y AddressViewSet '
+            '(latencia p50/p95/p99 y consultas por acción)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=3, help='Compañías generadas (por defecto: 3)')
+        parser.add_argument('--vehicles', type=int, default=200, help='Vehículos por compañía (por defecto: 200)')
+        parser.add_argument('--addresses', type=int, default=1, help='Direcciones por vehículo (por defecto: 1)')
+        parser.add_argument('--iterations', type=int, default=30, help='Mediciones por acción (por defecto: 30)')
+        parser.add_argument('--warmup', type=int, default=3, help='Ejecuciones previas sin medir (por defecto: 3)')
+        parser.add_argument('--seed', type=int, default=42, help='Semilla de los datos generados (por defecto: 42)')
+        parser.add_argument(
+            '--only',
+            action='append',
+            help='Medir solo las acciones cuya etiqueta contenga este texto (repetible), p. ej. vehicles.list',
+        )
+        parser.add_argument('--output', type=str, help='Guardar los resultados en este archivo JSON')
+        parser.add_argument('--compare', type=str, help='Resultados JSON de referencia; falla si hay regresiones')
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.5,
+            help='Aumento relativo de p50 tolerado al comparar (por defecto: 0.5 = 50%%)',
+        )
+        parser.add_argument(
+            '--min-delta-ms',
+            type=float,
+            default=2.0,
+            help='Diferencia de p50 (ms) por debajo de la cual no se considera regresión (por defecto: 2.0)',
+        )
+        parser.add_argument(
+            '--allow-drift',
+            action='store_true',
+            help='No fallar si todas las acciones son más lentas por igual (máquinas con carga variable)',
+        )
+
+    def handle(self, *args, **options):
+        if min(options['companies'], options['vehicles'], options['iterations']) < 1 or options['addresses'] < 0:
+            raise CommandError('--companies, --vehicles e --iterations deben ser mayores que cero.')
+        if options['vehicles'] > 9000:
+            raise CommandError('Se permiten como máximo 9000 vehículos por compañía.')
+
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'No se pudo leer {options["compare"]}: {e}')
+
+        runs = options['warmup'] + options['iterations']
+
+        # Datos y cambios dentro de una transacción que se revierte al terminar
+        with override_settings(ALLOWED_HOSTS=['testserver'], DEBUG=False), transaction.atomic():
+            self.stdout.write(
+                f'📋 Generando {options["companies"]} compañías × {options["vehicles"]} vehículos × '
+                f'{options["addresses"]} direcciones...'
+            )
+            data = self.build_dataset(options, runs)
+            scenarios = self.scenarios(data)
+            self.report_uncovered(scenarios)
+
+            if options['only']:
+                scenarios = [s for s in scenarios if any(text in s.label for text in options['only'])]
+
+            self.stdout.write(f'📋 Midiendo {len(scenarios)} acciones ({options["iterations"]} mediciones cada una)...')
+            client = APIClient()
+            client.force_authenticate(user=data['user'])
+            results = {
+                scenario.label: self.measure(client, scenario, options['warmup'], options['iterations'])
+                for scenario in scenarios
+            }
+            transaction.set_rollback(True)
+
+        self.print_results(results)
+
+        output = {
+            'meta': {
+                'database': connection.vendor,
+                'companies': options['companies'],
+                'vehicles': options['vehicles'],
+                'addresses': options['addresses'],
+                'iterations': options['iterations'],
+                'created_at': timezone.now().isoformat(),
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(output, f, indent=2, sort_keys=True)
+            self.stdout.write(f'✅ Resultados guardados en {options["output"]}')
+
+        failed = [label for label, result in results.items() if result['errors']]
+        for label in failed:
+            self.stdout.write(self.style.WARNING(f'⚠️ {label}: respuestas con error {result_codes(results[label])}'))
+
+        if baseline is not None:
+            regressions = self.compare(
+                baseline, output, options['tolerance'], options['min_delta_ms'], report_missing=not options['only'],
+                allow_drift=options['allow_drift']
+            )
+            if regressions:
+                for line in regressions:
+                    self.stdout.write(self.style.ERROR(f'❌ {line}'))
+                raise CommandError(f'{len(regressions)} regresiones respecto de {options["compare"]}.')
+            self.stdout.write(f'✅ Sin regresiones respecto de {options["compare"]}')
+
+        self.stdout.write(self.style.SUCCESS(f'Proceso completado. {len(results)} acciones medidas.'))
+
+    # ----------------------------------------------------------------------
+    # Datos
+    # ----------------------------------------------------------------------
+
+    def build_dataset(self, options, runs):
+        """Compañías, vehículos y direcciones sintéticos, más reservas para las acciones que eliminan."""
+        rng = random.Random(options['seed'])
+        token = uuid.uuid4().hex[:8]
+        today = timezone.localdate()
+        now = timezone.now()
+
+        def company(name):
+            index = len(companies)
+            return Company(
+                name=f'{name} {index}', subdomain=f'bench-{token}-{index}', legal_name=f'{name} {index} S.A.',
+                tax_id=f'{int(token, 16) % 10 ** 8:08d}{index:05d}', daily_fee=1
+            )
+
+        companies = []
+        for _ in range(options['companies']):
+            companies.append(company('Benchmark'))
+        # Reservas: eliminar, eliminación lógica y acciones masivas
+        for _ in range(runs * 3):
+            companies.append(company('Reserva'))
+        Company.objects.bulk_create(companies)
+        fleet_companies, spare_companies = companies[:options['companies']], companies[options['companies']:]
+
+        def expiry():
+            return None if rng.random() < 0.1 else today + timedelta(days=rng.randint(-60, 365))
+
+        def vehicle(company_id, prefix, number):
+            return Vehicle(
+                company_id=company_id, identifier_number=f'{prefix}-{number}', license_plate=f'{prefix}-{number:04d}',
+                chassis_number=f'CH-{prefix}-{number}', brand=rng.choice(BRANDS), model=f'Modelo {rng.randint(1, 20)}',
+                year=rng.randint(2012, today.year), color=rng.choice(COLORS), engine_displacement=rng.choice((125, 150, 200)),
+                status='suspended' if rng.random() < 0.1 else 'active', soat_expiry=expiry(),
+                technical_review_expiry=expiry(), operation_permit_expiry=expiry(),
+            )
+
+        vehicles = [
+            vehicle(company.id, 'BNC', number)
+            for company in fleet_companies for number in range(options['vehicles'])
+        ]
+        spare_vehicles = [vehicle(fleet_companies[0].id, 'BND', number) for number in range(runs * 2)]
+        Vehicle.objects.bulk_create(vehicles + spare_vehicles, batch_size=1000)
+        Vehicle.refresh_next_document_expiry(Vehicle.objects.filter(company__in=fleet_companies))
+        # Antigüedad variada para los listados por fecha de creación
+        for i, instance in enumerate(vehicles):
+            instance.created_at = now - timedelta(minutes=i)
+        Vehicle.objects.bulk_update(vehicles, ['created_at'], batch_size=1000)
+
+        vehicle_type = ContentType.objects.get_for_model(Vehicle)
+        company_type = ContentType.objects.get_for_model(Company)
+        addresses = [
+            Address(province='Manabí', city=rng.choice(('Manta', 'Portoviejo', 'Chone')), sector=f'Sector {i}',
+                    content_type=vehicle_type, object_id=instance.id)
+            for instance in vehicles for i in range(options['addresses'])
+        ]
+        addresses += [
+            Address(province='Manabí', city='Manta', content_type=company_type, object_id=company.id)
+            for company in fleet_companies
+        ]
+        spare_addresses = [
+            Address(province='Manabí', city='Manta', content_type=company_type, object_id=fleet_companies[0].id)
+            for _ in range(runs * 3)
+        ]
+        Address.objects.bulk_create(addresses + spare_addresses, batch_size=1000)
+
+        return {
+            'user': User.objects.create_user(username=f'bench-{token}'),
+            'companies': fleet_companies,
+            'spare_companies': spare_companies,
+            'vehicles': [v for v in vehicles if v.company_id == fleet_companies[0].id],
+            'spare_vehicles': spare_vehicles,
+            'addresses': addresses,
+            'spare_addresses': spare_addresses,
+            'company_type': company_type,
+            'runs': runs,
+        }
+
+    # ----------------------------------------------------------------------
+    # Escenarios
+    # ----------------------------------------------------------------------
+
+    def scenarios(self, data):
+        """Una o más mediciones por acción de cada ViewSet, en un orden que deja los datos consistentes."""
+        runs = data['runs']
+        company = data['companies'][0]
+        vehicles = data['vehicles']
+        addresses = data['addresses']
+        spare_companies = data['spare_companies']
+        spare_vehicles = data['spare_vehicles']
+        spare_addresses = data['spare_addresses']
+        now = quote(timezone.now().isoformat())
+
+        def pick(items, i, offset=0):
+            return items[(i + offset) % len(items)]
+
+        def block(items, i, size=BULK_SIZE):
+            start = (i * size) % len(items)
+            return [str(item.id) for item in (items[start:] + items[:start])[:size]]
+
+        def vehicle_payload(prefix, i):
+            return {
+                'company': str(company.id), 'identifier_number': f'{prefix}-{i}', 'license_plate': f'{prefix}-{i:04d}',
+                'chassis_number': f'CH-{prefix}-{i}', 'brand': 'Bajaj', 'model': 'RE', 'year': 2022,
+                'color': 'Amarillo', 'engine_displacement': 200,
+            }
+
+        def vehicle_update(i):
+            instance = pick(vehicles, i)
+            return {
+                'company': str(instance.company_id), 'identifier_number': instance.identifier_number,
+                'license_plate': instance.license_plate, 'chassis_number': instance.chassis_number,
+                'brand': instance.brand, 'model': instance.model, 'year': instance.year,
+                'color': COLORS[i % len(COLORS)], 'engine_displacement': instance.engine_displacement,
+            }
+
+        def company_payload(i, subdomain):
+            return {
+                'name': f'Compañía {i}', 'subdomain': subdomain, 'legal_name': f'Compañía {i} S.A.',
+                'tax_id': f'{int(uuid.uuid4().hex[:10], 16) % 10 ** 13:013d}', 'daily_fee': '1.50',
+            }
+
+        def address_payload(i):
+            return {
+                'province': 'Manabí', 'city': 'Manta', 'sector': f'Sector {i}',
+                'content_type': data['company_type'].id, 'object_id': str(company.id),
+            }
+
+        # Reservas de compañías: [0, runs) eliminar, [runs, 2 runs) eliminación lógica, resto acciones masivas
+        deleted_companies = spare_companies[:runs]
+        archived_companies = spare_companies[runs:runs * 2]
+        bulk_companies = spare_companies[runs * 2:]
+        # Vehículos con estado alternado por las acciones de estado (no se mezclan con las demás)
+        status_vehicles = vehicles[len(vehicles) // 2:] or vehicles
+
+        C, V, A = '/api/companies/', '/api/vehicles/', '/api/addresses/'
+        c = f'company={company.id}'
+        none = lambda i: None  # noqa: E731
+
+        def s(viewset, action, method, path, body=none, label=None):
+            return Scenario(viewset, action, label or f'{viewset}.{action}', method, path, body)
+
+        return [
+            # Compañías
+            s('companies', 'list', 'get', lambda i: C),
+            s('companies', 'retrieve', 'get', lambda i: f'{C}{company.id}/'),
+            s('companies', 'create', 'post', lambda i: C,
+              lambda i: company_payload(i, f'bench-nueva-{uuid.uuid4().hex[:12]}')),
+            s('companies', 'update', 'put', lambda i: f'{C}{company.id}/',
+              lambda i: {**company_payload(i, company.subdomain), 'tax_id': company.tax_id}),
+            s('companies', 'partial_update', 'patch', lambda i: f'{C}{company.id}/', lambda i: {'phone': f'09{i:08d}'}),
+            s('companies', 'destroy', 'delete', lambda i: f'{C}{deleted_companies[i].id}/'),
+            s('companies', 'soft_delete', 'post', lambda i: f'{C}{archived_companies[i].id}/soft_delete/'),
+            s('companies', 'restore', 'post', lambda i: f'{C}{archived_companies[i].id}/restore/'),
+            s('companies', 'bulk_soft_delete', 'post', lambda i: f'{C}bulk_soft_delete/',
+              lambda i: {'ids': block(bulk_companies, i, 5)}),
+            s('companies', 'bulk_restore', 'post', lambda i: f'{C}bulk_restore/',
+              lambda i: {'ids': block(bulk_companies, i, 5)}),
+            s('companies', 'by_subdomain', 'get', lambda i: f'{C}by_subdomain/?subdomain={company.subdomain}'),
+            s('companies', 'stats', 'get', lambda i: f'{C}{company.id}/stats/'),
+
+            # Vehículos
+            s('vehicles', 'list', 'get', lambda i: f'{V}?{c}'),
+            s('vehicles', 'list', 'get', lambda i: f'{V}?{c}&pagination=cursor', label='vehicles.list[cursor]'),
+            s('vehicles', 'list', 'get', lambda i: f'{V}?{c}&brand=Honda&expiring_soon=1', label='vehicles.list[filtros]'),
+            s('vehicles', 'retrieve', 'get', lambda i: f'{V}{pick(vehicles, i).id}/'),
+            s('vehicles', 'create', 'post', lambda i: V, lambda i: vehicle_payload('BNX', i)),
+            s('vehicles', 'update', 'put', lambda i: f'{V}{pick(vehicles, i).id}/', vehicle_update),
+            s('vehicles', 'partial_update', 'patch', lambda i: f'{V}{pick(vehicles, i).id}/',
+              lambda i: {'soat_expiry': (timezone.localdate() + timedelta(days=i)).isoformat()}),
+            s('vehicles', 'destroy', 'delete', lambda i: f'{V}{spare_vehicles[i].id}/'),
+            s('vehicles', 'soft_delete', 'post', lambda i: f'{V}{spare_vehicles[runs + i].id}/soft_delete/'),
+            s('vehicles', 'restore', 'post', lambda i: f'{V}{spare_vehicles[runs + i].id}/restore/'),
+            s('vehicles', 'update_status', 'patch', lambda i: f'{V}{pick(status_vehicles, i).id}/update_status/',
+              lambda i: {'status': 'suspended' if (i // len(status_vehicles)) % 2 == 0 else 'active',
+                         'reason': 'Benchmark'}),
+            s('vehicles', 'status_as_of', 'get', lambda i: f'{V}status_as_of/?{c}&at={now}&status=suspended'),
+            s('vehicles', 'bulk', 'post', lambda i: f'{V}bulk/',
+              lambda i: {'vehicles': [vehicle_payload('BNB', i * BULK_SIZE + j) for j in range(BULK_SIZE)]}),
+            s('vehicles', 'bulk_status', 'post', lambda i: f'{V}bulk_status/',
+              lambda i: {'status': 'suspended' if i % 2 == 0 else 'active', 'ids': block(status_vehicles, 0)}),
+            s('vehicles', 'bulk_soft_delete', 'post', lambda i: f'{V}bulk_soft_delete/',
+              lambda i: {'ids': block(spare_vehicles[runs:], i, 5)}),
+            s('vehicles', 'bulk_restore', 'post', lambda i: f'{V}bulk_restore/',
+              lambda i: {'ids': block(spare_vehicles[runs:], i, 5)}),
+            s('vehicles', 'search', 'get', lambda i: f'{V}search/?{c}&q=BNC-{i % 10}'),
+            s('vehicles', 'export', 'get', lambda i: f'{V}export/?{c}'),
+            s('vehicles', 'expiring_documents', 'get', lambda i: f'{V}expiring_documents/?{c}'),
+            s('vehicles', 'stats', 'get', lambda i: f'{V}stats/?{c}'),
+            s('vehicles', 'stats', 'get', lambda i: f'{V}stats/?{c}&brand=Honda', label='vehicles.stats[filtros]'),
+            s('vehicles', 'full_details', 'get', lambda i: f'{V}{pick(vehicles, i).id}/full_details/'),
+
+            # Direcciones
+            s('addresses', 'list', 'get', lambda i: A),
+            s('addresses', 'list', 'get', lambda i: f'{A}?pagination=cursor', label='addresses.list[cursor]'),
+            s('addresses', 'retrieve', 'get', lambda i: f'{A}{pick(addresses, i).id}/'),
+            s('addresses', 'create', 'post', lambda i: A, address_payload),
+            s('addresses', 'update', 'put', lambda i: f'{A}{pick(addresses, i).id}/',
+              lambda i: {**address_payload(i), 'object_id': str(pick(addresses, i).object_id),
+                         'content_type': pick(addresses, i).content_type_id}),
+            s('addresses', 'partial_update', 'patch', lambda i: f'{A}{pick(addresses, i).id}/',
+              lambda i: {'province': 'Manabí', 'city': 'Manta', 'reference': f'Referencia {i}'}),
+            s('addresses', 'destroy', 'delete', lambda i: f'{A}{spare_addresses[i].id}/'),
+            s('addresses', 'soft_delete', 'post', lambda i: f'{A}{spare_addresses[runs + i].id}/soft_delete/'),
+            s('addresses', 'restore', 'post', lambda i: f'{A}{spare_addresses[runs + i].id}/restore/'),
+            s('addresses', 'bulk_soft_delete', 'post', lambda i: f'{A}bulk_soft_delete/',
+              lambda i: {'ids': block(spare_addresses[runs * 2:], i, 5)}),
+            s('addresses', 'bulk_restore', 'post', lambda i: f'{A}bulk_restore/',
+              lambda i: {'ids': block(spare_addresses[runs * 2:], i, 5)}),
+            s('addresses', 'export', 'get', lambda i: f'{A}export/?city=Manta'),
+            s('addresses', 'countries', 'get', lambda i: f'{A}countries/'),
+            s('addresses', 'regions', 'get', lambda i: f'{A}regions/?country_id=1'),
+            s('addresses', 'cities', 'get', lambda i: f'{A}cities/?region_id=1'),
+        ]
+
+    def report_uncovered(self, scenarios):
+        """Advertir sobre acciones de los ViewSets sin escenario (p. ej. una acción nueva)."""
+        covered = {(scenario.viewset, scenario.action) for scenario in scenarios}
+        for name, viewset in VIEWSETS.items():
+            actions = list(STANDARD_ACTIONS) + [extra.__name__ for extra in viewset.get_extra_actions()]
+            for action_name in actions:
+                if (name, action_name) not in covered:
+                    self.stdout.write(self.style.WARNING(f'⚠️ {name}.{action_name} no tiene escenario de benchmark'))
+
+    # ----------------------------------------------------------------------
+    # Medición
+    # ----------------------------------------------------------------------
+
+    def measure(self, client, scenario, warmup, iterations):
+        latencies = []
+        queries = []
+        statuses = Counter()
+
+        def count_queries(execute, sql, params, many, context):
+            counter[0] += 1
+            return execute(sql, params, many, context)
+
+        for i in range(warmup + iterations):
+            counter = [0]
+            body = scenario.data(i)
+            request = getattr(client, scenario.method)
+            with connection.execute_wrapper(count_queries):
+                started = time.perf_counter()
+                response = request(scenario.path(i), body, format='json') if body is not None else request(scenario.path(i))
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                elapsed = time.perf_counter() - started
+
+            if i >= warmup:
+                latencies.append(elapsed)
+                queries.append(counter[0])
+                statuses[str(response.status_code)] += 1
+
+        latencies.sort()
+        return {
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+            'min_ms': round(latencies[0] * 1000, 3),
+            'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+            'queries': int(statistics.median(queries)),
+            'queries_max': max(queries),
+            'statuses': dict(statuses),
+            'errors': sum(count for code, count in statuses.items() if int(code) >= 400),
+        }
+
+    def print_results(self, results):
+        width = max(len(label) for label in results) if results else 10
+        self.stdout.write(f'\n{"acción":<{width}}  {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"consultas":>10}  estados')
+        for label, result in results.items():
+            self.stdout.write(
+                f'{label:<{width}}  {result["p50_ms"]:9.2f} {result["p95_ms"]:9.2f} {result["p99_ms"]:9.2f} '
+                f'{result["queries"]:>5}/{result["queries_max"]:<4}  {result_codes(result)}'
+            )
+        self.stdout.write('')
+
+    def compare(self, baseline, current, tolerance, min_delta_ms, report_missing=True, allow_drift=False):
+        """Regresiones de ``current`` frente a ``baseline``: más consultas, otro estado HTTP o mayor latencia.
+
+        La latencia de cada acción se compara después de descontar la variación
+        general de la corrida (mediana de ``p50 actual / p50 referencia``), de
+        modo que una acción más lenta que las demás se detecta aunque la máquina
+        esté más cargada. La variación general también es una regresión si
+        supera la tolerancia (por ejemplo, un middleware lento afecta a todas las
+        acciones), salvo con ``allow_drift``, que solo la informa.
+        """
+        regressions = []
+        before = baseline.get('results', {})
+        common = [label for label in current['results'] if label in before]
+
+        ratios = [
+            current['results'][label]['p50_ms'] / before[label]['p50_ms']
+            for label in common if before[label]['p50_ms'] > 0
+        ]
+        drift = statistics.median(ratios) if ratios else 1.0
+        if drift > 1 + tolerance and not allow_drift:
+            regressions.append(
+                f'todas las acciones: p50 ×{drift:.2f} respecto de la referencia (un cambio general, o carga de '
+                f'la máquina: repetir o usar --allow-drift)'
+            )
+        elif abs(drift - 1) > tolerance:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️ Todas las acciones variaron ×{drift:.2f} respecto de la referencia (carga de la máquina, '
+                f'motor de base de datos o un cambio general)'
+            ))
+
+        for label in common:
+            result, reference = current['results'][label], before[label]
+            if result['queries_max'] > reference['queries_max']:
+                regressions.append(f'{label}: consultas {reference["queries_max"]} → {result["queries_max"]}')
+            if result['statuses'] != reference['statuses']:
+                regressions.append(f'{label}: estados {reference["statuses"]} → {result["statuses"]}')
+            # También el mínimo: un pico de carga breve mueve p50 pero rara vez el mínimo
+            if all(
+                result[key] - reference[key] * drift > min_delta_ms
+                and result[key] > reference[key] * drift * (1 + tolerance)
+                for key in ('p50_ms', 'min_ms')
+            ):
+                expected = reference['p50_ms'] * drift
+                regressions.append(
+                    f'{label}: p50 {reference["p50_ms"]:.2f} ms → {result["p50_ms"]:.2f} ms '
+                    f'(esperado {expected:.2f} ms)'
+                )
+
+        missing = sorted(set(before) - set(current['results']))
+        if missing and report_missing:
+            self.stdout.write(self.style.WARNING(f'⚠️ Acciones de la referencia no medidas: {", ".join(missing)}'))
+        return regressions
+
+
+def result_codes(result):
+    return ' '.join(f'{code}×{count}' for code, count in sorted(result['statuses'].items()))
@@ -0,0 +1,168 @@
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+class Command(BaseCommand):
+    help = 'Mide el throughput de endpoints HTTP con N clientes concurrentes (comparación WSGI vs ASGI)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target',
+            action='append',
+            required=True,
+            help='Endpoint a medir como etiqueta=URL (repetible), '
+                 'por ejemplo wsgi=http://127.0.0.1:8000/api/vehicles/',
+        )
+        parser.add_argument(
+            '--clients',
+            type=int,
+            default=200,
+            help='Clientes concurrentes (por defecto: 200)',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=10,
+            help='Solicitudes por cliente (por defecto: 10)',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=30.0,
+            help='Tiempo máximo por solicitud en segundos (por defecto: 30)',
+        )
+        parser.add_argument(
+            '--header',
+            action='append',
+            default=[],
+            help='Encabezado adicional como Nombre:Valor (repetible), por ejemplo Host:acme.localhost',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Imprimir los resultados en formato JSON',
+        )
+
+    def handle(self, *args, **options):
+        headers = {}
+        for header in options['header']:
+            name, sep, value = header.partition(':')
+            if not sep:
+                raise CommandError(f'Encabezado inválido: {header}')
+            headers[name.strip()] = value.strip()
+
+        results = []
+        for target in options['target']:
+            label, sep, url = target.partition('=')
+            if not sep or not url.startswith(('http://', 'https://')):
+                raise CommandError(f'Objetivo inválido (se espera etiqueta=URL): {target}')
+
+            if not options['json']:
+                self.stdout.write(
+                    f'🚀 {label}: {options["clients"]} clientes x {options["requests"]} solicitudes -> {url}'
+                )
+            results.append(self.run_target(label, url, headers, options))
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write('')
+        self.stdout.write(f'{"objetivo":<12}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"errores":>10}')
+        for result in results:
+            self.stdout.write(
+                f'{result["label"]:<12}{result["throughput"]:>10.1f}{result["p50_ms"]:>10.1f}'
+                f'{result["p95_ms"]:>10.1f}{result["p99_ms"]:>10.1f}{result["errors"]:>10}'
+            )
+
+        if len(results) > 1 and results[0]['throughput']:
+            base = results[0]
+            for result in results[1:]:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f'{result["label"]} / {base["label"]}: {result["throughput"] / base["throughput"]:.2f}x throughput'
+                    )
+                )
+
+    def run_target(self, label, url, headers, options):
+        parts = urlsplit(url)
+        path = parts.path or '/'
+        if parts.query:
+            path = f'{path}?{parts.query}'
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+
+        clients = options['clients']
+        barrier = threading.Barrier(clients + 1)
+        lock = threading.Lock()
+        latencies = []
+        errors = [0]
+        statuses = {}
+
+        def client():
+            # Una conexión keep-alive por cliente
+            connection = connection_class(parts.netloc, timeout=options['timeout'])
+            local_latencies = []
+            local_errors = 0
+            local_statuses = {}
+            barrier.wait()
+
+            for _ in range(options['requests']):
+                started = time.perf_counter()
+                try:
+                    connection.request('GET', path, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    local_statuses[response.status] = local_statuses.get(response.status, 0) + 1
+                    if response.status >= 400:
+                        local_errors += 1
+                    else:
+                        local_latencies.append(time.perf_counter() - started)
+                except (OSError, http.client.HTTPException):
+                    local_errors += 1
+                    connection.close()
+                    connection = connection_class(parts.netloc, timeout=options['timeout'])
+
+            connection.close()
+            with lock:
+                latencies.extend(local_latencies)
+                errors[0] += local_errors
+                for code, count in local_statuses.items():
+                    statuses[code] = statuses.get(code, 0) + count
+
+        threads = [threading.Thread(target=client, daemon=True) for _ in range(clients)]
+        for thread in threads:
+            thread.start()
+
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'label': label,
+            'url': url,
+            'clients': clients,
+            'requests': clients * options['requests'],
+            'ok': len(latencies),
+            'errors': errors[0],
+            'statuses': {str(code): count for code, count in sorted(statuses.items())},
+            'elapsed_s': round(elapsed, 3),
+            'throughput': len(latencies) / elapsed if elapsed else 0.0,
+            'p50_ms': percentile(latencies, 0.50) * 1000,
+            'p95_ms': percentile(latencies, 0.95) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000,
+        }
@@ -0,0 +1,110 @@
+import random
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from apps.core.models import Vehicle
+from apps.core.serializers.serializer_vehicle import VehicleListReadSerializer, VehicleListSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compara VehicleListSerializer con la serialización de solo lectura de los listados'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=10000,
+            help='Cantidad de vehículos a serializar (por defecto: 10000)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Repeticiones de cada medición; se informa la mejor (por defecto: 3)',
+        )
+        parser.add_argument(
+            '--from-db',
+            action='store_true',
+            help='Usar vehículos de la base de datos en lugar de datos generados en memoria',
+        )
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+
+        if options['from_db']:
+            queryset = Vehicle.objects.order_by('-created_at')[:rows]
+            instances = list(queryset)
+            values = list(queryset.values(*VehicleListReadSerializer.columns))
+        else:
+            instances = self.generate(rows)
+            values = [
+                {column: getattr(instance, column) for column in VehicleListReadSerializer.columns}
+                for instance in instances
+            ]
+
+        if not instances:
+            self.stdout.write(self.style.ERROR('❌ No hay vehículos para serializar.'))
+            return
+
+        self.stdout.write(f'📋 Serializando {len(instances)} vehículos ({options["repeat"]} repeticiones)...')
+
+        renderer = JSONRenderer()
+        model_time, model_output = self.measure(
+            lambda: renderer.render(VehicleListSerializer(instances, many=True).data), options['repeat']
+        )
+        fast_time, fast_output = self.measure(
+            lambda: renderer.render(VehicleListReadSerializer(values, many=True).data), options['repeat']
+        )
+
+        if model_output != fast_output:
+            self.stdout.write(self.style.ERROR('❌ Las salidas JSON no son idénticas.'))
+            return
+
+        self.stdout.write(f'✅ Salidas JSON idénticas ({len(fast_output)} bytes).')
+        self.stdout.write(f'   VehicleListSerializer:     {model_time * 1000:8.1f} ms')
+        self.stdout.write(f'   VehicleListReadSerializer: {fast_time * 1000:8.1f} ms')
+        self.stdout.write(
+            self.style.SUCCESS(f'Proceso completado. Aceleración: {model_time / fast_time:.1f}x')
+        )
+
+    def measure(self, func, repeat):
+        best = None
+        output = None
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            output = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, output
+
+    def generate(self, rows):
+        """Vehículos sin guardar con fechas de vencimiento alrededor de hoy."""
+        rng = random.Random(42)
+        today = timezone.now().date()
+        now = timezone.now()
+        brands = ['Bajaj', 'Honda', 'Mahindra', 'Piaggio', 'TVS']
+        statuses = [code for code, _ in Vehicle.STATUS_CHOICES]
+
+        def expiry():
+            return None if rng.random() < 0.1 else today + timedelta(days=rng.randint(-60, 365))
+
+        return [
+            Vehicle(
+                id=uuid.UUID(int=rng.getrandbits(128), version=4),
+                license_plate=f'{"".join(rng.choices("ABCDEFGHIJKLMNOPQRSTUVWXYZ", k=3))}-{i % 10000:04d}',
+                brand=rng.choice(brands),
+                model=f'Modelo {rng.randint(1, 20)}',
+                year=rng.randint(2010, today.year),
+                status=rng.choice(statuses),
+                soat_expiry=expiry(),
+                technical_review_expiry=expiry(),
+                operation_permit_expiry=expiry(),
+                created_at=now - timedelta(seconds=i, microseconds=rng.randint(0, 999999)),
+            )
+            for i in range(rows)
+        ]
@@ -0,0 +1,133 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from apps.core.models import Company, VehicleStatsRollup
+from apps.core.utils.fleet_data import (PLATE_SPACE, FleetGenerator, analyze, company_profile, generate_company,
+                                        supports_copy)
+from apps.core.utils.vehicle_search import ngram_index
+
+
+class Command(BaseCommand):
+    help = ('Genera compañías, vehículos y direcciones sintéticos a escala de producción '
+            '(COPY en PostgreSQL, INSERT por lotes en otros motores)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=10, help='Compañías a generar (por defecto: 10)')
+        parser.add_argument('--vehicles', type=int, default=1000, help='Vehículos por compañía (por defecto: 1000)')
+        parser.add_argument('--addresses', type=int, default=1, help='Direcciones por vehículo (por defecto: 1)')
+        parser.add_argument('--seed', type=int, default=42, help='Semilla de los datos (por defecto: 42)')
+        parser.add_argument(
+            '--start',
+            type=int,
+            default=1,
+            help='Número de la primera compañía, para ampliar una carga anterior con la misma semilla (por defecto: 1)',
+        )
+        parser.add_argument(
+            '--as-of',
+            type=date.fromisoformat,
+            help='Fecha de referencia de registros y vencimientos (YYYY-MM-DD, por defecto: hoy). '
+                 'Con la misma semilla y fecha se generan exactamente los mismos datos',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Filas por INSERT cuando no se usa COPY (por defecto: 5000)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Compañías cargadas en paralelo, cada una con su propia conexión (por defecto: 1)',
+        )
+        parser.add_argument('--no-copy', action='store_true', help='Usar INSERT por lotes también en PostgreSQL')
+
+    def handle(self, *args, **options):
+        if options['companies'] < 1 or options['vehicles'] < 0 or options['addresses'] < 0 or options['start'] < 1:
+            raise CommandError('--companies y --start deben ser mayores que cero; --vehicles y --addresses no negativos.')
+        if options['vehicles'] > PLATE_SPACE:
+            raise CommandError(f'Se permiten como máximo {PLATE_SPACE} vehículos por compañía (placas por provincia).')
+
+        indexes = range(options['start'] - 1, options['start'] - 1 + options['companies'])
+        subdomains = [company_profile(options['seed'], index)['subdomain'] for index in indexes]
+        existing = list(Company.all_objects.filter(subdomain__in=subdomains).values_list('subdomain', flat=True))
+        if existing:
+            raise CommandError(
+                f'Ya existen compañías generadas con la semilla {options["seed"]}: {", ".join(sorted(existing)[:5])}. '
+                f'Use otra --seed o --start {options["start"] + options["companies"]}.'
+            )
+
+        use_copy = supports_copy() and not options['no_copy']
+        workers = options['workers']
+        if workers > 1 and connection.vendor == 'sqlite':
+            # SQLite admite un solo escritor a la vez
+            self.stdout.write(self.style.WARNING('⚠️ SQLite no admite escrituras en paralelo; se usa --workers 1.'))
+            workers = 1
+        self.stdout.write(
+            f'📋 Generando {options["companies"]} compañías × {options["vehicles"]} vehículos × '
+            f'{options["addresses"]} direcciones ({"COPY" if use_copy else "INSERT por lotes"})...'
+        )
+
+        generators = [
+            FleetGenerator(options['seed'], index, options['vehicles'], options['addresses'], as_of=options['as_of'])
+            for index in indexes
+        ]
+        started = time.perf_counter()
+        total_vehicles = total_addresses = 0
+        try:
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    results = executor.map(
+                        lambda generator: self.generate_in_thread(generator, options['batch_size'], use_copy),
+                        generators
+                    )
+                    for position, (generator, vehicles, addresses, elapsed) in enumerate(results, start=1):
+                        total_vehicles += vehicles
+                        total_addresses += addresses
+                        self.report_company(position, len(generators), generator, vehicles, addresses, elapsed)
+            else:
+                for position, generator in enumerate(generators, start=1):
+                    generator, vehicles, addresses, elapsed = self.generate(generator, options['batch_size'], use_copy)
+                    total_vehicles += vehicles
+                    total_addresses += addresses
+                    self.report_company(position, len(generators), generator, vehicles, addresses, elapsed)
+        finally:
+            # COPY e INSERT directos no emiten señales: resúmenes y búsqueda se recalculan
+            if total_vehicles:
+                VehicleStatsRollup.invalidate()
+                # Solo este proceso: los servidores recargan su índice al vencer NGRAM_INDEX_TTL
+                ngram_index.reset()
+                self.stdout.write('📋 Actualizando estadísticas de la base de datos...')
+                analyze()
+
+        elapsed = time.perf_counter() - started
+        rows = total_vehicles + total_addresses
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Proceso completado. {options["companies"]} compañías, {total_vehicles} vehículos y '
+                f'{total_addresses} direcciones en {elapsed:.2f}s ({rows / elapsed if elapsed else 0:.0f} filas/s).'
+            )
+        )
+
+    def generate(self, generator, batch_size, use_copy):
+        started = time.perf_counter()
+        vehicles, addresses = generate_company(generator, batch_size, use_copy=use_copy)
+        return generator, vehicles, addresses, time.perf_counter() - started
+
+    def generate_in_thread(self, generator, batch_size, use_copy):
+        try:
+            return self.generate(generator, batch_size, use_copy)
+        finally:
+            # Cada hilo abre su propia conexión a la base de datos
+            connections.close_all()
+
+    def report_company(self, position, count, generator, vehicles, addresses, elapsed):
+        rate = (vehicles + addresses) / elapsed if elapsed else 0.0
+        self.stdout.write(
+            f'📦 Compañía {position}/{count} ({generator.company["subdomain"]}): '
+            f'{vehicles} vehículos, {addresses} direcciones - {rate:.0f} filas/s'
+        )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.models import Company, Vehicle
+
+
+class Command(BaseCommand):
+    help = 'Recalcula el vencimiento de documentos más próximo (next_document_expiry) de los vehículos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--company',
+            type=str,
+            help='UUID de la compañía a recalcular (por defecto: todas)',
+        )
+
+    def handle(self, *args, **options):
+        queryset = Vehicle._base_manager.all()
+
+        company_id = options.get('company')
+        if company_id:
+            if not Company.all_objects.filter(id=company_id).exists():
+                self.stdout.write(self.style.ERROR(f'❌ Compañía no encontrada: {company_id}'))
+                return
+            queryset = queryset.filter(company_id=company_id)
+
+        # Un solo UPDATE en la base de datos, sin cargar los vehículos en memoria
+        updated = Vehicle.refresh_next_document_expiry(queryset)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Proceso completado. {updated} vehículos recalculados.')
+        )
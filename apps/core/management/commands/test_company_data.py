@@ -1,85 +1,19 @@
-from django.core.management.base import BaseCommand
-from django.conf import settings
 from apps.core.models import Company
-import json
-import os
+from apps.core.utils.bulk_loader import BulkLoadCommand
 
 
-class Command(BaseCommand):
+class Command(BulkLoadCommand):
     help = 'Carga datos de prueba para las compañías'
 
-    def add_arguments(self, parser):
-        parser.add_argument(
-            '--delete',
-            action='store_true',
-            help='Elimina todos los datos existentes antes de cargar',
-        )
-        parser.add_argument(
-            '--file',
-            type=str,
-            default='company_test_data_json.json',
-            help='Nombre del archivo JSON con los datos (por defecto: company_test_data_json.json)',
-        )
+    model = Company
+    key_fields = ('subdomain',)
+    required_fields = ('subdomain',)
+    default_file = 'company_test_data_json.json'
+    label = 'compañías'
+    created_label = 'creadas'
 
-    def handle(self, *args, **options):
-        if options['delete']:
-            Company.objects.all().delete()
-            self.stdout.write('Datos existentes eliminados.')
+    def build_instance(self, data):
+        return Company(**data)
 
-        # Cargar datos desde archivo JSON
-        file_path = os.path.join(settings.BASE_DIR, 'apps', 'core', 'management', 'test', options['file'])
-
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                companies_data = json.load(file)
-        except FileNotFoundError:
-            self.stdout.write(
-                self.style.ERROR(f'❌ Archivo no encontrado: {file_path}')
-            )
-            return
-        except json.JSONDecodeError as e:
-            self.stdout.write(
-                self.style.ERROR(f'❌ Error al decodificar JSON: {e}')
-            )
-            return
-        except Exception as e:
-            self.stdout.write(
-                self.style.ERROR(f'❌ Error inesperado: {e}')
-            )
-            return
-
-        if not isinstance(companies_data, list):
-            self.stdout.write(
-                self.style.ERROR('❌ El archivo JSON debe contener una lista de compañías')
-            )
-            return
-
-        created_count = 0
-        updated_count = 0
-
-        for data in companies_data:
-            try:
-                company, created = Company.objects.get_or_create(
-                    subdomain=data['subdomain'],
-                    defaults=data
-                )
-                if created:
-                    created_count += 1
-                    self.stdout.write(f'✅ Creada: {company.name}')
-                else:
-                    updated_count += 1
-                    self.stdout.write(f'⚠️  Ya existe: {company.name}')
-            except KeyError as e:
-                self.stdout.write(
-                    self.style.WARNING(f'⚠️  Campo faltante {e} en registro: {data}')
-                )
-            except Exception as e:
-                self.stdout.write(
-                    self.style.ERROR(f'❌ Error creando compañía {data.get("name", "desconocida")}: {e}')
-                )
-
-        self.stdout.write(
-            self.style.SUCCESS(
-                f'Proceso completado. {created_count} compañías creadas, {updated_count} ya existían.'
-            )
-        )
\ No newline at end of file
+    def describe(self, instance):
+        return f'Creada: {instance.name}'
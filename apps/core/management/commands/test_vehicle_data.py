@@ -1,85 +1,40 @@
-from django.core.management.base import BaseCommand
-from django.conf import settings
-from apps.core.models import Vehicle
-import json
-import os
+import uuid
 
+from apps.core.models import Company, Vehicle, VehicleStatsRollup
+from apps.core.utils.bulk_loader import BulkLoadCommand, RowError
+from apps.core.utils.vehicle_search import ngram_index
 
-class Command(BaseCommand):
-    help = 'Carga datos de prueba para los vehículos'
 
-    def add_arguments(self, parser):
-        parser.add_argument(
-            '--delete',
-            action='store_true',
-            help='Elimina todos los datos existentes antes de cargar',
-        )
-        parser.add_argument(
-            '--file',
-            type=str,
-            default='vehicle_test_data_json.json',
-            help='Nombre del archivo JSON con los datos (por defecto: vehicle_test_data_json.json)',
-        )
+class Command(BulkLoadCommand):
+    help = 'Carga datos de prueba para los vehículos'
 
-    def handle(self, *args, **options):
-        if options['delete']:
-            Vehicle.objects.all().delete()
-            self.stdout.write('Datos existentes eliminados.')
+    model = Vehicle
+    key_fields = ('identifier_number', 'company')
+    required_fields = ('identifier_number', 'company_id')
+    default_file = 'vehicle_test_data_json.json'
+    label = 'vehículos'
 
-        # Cargar datos desde archivo JSON en apps/core/management/commands/test/
-        file_path = os.path.join(settings.BASE_DIR, 'apps', 'core', 'management', 'test', options['file'])
+    def prepare(self):
+        # Resolver las compañías una sola vez para toda la carga
+        self.company_ids = set(Company.all_objects.values_list('id', flat=True))
 
+    def build_instance(self, data):
+        company_id = data['company_id']
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                vehicles_data = json.load(file)
-        except FileNotFoundError:
-            self.stdout.write(
-                self.style.ERROR(f'❌ Archivo no encontrado: {file_path}')
-            )
-            return
-        except json.JSONDecodeError as e:
-            self.stdout.write(
-                self.style.ERROR(f'❌ Error al decodificar JSON: {e}')
-            )
-            return
-        except Exception as e:
-            self.stdout.write(
-                self.style.ERROR(f'❌ Error inesperado: {e}')
-            )
-            return
-
-        if not isinstance(vehicles_data, list):
-            self.stdout.write(
-                self.style.ERROR('❌ El archivo JSON debe contener una lista de vehículos')
-            )
-            return
-
-        created_count = 0
-        updated_count = 0
-
-        for data in vehicles_data:
-            try:
-                vehicle, created = Vehicle.objects.get_or_create(
-                    identifier_number=data['identifier_number'],
-                    defaults=data
-                )
-                if created:
-                    created_count += 1
-                    self.stdout.write(f'✅ Creado: {vehicle.license_plate} - {vehicle.brand} {vehicle.model}')
-                else:
-                    updated_count += 1
-                    self.stdout.write(f'⚠️  Ya existe: {vehicle.license_plate} - {vehicle.brand} {vehicle.model}')
-            except KeyError as e:
-                self.stdout.write(
-                    self.style.WARNING(f'⚠️  Campo faltante {e} en registro: {data}')
-                )
-            except Exception as e:
-                self.stdout.write(
-                    self.style.ERROR(f'❌ Error creando vehículo {data.get("license_plate", "desconocido")}: {e}')
-                )
-
-        self.stdout.write(
-            self.style.SUCCESS(
-                f'Proceso completado. {created_count} vehículos creados, {updated_count} ya existían.'
-            )
-        )
\ No newline at end of file
+            company_uuid = uuid.UUID(str(company_id))
+        except ValueError:
+            raise RowError(f'company_id inválido en {data["identifier_number"]}: {company_id}')
+        if company_uuid not in self.company_ids:
+            raise RowError(f'Compañía no encontrada para {data["identifier_number"]}: {company_id}')
+
+        vehicle = Vehicle(**data)
+        vehicle.next_document_expiry = vehicle.compute_next_document_expiry()
+        return vehicle
+
+    def finish(self, stats):
+        if stats.created or stats.updated:
+            VehicleStatsRollup.invalidate()
+            ngram_index.reset()
+
+    def describe(self, instance):
+        return f'Creado: {instance.license_plate} - {instance.brand} {instance.model}'
@@ -1,10 +1,10 @@
+from concurrent.futures import ProcessPoolExecutor
 from django.core.management.base import BaseCommand
 from django.conf import settings
 from apps.core.models import Company
-import json
+from apps.core.utils.json_rewrite import init_worker, rewrite_company_ids
 import os
-import random
-import uuid
+import time
 
 
 class Command(BaseCommand):
@@ -28,18 +28,23 @@ class Command(BaseCommand):
             default=['company_id', 'object_id'],
             help='Nombres de campos que deben contener el UUID de compañía (por defecto: company_id, object_id)',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Archivos procesados en paralelo, cada uno en su propio proceso (por defecto: núcleos disponibles)',
+        )
 
     def handle(self, *args, **options):
-        # Obtener todas las compañías existentes
-        companies = list(Company.objects.all())
+        # Solo los UUIDs: no se cargan instancias de compañías
+        company_uuids = [str(company_id) for company_id in Company.all_objects.values_list('id', flat=True)]
 
-        if not companies:
+        if not company_uuids:
             self.stdout.write(
                 self.style.ERROR('❌ No hay compañías en la base de datos. Ejecuta primero load_companies.')
             )
             return
 
-        company_uuids = [str(company.id) for company in companies]
         company_fields = options['company_fields']
 
         self.stdout.write(f'📋 Encontradas {len(company_uuids)} compañías disponibles.')
@@ -64,7 +69,7 @@ class Command(BaseCommand):
         if options['files']:
             files_to_process = options['files']
         else:
-            files_to_process = [f for f in os.listdir(json_directory) if f.endswith('.json')]
+            files_to_process = sorted(f for f in os.listdir(json_directory) if f.endswith('.json'))
 
         if not files_to_process:
             self.stdout.write(
@@ -72,89 +77,53 @@ class Command(BaseCommand):
             )
             return
 
+        paths = [os.path.join(json_directory, filename) for filename in files_to_process]
+        workers = max(1, min(options['workers'], len(paths)))
+
         processed_files = 0
+        read_records = 0
         updated_records = 0
-
-        for filename in files_to_process:
-            file_path = os.path.join(json_directory, filename)
-
-            if not os.path.exists(file_path):
-                self.stdout.write(
-                    self.style.WARNING(f'⚠️  Archivo no encontrado: {filename}')
-                )
-                continue
-
-            try:
-                # Leer archivo JSON
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    data = json.load(file)
-
-                if not isinstance(data, list):
-                    self.stdout.write(
-                        self.style.WARNING(f'⚠️  {filename}: No es una lista, saltando.')
+        started = time.perf_counter()
+
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(company_uuids,)) as executor:
+                results = executor.map(rewrite_company_ids, paths, [company_fields] * len(paths))
+                for result in results:
+                    processed_files, read_records, updated_records = self.report(
+                        result, processed_files, read_records, updated_records
                     )
-                    continue
-
-                # Verificar si algún registro necesita alguno de los campos de compañía
-                needs_company_field = any(
-                    isinstance(record, dict) and any(field in record for field in company_fields)
-                    for record in data
-                )
-
-                if not needs_company_field:
-                    self.stdout.write(f'ℹ️  {filename}: No contiene campos de compañía, saltando.')
-                    continue
-
-                # Crear un iterador cíclico de UUIDs de compañías
-                company_cycle = self._cycle_generator(company_uuids)
-                file_updated_records = 0
-                fields_found = set()
-
-                # Actualizar registros que tengan alguno de los campos de compañía
-                for record in data:
-                    if isinstance(record, dict):
-                        for field in company_fields:
-                            if field in record:
-                                # Asignar UUID de compañía de forma cíclica
-                                record[field] = next(company_cycle)
-                                file_updated_records += 1
-                                fields_found.add(field)
-                                break  # Solo actualizar el primer campo encontrado por registro
-
-                # Guardar archivo actualizado
-                with open(file_path, 'w', encoding='utf-8') as file:
-                    json.dump(data, file, indent=2, ensure_ascii=False)
-
-                processed_files += 1
-                updated_records += file_updated_records
-                self.stdout.write(
-                    f'✅ {filename}: {file_updated_records} registros actualizados '
-                    f'(campos: {", ".join(fields_found)})'
-                )
-
-            except json.JSONDecodeError as e:
-                self.stdout.write(
-                    self.style.ERROR(f'❌ Error JSON en {filename}: {e}')
-                )
-            except Exception as e:
-                self.stdout.write(
-                    self.style.ERROR(f'❌ Error procesando {filename}: {e}')
+        else:
+            for path in paths:
+                result = rewrite_company_ids(path, company_fields, company_uuids)
+                processed_files, read_records, updated_records = self.report(
+                    result, processed_files, read_records, updated_records
                 )
 
+        elapsed = time.perf_counter() - started
         self.stdout.write(
             self.style.SUCCESS(
                 f'🎉 Proceso completado. {processed_files} archivos procesados, '
-                f'{updated_records} registros actualizados.'
+                f'{updated_records} registros actualizados. {read_records} registros leídos en {elapsed:.2f}s '
+                f'({read_records / elapsed if elapsed else 0:.0f} registros/s, {workers} procesos).'
             )
         )
 
-    def _cycle_generator(self, items):
-        """Generador que cicla infinitamente a través de una lista de items."""
-        shuffled_items = items.copy()
-        random.shuffle(shuffled_items)  # Mezclar para mayor aleatoriedad
+    def report(self, result, processed_files, read_records, updated_records):
+        """Mostrar el resultado de un archivo y acumular los totales."""
+        read_records += result.records
+
+        if result.status == 'updated':
+            processed_files += 1
+            updated_records += result.updated
+            self.stdout.write(
+                f'✅ {result.filename}: {result.updated} registros actualizados '
+                f'(campos: {", ".join(result.fields)}) - {result.rate:.0f} registros/s'
+            )
+        elif result.status == 'skipped':
+            self.stdout.write(f'ℹ️  {result.filename}: {result.message}, saltando.')
+        else:
+            self.stdout.write(
+                self.style.ERROR(f'❌ Error procesando {result.filename}: {result.message}')
+            )
 
-        while True:
-            for item in shuffled_items:
-                yield item
-            # Volver a mezclar al completar un ciclo
-            random.shuffle(shuffled_items)
\ No newline at end of file
+        return processed_files, read_records, updated_records
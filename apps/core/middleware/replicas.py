@@ -0,0 +1,72 @@
+"""Lecturas en réplicas para solicitudes seguras (GET, HEAD, OPTIONS).
+
+Con réplicas configuradas (``DATABASE_REPLICAS``), ``ReplicaRoutingMiddleware``
+asigna una réplica a cada solicitud de un método seguro; ``ReplicaRouter``
+dirige allí sus lecturas. Para que un cliente vea sus propios cambios
+(read-your-writes), toda solicitud que escribe en la base principal (o usa un
+método no seguro) fija al cliente a la base principal durante
+``REPLICA_PIN_SECONDS`` con una cookie, y las lecturas que siguen a una
+escritura dentro de la misma solicitud también van a la base principal.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from apps.core.db_router import begin_request, choose_replica, end_request
+
+# Valores por defecto si no se configuran en settings
+DEFAULT_REPLICA_PIN_SECONDS = 5
+PIN_COOKIE_NAME = 'fh_db_primary'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaRoutingMiddleware:
+    """Asigna una réplica a las solicitudes de lectura y fija a la base principal tras escribir."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'DATABASE_REPLICAS', ()):
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        self.pin_seconds = getattr(settings, 'REPLICA_PIN_SECONDS', DEFAULT_REPLICA_PIN_SECONDS)
+
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def get_replica(self, request):
+        """Réplica de la solicitud o ``None`` si debe leer de la base principal."""
+        if request.method not in SAFE_METHODS or request.COOKIES.get(PIN_COOKIE_NAME):
+            return None
+        return choose_replica()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        state, token = begin_request(self.get_replica(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        return self.pin(request, response, state)
+
+    async def __acall__(self, request):
+        state, token = begin_request(self.get_replica(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        return self.pin(request, response, state)
+
+    def pin(self, request, response, state):
+        """Fijar al cliente a la base principal si la solicitud escribió o no es segura."""
+        if state.wrote or request.method not in SAFE_METHODS:
+            response.set_cookie(
+                PIN_COOKIE_NAME, '1', max_age=self.pin_seconds, httponly=True, samesite='Lax',
+                secure=request.is_secure(),
+            )
+        return response
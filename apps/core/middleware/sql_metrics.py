@@ -0,0 +1,179 @@
+"""Métricas de SQL por solicitud (opcional, pensado para dejar activo en producción).
+
+Con ``SQL_METRICS_ENABLED = True``, ``SQLMetricsMiddleware`` cuenta las
+consultas de cada solicitud, su tiempo total en la base de datos y cuántas
+veces se repite cada consulta (misma SQL parametrizada). Los resultados se
+envían en el encabezado ``Server-Timing`` (visible en las herramientas de
+desarrollo del navegador) y en una línea de log JSON por solicitud.
+
+Una consulta que se repite ``SQL_METRICS_N_PLUS_ONE_THRESHOLD`` veces o más en
+la misma solicitud se marca como posible N+1; la advertencia se registra una
+sola vez por vista y consulta en cada proceso para no inundar los logs.
+
+El wrapper de ``execute`` se instala una vez en cada conexión y lee el
+colector de la solicitud desde una ``ContextVar``, que ``sync_to_async``
+propaga a sus hilos: funciona igual con vistas síncronas y async. Fuera de
+una solicitud el costo es una lectura de la ``ContextVar``. Las consultas de
+respuestas en streaming se ejecutan después del middleware y no se cuentan.
+"""
+import json
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+# Valores por defecto si no se configuran en settings
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+# Consultas repetidas incluidas en la línea de log
+REPORTED_SHAPES = 3
+# Caracteres de SQL incluidos en el log por consulta
+SQL_PREVIEW_LENGTH = 200
+
+_current = ContextVar('sql_metrics', default=None)
+
+
+class QueryMetrics:
+    """Consultas de una solicitud: total, tiempo y repeticiones por SQL."""
+
+    __slots__ = ('count', 'duration', 'shapes')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = {}  # sql -> [repeticiones, segundos]
+
+    def add(self, sql, elapsed):
+        self.count += 1
+        self.duration += elapsed
+        shape = self.shapes.get(sql)
+        if shape is None:
+            self.shapes[sql] = [1, elapsed]
+        else:
+            shape[0] += 1
+            shape[1] += elapsed
+
+    def repeated(self, threshold):
+        """``(sql, repeticiones, segundos)`` de las consultas repetidas, de más a menos repetida."""
+        return sorted(
+            ((sql, count, elapsed) for sql, (count, elapsed) in self.shapes.items() if count >= threshold),
+            key=lambda shape: -shape[1]
+        )
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add(sql, time.perf_counter() - start)
+
+
+def install_wrapper(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class SQLMetricsMiddleware:
+    """Registra las métricas de SQL de cada solicitud (``Server-Timing`` y log JSON)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SQL_METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'SQL_METRICS_N_PLUS_ONE_THRESHOLD', DEFAULT_N_PLUS_ONE_THRESHOLD)
+        self._flagged = set()
+        self._lock = threading.Lock()
+
+        connection_created.connect(install_wrapper, dispatch_uid='sql_metrics')
+        # Conexiones ya abiertas en este hilo (las demás se cubren con la señal)
+        for connection in connections.all(initialized_only=True):
+            install_wrapper(connection)
+
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        metrics = QueryMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.report(request, response, metrics, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        metrics = QueryMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.report(request, response, metrics, time.perf_counter() - start)
+        return response
+
+    def get_view_label(self, request):
+        """Vista y acción de la solicitud (``GET vehicle-list``)."""
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match is not None else request.path
+        return f'{request.method} {view_name}'
+
+    def report(self, request, response, metrics, total):
+        repeated = metrics.repeated(self.threshold)
+
+        timings = [
+            f'db;dur={metrics.duration * 1000:.2f};desc="SQL ({metrics.count} consultas)"',
+            f'total;dur={total * 1000:.2f}',
+        ]
+        if repeated:
+            timings.append(f'n1;desc="{len(repeated)} consultas repetidas"')
+        response['Server-Timing'] = ', '.join(
+            filter(None, [response.get('Server-Timing')] + timings)
+        )
+
+        view = self.get_view_label(request)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({
+                'view': view,
+                'path': request.path,
+                'status': response.status_code,
+                'queries': metrics.count,
+                'db_ms': round(metrics.duration * 1000, 2),
+                'total_ms': round(total * 1000, 2),
+                'repeated': [
+                    {'sql': sql[:SQL_PREVIEW_LENGTH], 'count': count, 'ms': round(elapsed * 1000, 2)}
+                    for sql, count, elapsed in repeated[:REPORTED_SHAPES]
+                ],
+            }))
+
+        for sql, count, _ in repeated:
+            key = (view, sql)
+            with self._lock:
+                if key in self._flagged:
+                    continue
+                self._flagged.add(key)
+            logger.warning(
+                'Posible N+1 en %s: la misma consulta se ejecutó %d veces en una solicitud: %s',
+                view, count, sql[:SQL_PREVIEW_LENGTH]
+            )
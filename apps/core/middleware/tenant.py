@@ -0,0 +1,176 @@
+"""Resolución del tenant (compañía) a partir del subdominio de la solicitud.
+
+``TenantMiddleware`` toma el subdominio del encabezado Host (``acme.fleethub.com``
+con ``TENANT_BASE_DOMAIN = 'fleethub.com'``) y asigna ``request.company_id``.
+La relación subdominio -> id de compañía activa (o su ausencia) se guarda en
+la caché ``TENANT_CACHE_ALIAS`` de Django, de modo que una solicitud normal no
+consulta la base de datos para resolver su tenant. Solo se guarda el id: la
+compañía completa (``request.company``) se carga al usarla.
+
+Las claves incluyen una generación que las señales de ``Company`` (guardar,
+desactivar, restaurar, eliminar) renuevan. Con un backend compartido (Redis,
+Memcached, base de datos) la invalidación llega a todos los procesos; con la
+caché en memoria por defecto, los demás procesos ven el cambio al vencer
+``TENANT_CACHE_TTL`` (o ``TENANT_CACHE_NEGATIVE_TTL`` para los subdominios
+inexistentes).
+"""
+import uuid
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+from django.http.request import split_domain_port
+from django.utils.functional import SimpleLazyObject
+
+from apps.core.models import Company
+
+# Valores por defecto si no se configuran en settings
+DEFAULT_TENANT_CACHE_ALIAS = 'default'
+DEFAULT_TENANT_CACHE_TTL = 300
+DEFAULT_TENANT_CACHE_NEGATIVE_TTL = 30
+
+# Marca para subdominios sin compañía activa (caché negativa)
+_MISSING = ''
+GENERATION_KEY = 'tenant:generation'
+
+
+class TenantCache:
+    """Caché compartida de subdominio -> id de la compañía activa."""
+
+    def __init__(self, alias=DEFAULT_TENANT_CACHE_ALIAS, ttl=DEFAULT_TENANT_CACHE_TTL,
+                 negative_ttl=DEFAULT_TENANT_CACHE_NEGATIVE_TTL):
+        self.alias = alias
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _key(self, generation, subdomain):
+        return f'tenant:{generation}:{subdomain}'
+
+    def _generation(self):
+        generation = self.cache.get(GENERATION_KEY)
+        if generation is None:
+            # Generación nueva (primera vez o desalojada): las entradas anteriores quedan inaccesibles
+            self.cache.add(GENERATION_KEY, uuid.uuid4().hex, timeout=None)
+            generation = self.cache.get(GENERATION_KEY)
+        return generation
+
+    async def _ageneration(self):
+        generation = await self.cache.aget(GENERATION_KEY)
+        if generation is None:
+            await self.cache.aadd(GENERATION_KEY, uuid.uuid4().hex, timeout=None)
+            generation = await self.cache.aget(GENERATION_KEY)
+        return generation
+
+    def _value(self, company_id):
+        """Valor a guardar y su expiración."""
+        if company_id is None:
+            return _MISSING, self.negative_ttl
+        return str(company_id), self.ttl
+
+    def _result(self, value):
+        return uuid.UUID(value) if value else None
+
+    def get(self, subdomain):
+        """Id de la compañía activa del subdominio o ``None`` (consulta la base solo si no está en caché)."""
+        key = self._key(self._generation(), subdomain.lower())
+        value = self.cache.get(key)
+        if value is None:
+            company_id = Company.objects.filter(subdomain=subdomain.lower()).values_list('id', flat=True).first()
+            value, timeout = self._value(company_id)
+            self.cache.set(key, value, timeout)
+        return self._result(value)
+
+    async def aget(self, subdomain):
+        """Versión async de ``get`` (ORM async en caso de fallo de caché)."""
+        key = self._key(await self._ageneration(), subdomain.lower())
+        value = await self.cache.aget(key)
+        if value is None:
+            company_id = await Company.objects.filter(subdomain=subdomain.lower()).values_list('id', flat=True).afirst()
+            value, timeout = self._value(company_id)
+            await self.cache.aset(key, value, timeout)
+        return self._result(value)
+
+    def invalidate(self):
+        """Descartar todas las entradas (cualquier cambio de una compañía renueva la generación)."""
+        self.cache.set(GENERATION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+tenant_cache = TenantCache(
+    alias=getattr(settings, 'TENANT_CACHE_ALIAS', DEFAULT_TENANT_CACHE_ALIAS),
+    ttl=getattr(settings, 'TENANT_CACHE_TTL', DEFAULT_TENANT_CACHE_TTL),
+    negative_ttl=getattr(settings, 'TENANT_CACHE_NEGATIVE_TTL', DEFAULT_TENANT_CACHE_NEGATIVE_TTL),
+)
+
+
+def get_subdomain(host, base_domain):
+    """Subdominio de ``host`` bajo ``base_domain`` (``None`` si no aplica)."""
+    domain, _ = split_domain_port(host)
+    base_domain = base_domain.lower().strip('.')
+    if not domain or not base_domain or not domain.endswith(f'.{base_domain}'):
+        return None
+
+    subdomain = domain[:-len(base_domain) - 1]
+    # Solo el primer nivel identifica a la compañía (acme.fleethub.com)
+    if not subdomain or '.' in subdomain:
+        return None
+    return subdomain
+
+
+class TenantMiddleware:
+    """Asigna ``request.company_id`` y ``request.company`` según el subdominio del encabezado Host.
+
+    Sin ``TENANT_BASE_DOMAIN`` o fuera de un subdominio, ambos son ``None`` y
+    las vistas mantienen el filtro manual por ``company``. ``request.company``
+    se carga de la base de datos solo al usarlo (no desde vistas async). Un
+    subdominio sin compañía activa responde 404 para no exponer datos de otros
+    tenants. El alcance lo aplican las vistas de vehículos (lecturas, altas,
+    modificaciones y restauración); las direcciones no tienen compañía y no se
+    filtran por tenant.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.base_domain = getattr(settings, 'TENANT_BASE_DOMAIN', '')
+        # Bajo ASGI no se fuerza a las vistas async a pasar por un hilo
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def get_subdomain(self, request):
+        return get_subdomain(request.get_host(), self.base_domain) if self.base_domain else None
+
+    def not_found(self):
+        return JsonResponse({'error': 'Compañía no encontrada.'}, status=404)
+
+    def set_company(self, request, subdomain, company_id):
+        request.tenant_subdomain = subdomain
+        request.company_id = company_id
+        request.company = SimpleLazyObject(lambda: Company.objects.get(pk=company_id)) if company_id else None
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        subdomain = self.get_subdomain(request)
+        self.set_company(request, subdomain, tenant_cache.get(subdomain) if subdomain else None)
+
+        if subdomain and request.company_id is None:
+            return self.not_found()
+
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        subdomain = self.get_subdomain(request)
+        self.set_company(request, subdomain, await tenant_cache.aget(subdomain) if subdomain else None)
+
+        if subdomain and request.company_id is None:
+            return self.not_found()
+
+        return await self.get_response(request)
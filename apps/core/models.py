@@ -1,10 +1,44 @@
 import uuid
+from datetime import date
 from django.db import models
+from django.db.models.functions import Coalesce, Least, NullIf
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
 from django.utils import timezone
 
+# Condición de los índices parciales: las consultas habituales solo leen registros activos
+ACTIVE_ROWS = models.Q(is_active=True)
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    """QuerySet con eliminación lógica y restauración en bloque.
+
+    Cada operación es un solo UPDATE que también registra los campos de
+    auditoría. No llama a ``save()`` ni emite señales: quien la usa invalida
+    las cachés afectadas (ver ``BulkSoftDeleteMixin``).
+    """
+
+    def soft_delete(self, user=None):
+        return self._set_active(False, user)
+
+    def restore(self, user=None):
+        return self._set_active(True, user)
+
+    def _set_active(self, is_active, user):
+        values = {'is_active': is_active, 'updated_at': timezone.now()}
+        if user is not None:
+            values['updated_by'] = user
+        return self.filter(is_active=not is_active).update(**values)
+
+
+class ActiveManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    """Solo registros activos (``is_active=True``)."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_active=True)
+
+
 class BaseModel(models.Model):
     """Modelo base abstracto con campos comunes de auditoría y gestión."""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, help_text="Identificador único universal")
@@ -14,6 +48,12 @@ class BaseModel(models.Model):
     updated_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="%(app_label)s_%(class)s_updated", help_text="Usuario que actualizó el registro")
     is_active = models.BooleanField(default=True, help_text="Indica si el registro está activo")
 
+    # all_objects se declara primero y queda como manager por defecto de Django
+    # (validación de unicidad, restauración, relaciones inversas): ve también
+    # los registros eliminados lógicamente. objects solo devuelve los activos.
+    all_objects = SoftDeleteQuerySet.as_manager()
+    objects = ActiveManager()
+
     class Meta:
         abstract = True
         ordering = ['-created_at']
@@ -29,11 +69,12 @@ class BaseModel(models.Model):
 
 class TenantBaseModel(BaseModel):
     """Modelo base abstracto para entidades multi-tenant ligadas a una compañía."""
-    company = models.ForeignKey('Company', on_delete=models.CASCADE, help_text="Compañía a la que pertenece este registro")
+    company = models.ForeignKey('core.Company', on_delete=models.CASCADE, help_text="Compañía a la que pertenece este registro")
 
     class Meta:
         abstract = True
-        indexes = [models.Index(fields=['company', 'is_active'])]
+        # Índice parcial: los registros eliminados no ocupan espacio en las consultas de la compañía
+        indexes = [models.Index(fields=['company', '-created_at'], condition=ACTIVE_ROWS, name='%(class)s_co_live_idx')]
 
 
 class Company(BaseModel):
@@ -73,7 +114,7 @@ class Person(TenantBaseModel):
     def __str__(self):
         return self.full_name
 
-    class Meta:
+    class Meta(TenantBaseModel.Meta):
         abstract = True
         unique_together = ['company', 'document_number']
 
@@ -96,6 +137,8 @@ class Address(BaseModel):
     class Meta:
         verbose_name = "Dirección"
         verbose_name_plural = "Direcciones"
+        # Paginación por cursor sobre (created_at, id)
+        indexes = [models.Index(fields=['-created_at', '-id'], condition=ACTIVE_ROWS, name='core_address_keyset_idx')]
 
 
 class Vehicle(TenantBaseModel):
@@ -117,12 +160,134 @@ class Vehicle(TenantBaseModel):
     soat_expiry = models.DateField(null=True, blank=True, help_text="Fecha de vencimiento del SOAT")
     technical_review_expiry = models.DateField(null=True, blank=True, help_text="Fecha de vencimiento de la revisión técnica")
     operation_permit_expiry = models.DateField(null=True, blank=True, help_text="Fecha de vencimiento del permiso de operación")
+    next_document_expiry = models.DateField(null=True, blank=True, editable=False, help_text="Vencimiento más próximo entre SOAT, revisión técnica y permiso de operación")
+
+    EXPIRY_FIELDS = ('soat_expiry', 'technical_review_expiry', 'operation_permit_expiry')
 
     def __str__(self):
         return f"{self.license_plate} - {self.brand} {self.model}"
 
+    def compute_next_document_expiry(self):
+        """Fecha de vencimiento más próxima entre los documentos del vehículo."""
+        dates = [
+            self._meta.get_field(field).to_python(getattr(self, field))
+            for field in self.EXPIRY_FIELDS if getattr(self, field)
+        ]
+        return min(dates) if dates else None
+
+    def save(self, *args, **kwargs):
+        self.next_document_expiry = self.compute_next_document_expiry()
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(self.EXPIRY_FIELDS):
+            kwargs['update_fields'] = set(update_fields) | {'next_document_expiry'}
+
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def refresh_next_document_expiry(cls, queryset=None):
+        """Recalcular ``next_document_expiry`` con un solo UPDATE (filas existentes o cargas masivas)."""
+        # MIN/LEAST con NULL difiere entre motores: se reemplaza NULL por una fecha máxima
+        far_future = models.Value(date.max)
+        earliest = Least(*[Coalesce(field, far_future) for field in cls.EXPIRY_FIELDS])
+        queryset = cls._base_manager.all() if queryset is None else queryset
+        return queryset.update(next_document_expiry=NullIf(earliest, far_future))
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Conservar la compañía cargada para invalidar sus resúmenes si cambia."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_company_id = instance.__dict__.get('company_id')
+        return instance
+
     class Meta:
         verbose_name = "Vehículo"
         verbose_name_plural = "Vehículos"
         unique_together = [['company', 'identifier_number'], ['company', 'license_plate'],
-                           ['company', 'chassis_number']]
\ No newline at end of file
+                           ['company', 'chassis_number']]
+        indexes = [
+            # Paginación por cursor sobre (created_at, id) dentro de cada compañía
+            # Índices parciales (WHERE is_active): los vehículos eliminados no los agrandan
+            models.Index(fields=['company', '-created_at', '-id'], condition=ACTIVE_ROWS, name='core_vehicle_keyset_idx'),
+            # Búsqueda por prefijo de placa (LIKE 'ABC-12%'); opclasses solo aplica en PostgreSQL
+            models.Index(fields=['license_plate'], opclasses=['varchar_pattern_ops'], condition=ACTIVE_ROWS,
+                         name='core_vehicle_plate_prefix_idx'),
+            # Filtros y conteos por estado dentro de la compañía
+            models.Index(fields=['company', 'status'], condition=ACTIVE_ROWS, name='core_vehicle_co_status_idx'),
+            # Consultas "qué vence antes de la fecha X" como un solo rango sobre el índice
+            models.Index(fields=['company', 'next_document_expiry'], condition=ACTIVE_ROWS, name='core_vehicle_co_expiry_idx'),
+            models.Index(fields=['next_document_expiry'], condition=ACTIVE_ROWS, name='core_vehicle_expiry_idx'),
+        ]
+
+
+class VehicleStatusEvent(models.Model):
+    """Cambio de estado de un vehículo (solo inserción).
+
+    Se escribe en la misma transacción que el cambio de ``Vehicle.status``.
+    Con ``old_status`` el estado en cualquier fecha pasada se resuelve incluso
+    para vehículos cuyo primer cambio es posterior a esa fecha (ver
+    ``status_as_of``).
+    """
+    company = models.ForeignKey('Company', on_delete=models.CASCADE, db_index=False, related_name='vehicle_status_events', help_text="Compañía del vehículo")
+    vehicle = models.ForeignKey('Vehicle', on_delete=models.CASCADE, db_index=False, related_name='status_events', help_text="Vehículo")
+    old_status = models.CharField(max_length=20, choices=Vehicle.STATUS_CHOICES, help_text="Estado anterior")
+    status = models.CharField(max_length=20, choices=Vehicle.STATUS_CHOICES, help_text="Estado nuevo")
+    reason = models.CharField(max_length=500, blank=True, help_text="Motivo del cambio")
+    changed_at = models.DateTimeField(default=timezone.now, help_text="Fecha y hora del cambio")
+    changed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', help_text="Usuario que cambió el estado")
+
+    def __str__(self):
+        return f"{self.vehicle_id}: {self.old_status} -> {self.status} ({self.changed_at})"
+
+    @classmethod
+    def status_as_of(cls, moment):
+        """Expresión con el estado de cada vehículo en ``moment``.
+
+        Es el estado del último cambio hasta ``moment``; sin cambios previos, el
+        estado anterior al primer cambio posterior; sin cambios, el estado actual.
+        Cada subconsulta lee una sola entrada del índice (company, vehicle, changed_at).
+        """
+        events = cls.objects.filter(company_id=models.OuterRef('company_id'), vehicle_id=models.OuterRef('pk'))
+        return Coalesce(
+            models.Subquery(events.filter(changed_at__lte=moment).order_by('-changed_at').values('status')[:1]),
+            models.Subquery(events.filter(changed_at__gt=moment).order_by('changed_at').values('old_status')[:1]),
+            models.F('status'),
+        )
+
+    class Meta:
+        verbose_name = "Cambio de estado de vehículo"
+        verbose_name_plural = "Cambios de estado de vehículos"
+        ordering = ['-changed_at']
+        indexes = [
+            models.Index(fields=['company', 'vehicle', 'changed_at'], name='core_vstatus_co_veh_time_idx'),
+        ]
+
+
+class VehicleStatsRollup(models.Model):
+    """Resumen precalculado de estadísticas de vehículos por compañía.
+
+    Se marca como desactualizado (``is_stale``) cada vez que cambia un vehículo
+    de la compañía y se recalcula en la siguiente consulta. ``version`` evita
+    guardar un resumen calculado antes de una invalidación concurrente.
+    """
+    company = models.OneToOneField('Company', on_delete=models.CASCADE, primary_key=True, related_name='vehicle_stats', help_text="Compañía del resumen")
+    data = models.JSONField(default=dict, help_text="Estadísticas calculadas")
+    computed_on = models.DateField(null=True, blank=True, help_text="Fecha de referencia de los documentos vencidos")
+    is_stale = models.BooleanField(default=True, help_text="Indica si el resumen debe recalcularse")
+    version = models.PositiveIntegerField(default=0, help_text="Contador de invalidaciones")
+    updated_at = models.DateTimeField(auto_now=True, help_text="Fecha y hora del último cálculo")
+
+    def __str__(self):
+        return f"Estadísticas de vehículos - {self.company_id}"
+
+    @classmethod
+    def invalidate(cls, company_ids=None):
+        """Marcar como desactualizados los resúmenes de las compañías indicadas (o todos)."""
+        queryset = cls.objects.all()
+        if company_ids is not None:
+            queryset = queryset.filter(company_id__in=[company_id for company_id in company_ids if company_id])
+        queryset.update(is_stale=True, version=models.F('version') + 1)
+
+    class Meta:
+        verbose_name = "Resumen de vehículos"
+        verbose_name_plural = "Resúmenes de vehículos"
\ No newline at end of file
@@ -0,0 +1,152 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+import uuid
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Paginación por cursor (keyset) sobre ``(created_at, id)``.
+
+    Cada página filtra a partir de la última fila de la anterior en lugar de
+    usar OFFSET, y no ejecuta COUNT(*): el costo de una página profunda es el
+    mismo que el de la primera. Requiere un índice sobre ``(-created_at, -id)``.
+
+    La condición ``(created_at, id) < (t, id)`` se expresa como un OR, que la
+    base de datos no convierte en un rango del índice; por eso se agrega la
+    cota ``created_at <= t``, que sí recorre el índice desde el cursor.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        position, reverse = self.decode_cursor(request)
+
+        if reverse:
+            queryset = queryset.order_by('created_at', 'id')
+            if position:
+                queryset = queryset.filter(
+                    Q(created_at__gt=position[0]) | Q(created_at=position[0], id__gt=position[1]),
+                    created_at__gte=position[0],
+                )
+        else:
+            queryset = queryset.order_by('-created_at', '-id')
+            if position:
+                queryset = queryset.filter(
+                    Q(created_at__lt=position[0]) | Q(created_at=position[0], id__lt=position[1]),
+                    created_at__lte=position[0],
+                )
+
+        # Una fila extra indica si existe otra página en la misma dirección
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.first_position = self.get_position(rows[0]) if rows else None
+        self.last_position = self.get_position(rows[-1]) if rows else None
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+            if size > 0:
+                return min(size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def get_position(self, row):
+        # Las filas pueden ser instancias o diccionarios de values()
+        if isinstance(row, dict):
+            return row['created_at'], row['id']
+        return row.created_at, row.id
+
+    def decode_cursor(self, request):
+        """Devuelve ``((created_at, id) | None, reverse)`` a partir del parámetro cursor."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            decoded = urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+            direction, created_at, pk = decoded.split('|')
+            if direction not in ('n', 'p'):
+                raise ValueError
+            return (datetime.fromisoformat(created_at), uuid.UUID(pk)), direction == 'p'
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position, reverse):
+        created_at, pk = position
+        raw = f"{'p' if reverse else 'n'}|{created_at.isoformat()}|{pk}"
+        encoded = urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or self.last_position is None:
+            return None
+        return self.encode_cursor(self.last_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first_position is None:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.first_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class KeysetPaginationMixin:
+    """Activa ``KeysetPagination`` con ``?pagination=cursor`` (o al recibir ``cursor``).
+
+    Sin esos parámetros se mantiene la paginación por defecto de REST_FRAMEWORK.
+    """
+
+    keyset_pagination_class = KeysetPagination
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if params.get('pagination') == 'cursor' or params.get(KeysetPagination.cursor_query_param):
+                self._paginator = self.keyset_pagination_class()
+                return self._paginator
+        return super().paginator
@@ -86,7 +86,11 @@ class AddressListSerializer(serializers.ModelSerializer):
         return ", ".join(filter(None, parts))
 
     def get_related_object(self, obj):
-        """Información del objeto relacionado."""
+        """Información del objeto relacionado.
+
+        Se sirve del ``prefetch_related('content_object')`` de la vista; sin él
+        cada fila consulta su objeto relacionado.
+        """
         if obj.content_object:
             return {
                 'type': obj.content_type.model,
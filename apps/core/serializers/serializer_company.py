@@ -70,7 +70,7 @@ class CompanyCreateSerializer(serializers.ModelSerializer):
             )
 
         # Verificar que no existe
-        if Company.objects.filter(subdomain=value).exists():
+        if Company.all_objects.filter(subdomain=value).exists():
             raise serializers.ValidationError(
                 "Ya existe una compañía con este subdominio."
             )
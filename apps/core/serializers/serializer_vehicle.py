@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from apps.core.models import (Company, Address, Vehicle)
 from django.utils import timezone
+from django.utils.functional import cached_property
 from datetime import timedelta
 
 # # # SERIALIZADORES DEL MODELO VEHICLE # # #
@@ -30,18 +31,23 @@ class VehicleSerializer(serializers.ModelSerializer):
             'days_until_technical_review_expiry', 'days_until_operation_permit_expiry',
             'vehicle_age', 'is_active', 'created_at', 'updated_at'
         ]
+        # El estado solo cambia con update_status / bulk_status, que registran el historial
         read_only_fields = [
-            'id', 'created_at', 'updated_at', 'status_changed_at',
+            'id', 'created_at', 'updated_at', 'status', 'status_changed_at',
             'company_name', 'status_display'
         ]
 
+    @cached_property
+    def reference_date(self):
+        """Fecha de referencia de los cálculos (una vez por serializer, no por campo)."""
+        return timezone.now().date()
+
     def get_days_until_soat_expiry(self, obj):
         """Calcular días hasta vencimiento del SOAT."""
         if not obj.soat_expiry:
             return None
 
-        today = timezone.now().date()
-        days = (obj.soat_expiry - today).days
+        days = (obj.soat_expiry - self.reference_date).days
         return days
 
     def get_days_until_technical_review_expiry(self, obj):
@@ -49,8 +55,7 @@ class VehicleSerializer(serializers.ModelSerializer):
         if not obj.technical_review_expiry:
             return None
 
-        today = timezone.now().date()
-        days = (obj.technical_review_expiry - today).days
+        days = (obj.technical_review_expiry - self.reference_date).days
         return days
 
     def get_days_until_operation_permit_expiry(self, obj):
@@ -58,8 +63,7 @@ class VehicleSerializer(serializers.ModelSerializer):
         if not obj.operation_permit_expiry:
             return None
 
-        today = timezone.now().date()
-        days = (obj.operation_permit_expiry - today).days
+        days = (obj.operation_permit_expiry - self.reference_date).days
         return days
 
     def get_vehicle_age(self, obj):
@@ -142,23 +146,138 @@ class VehicleCreateSerializer(serializers.ModelSerializer):
 
         # Verificar unicidad dentro de la compañía
         if company:
-            if Vehicle.objects.filter(company=company, license_plate=license_plate).exists():
+            if Vehicle.all_objects.filter(company=company, license_plate=license_plate).exists():
                 raise serializers.ValidationError(
                     "Ya existe un vehículo con esta placa en la compañía."
                 )
 
-            if Vehicle.objects.filter(company=company, chassis_number=chassis_number).exists():
+            if Vehicle.all_objects.filter(company=company, chassis_number=chassis_number).exists():
                 raise serializers.ValidationError(
                     "Ya existe un vehículo con este número de chasis en la compañía."
                 )
 
-            if Vehicle.objects.filter(company=company, identifier_number=identifier_number).exists():
+            if Vehicle.all_objects.filter(company=company, identifier_number=identifier_number).exists():
                 raise serializers.ValidationError(
                     "Ya existe un vehículo con este número identificador en la compañía."
                 )
 
         return attrs
 
+class VehicleBulkItemSerializer(VehicleCreateSerializer):
+    """Serializer de cada elemento del alta/actualización masiva de vehículos.
+
+    La compañía y la unicidad por compañía se resuelven para todo el lote con
+    ``find_vehicle_uniqueness_conflicts``, por lo que aquí no se consulta la
+    base de datos por elemento.
+    """
+
+    id = serializers.UUIDField(required=False)
+    company = serializers.UUIDField()
+
+    class Meta(VehicleCreateSerializer.Meta):
+        fields = ['id'] + VehicleCreateSerializer.Meta.fields
+        validators = []
+
+    def validate(self, attrs):
+        """La unicidad se valida por lotes."""
+        return attrs
+
+
+# Campos únicos por compañía (unique_together de Vehicle)
+VEHICLE_UNIQUE_FIELDS = {
+    'license_plate': "Ya existe un vehículo con esta placa en la compañía.",
+    'chassis_number': "Ya existe un vehículo con este número de chasis en la compañía.",
+    'identifier_number': "Ya existe un vehículo con este número identificador en la compañía.",
+}
+
+
+def find_vehicle_uniqueness_conflicts(entries):
+    """Validar la unicidad por compañía de un lote de vehículos.
+
+    ``entries`` es una lista de diccionarios con ``index``, ``id`` (None para
+    altas), ``company_id`` y los valores finales de los campos de
+    ``VEHICLE_UNIQUE_FIELDS``. Se hace una consulta por campo único, sin
+    importar el tamaño del lote, y se detectan también los duplicados dentro
+    del propio lote.
+
+    Se valida el estado final: los vehículos que el lote actualiza liberan sus
+    valores actuales, por lo que se aceptan intercambios (dos vehículos que
+    intercambian sus placas) y cadenas de cambios. Si la actualización de uno
+    de ellos no es válida, sus valores actuales se mantienen ocupados.
+    Devuelve un diccionario ``index -> {campo: [errores]}``.
+    """
+    company_ids = {entry['company_id'] for entry in entries}
+
+    # Valores ya guardados (incluye registros inactivos): una consulta por campo
+    existing = {}
+    for field in VEHICLE_UNIQUE_FIELDS:
+        values = {entry[field] for entry in entries}
+        existing[field] = {
+            (company_id, value): vehicle_id
+            for vehicle_id, company_id, value in Vehicle._base_manager.filter(
+                company_id__in=company_ids, **{f'{field}__in': values}
+            ).values_list('id', 'company_id', field)
+        }
+
+    released = {entry['id'] for entry in entries if entry['id'] is not None}
+    while True:
+        conflicts = _uniqueness_conflicts(entries, existing, released)
+        blocked = {entry['id'] for entry in entries if entry['index'] in conflicts and entry['id'] in released}
+        if not blocked:
+            return conflicts
+        released -= blocked
+
+
+def _uniqueness_conflicts(entries, existing, released):
+    """Conflictos del lote si los vehículos ``released`` liberan sus valores actuales."""
+    conflicts = {}
+
+    def add_error(index, field, message):
+        conflicts.setdefault(index, {}).setdefault(field, []).append(message)
+
+    for field, message in VEHICLE_UNIQUE_FIELDS.items():
+        # Duplicados dentro del lote
+        seen = {}
+        for entry in entries:
+            key = (entry['company_id'], entry[field])
+            if key in seen:
+                add_error(entry['index'], field,
+                          f"Valor duplicado en la solicitud (elemento {seen[key]}).")
+            else:
+                seen[key] = entry['index']
+
+        # Duplicados contra la base de datos
+        for entry in entries:
+            vehicle_id = existing[field].get((entry['company_id'], entry[field]))
+            if vehicle_id is not None and vehicle_id != entry['id'] and vehicle_id not in released:
+                add_error(entry['index'], field, message)
+
+    return conflicts
+
+
+# Alertas de vencimiento: (campo, mensaje vencido, mensaje próximo a vencer)
+EXPIRY_ALERTS = (
+    ('soat_expiry', "SOAT vencido", "SOAT próximo a vencer"),
+    ('technical_review_expiry', "Revisión técnica vencida", "Revisión técnica próxima a vencer"),
+    ('operation_permit_expiry', "Permiso vencido", "Permiso próximo a vencer"),
+)
+
+# Días de anticipación para las alertas de los listados
+ALERT_DAYS = 30
+
+
+def get_expiry_alerts(dates, today):
+    """Alertas de vencimiento a partir de las fechas ``(soat, revisión técnica, permiso)``."""
+    alert_threshold = today + timedelta(days=ALERT_DAYS)
+    alerts = []
+
+    for expiry, (_, expired_message, expiring_message) in zip(dates, EXPIRY_ALERTS):
+        if expiry and expiry <= alert_threshold:
+            alerts.append(expired_message if expiry < today else expiring_message)
+
+    return alerts
+
+
 class VehicleListSerializer(serializers.ModelSerializer):
     """Serializer simplificado para listados."""
 
@@ -173,36 +292,77 @@ class VehicleListSerializer(serializers.ModelSerializer):
             'alert_status', 'created_at'
         ]
 
+    @cached_property
+    def reference_date(self):
+        """Fecha de referencia de las alertas (una vez por serializer, no por fila)."""
+        return timezone.now().date()
+
     def get_vehicle_info(self, obj):
         """Información resumida del vehículo."""
         return f"{obj.brand} {obj.model} ({obj.year})"
 
     def get_alert_status(self, obj):
         """Estado de alertas por vencimientos."""
-        today = timezone.now().date()
-        alert_threshold = today + timedelta(days=30)  # 30 días de alerta
+        dates = [getattr(obj, field) for field, _, _ in EXPIRY_ALERTS]
+        return get_expiry_alerts(dates, self.reference_date)
+
+
+class VehicleListReadSerializer(serializers.BaseSerializer):
+    """Serialización de solo lectura para listados y búsquedas de vehículos.
+
+    Produce la misma salida que ``VehicleListSerializer`` a partir de
+    diccionarios de ``values(*columns)``: sin instancias del modelo ni campos
+    de DRF por fila, y con la fecha de referencia calculada una sola vez.
+    """
+
+    columns = (
+        'id', 'license_plate', 'brand', 'model', 'year', 'status',
+        'soat_expiry', 'technical_review_expiry', 'operation_permit_expiry', 'created_at',
+    )
+
+    status_labels = dict(Vehicle.STATUS_CHOICES)
+
+    @cached_property
+    def reference_date(self):
+        return timezone.now().date()
+
+    @cached_property
+    def created_at_field(self):
+        # Mismo formato (zona horaria e ISO 8601) que el campo del ModelSerializer
+        return serializers.DateTimeField()
+
+    def to_representation(self, row):
+        status_value = row['status']
+        dates = (row['soat_expiry'], row['technical_review_expiry'], row['operation_permit_expiry'])
+        return {
+            'id': str(row['id']),
+            'license_plate': row['license_plate'],
+            'vehicle_info': f"{row['brand']} {row['model']} ({row['year']})",
+            'status': status_value,
+            'status_display': str(self.status_labels.get(status_value, status_value)),
+            'alert_status': get_expiry_alerts(dates, self.reference_date),
+            'created_at': self.created_at_field.to_representation(row['created_at']),
+        }
 
-        alerts = []
 
-        if obj.soat_expiry and obj.soat_expiry <= alert_threshold:
-            if obj.soat_expiry < today:
-                alerts.append("SOAT vencido")
-            else:
-                alerts.append("SOAT próximo a vencer")
+# Transiciones de estado permitidas (un vehículo revocado no cambia de estado)
+VEHICLE_STATUS_TRANSITIONS = {
+    'active': ['suspended', 'revoked'],
+    'suspended': ['active', 'revoked'],
+    'revoked': [],
+}
 
-        if obj.technical_review_expiry and obj.technical_review_expiry <= alert_threshold:
-            if obj.technical_review_expiry < today:
-                alerts.append("Revisión técnica vencida")
-            else:
-                alerts.append("Revisión técnica próxima a vencer")
 
-        if obj.operation_permit_expiry and obj.operation_permit_expiry <= alert_threshold:
-            if obj.operation_permit_expiry < today:
-                alerts.append("Permiso vencido")
-            else:
-                alerts.append("Permiso próximo a vencer")
+def vehicle_status_transition_error(current_status, value):
+    """Mensaje de error de la transición ``current_status`` -> ``value`` o ``None`` si está permitida."""
+    if current_status == 'revoked' and value != 'revoked':
+        return "No se puede cambiar el estado de un vehículo revocado."
+
+    if value not in VEHICLE_STATUS_TRANSITIONS.get(current_status, []) and value != current_status:
+        return f"No se puede cambiar de {current_status} a {value}."
+
+    return None
 
-        return alerts
 
 class VehicleStatusUpdateSerializer(serializers.Serializer):
     """Serializer para actualización de estado del vehículo."""
@@ -217,23 +377,16 @@ class VehicleStatusUpdateSerializer(serializers.Serializer):
         if not instance:
             return value
 
-        current_status = instance.status
+        error = vehicle_status_transition_error(instance.status, value)
+        if error:
+            raise serializers.ValidationError(error)
 
-        # Definir transiciones permitidas
-        allowed_transitions = {
-            'active': ['suspended', 'revoked'],
-            'suspended': ['active', 'revoked'],
-            'revoked': []  # Una vez revocado, no se puede cambiar
-        }
+        return value
 
-        if current_status == 'revoked' and value != 'revoked':
-            raise serializers.ValidationError(
-                "No se puede cambiar el estado de un vehículo revocado."
-            )
 
-        if value not in allowed_transitions.get(current_status, []) and value != current_status:
-            raise serializers.ValidationError(
-                f"No se puede cambiar de {current_status} a {value}."
-            )
+class VehicleBulkStatusSerializer(serializers.Serializer):
+    """Serializer para el cambio de estado masivo (por ``ids`` o por los filtros del listado)."""
 
-        return value
\ No newline at end of file
+    status = serializers.ChoiceField(choices=Vehicle.STATUS_CHOICES)
+    reason = serializers.CharField(max_length=500, required=False, allow_blank=True)
+    ids = serializers.ListField(child=serializers.UUIDField(), required=False, allow_empty=False, max_length=10000)
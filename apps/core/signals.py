@@ -0,0 +1,44 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.core.middleware.tenant import tenant_cache
+from apps.core.models import Company, Vehicle, VehicleStatsRollup
+from apps.core.utils.vehicle_search import ngram_index
+
+
+@receiver([post_save, post_delete], sender=Vehicle)
+def invalidate_vehicle_stats(sender, instance, **kwargs):
+    """Invalidar el resumen de estadísticas de la compañía del vehículo."""
+    company_ids = {instance.company_id, getattr(instance, '_loaded_company_id', None)}
+    VehicleStatsRollup.invalidate(company_ids)
+
+
+@receiver(post_save, sender=Vehicle)
+def index_vehicle_for_search(sender, instance, **kwargs):
+    """Mantener actualizado el índice de búsqueda en memoria."""
+    ngram_index.update(instance)
+
+
+@receiver(post_delete, sender=Vehicle)
+def unindex_vehicle_for_search(sender, instance, **kwargs):
+    ngram_index.remove(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Company)
+def invalidate_tenant_cache(sender, instance, **kwargs):
+    """Quitar la compañía de la caché de tenants (cambio de subdominio o desactivación)."""
+    tenant_cache.invalidate()
+
+
+try:
+    from cities_light.models import City, Country, Region
+    from apps.core.utils.geo_snapshot import geo_snapshot
+except ImportError:
+    pass
+else:
+    @receiver([post_save, post_delete], sender=Country)
+    @receiver([post_save, post_delete], sender=Region)
+    @receiver([post_save, post_delete], sender=City)
+    def invalidate_geo_snapshot(sender, **kwargs):
+        """Descartar el snapshot geográfico tras una importación de Cities Light."""
+        geo_snapshot.invalidate()
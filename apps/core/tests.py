@@ -0,0 +1,955 @@
+import csv
+import json
+import os
+import tempfile
+import uuid
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import CommandError, call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.core.db_router import ReplicaRouter, begin_request, end_request
+from apps.core.middleware.replicas import PIN_COOKIE_NAME, ReplicaRoutingMiddleware
+from apps.core.middleware.tenant import TenantCache, tenant_cache
+from apps.core.middleware.sql_metrics import SQLMetricsMiddleware
+from apps.core.models import Address, Company, Vehicle, VehicleStatsRollup, VehicleStatusEvent
+from apps.core.serializers.serializer_vehicle import VehicleListReadSerializer, VehicleListSerializer
+from apps.core.utils.bulk_loader import BulkLoader
+from apps.core.utils.fleet_data import FleetGenerator
+from apps.core.utils.json_rewrite import rewrite_company_ids
+from apps.core.utils import vehicle_search
+from apps.core.utils.vehicle_search import ngram_index
+from apps.core.utils.vehicle_stats import get_company_vehicle_stats
+
+
+class BulkLoaderTests(TestCase):
+    """Un registro inválido no descarta el resto de su lote."""
+
+    def test_failed_batch_is_loaded_row_by_row(self):
+        records = [
+            {'name': f'Compañía {i}', 'subdomain': f'compania-{i}', 'legal_name': f'Compañía {i} S.A.',
+             'tax_id': '0000000000001' if i == 2 else f'{i:013d}'}
+            for i in range(4)
+        ]
+        loader = BulkLoader(Company, ('subdomain',), build=lambda data: Company(**data), batch_size=10)
+        stats = loader.run(records)
+
+        self.assertEqual((stats.created, stats.failed, stats.batches), (3, 1, 1))
+        self.assertEqual(len(stats.errors), 1)
+        self.assertIn('Compañía 2', stats.errors[0][1])
+        self.assertEqual(
+            set(Company.all_objects.values_list('subdomain', flat=True)),
+            {'compania-0', 'compania-1', 'compania-3'}
+        )
+
+
+class VehicleBulkUpsertTests(TestCase):
+    """El alta/actualización masiva valida la unicidad contra la base de datos y dentro del lote."""
+
+    url = '/api/vehicles/bulk/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(
+            name='Compañía', subdomain='compania', legal_name='Compañía S.A.', tax_id='0000000000001'
+        )
+        cls.vehicles = [
+            Vehicle.objects.create(
+                company=cls.company, identifier_number=f'ID-{i}', license_plate=f'ABC-{i:04d}',
+                chassis_number=f'CH-{i}', brand='Honda', model='Wave', year=2020, color='Rojo',
+                engine_displacement=125
+            )
+            for i in range(2)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def new_vehicle(self, i, **fields):
+        return {
+            'company': str(self.company.id), 'identifier_number': f'ID-{i}', 'license_plate': f'ABC-{i:04d}',
+            'chassis_number': f'CH-{i}', 'brand': 'Bajaj', 'model': 'RE', 'year': 2022, 'color': 'Azul',
+            'engine_displacement': 200, **fields
+        }
+
+    def post(self, vehicles, **params):
+        return self.client.post(self.url + ('?atomic=true' if params.get('atomic') else ''),
+                                {'vehicles': vehicles}, format='json')
+
+    def test_mixed_create_and_update(self):
+        response = self.post([self.new_vehicle(10), {'id': str(self.vehicles[0].id), 'color': 'Verde'}])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['created'], response.data['updated'], response.data['errors']), (1, 1, 0))
+        self.assertEqual([result['status'] for result in response.data['results']], ['created', 'updated'])
+        self.assertEqual(Vehicle.objects.get(id=self.vehicles[0].id).color, 'Verde')
+        self.assertTrue(Vehicle.objects.filter(license_plate='ABC-0010').exists())
+
+    def test_conflicts_with_database_and_within_payload(self):
+        response = self.post([
+            self.new_vehicle(10, license_plate='ABC-0001'),
+            self.new_vehicle(11),
+            self.new_vehicle(12, chassis_number='CH-11'),
+            {'id': str(self.vehicles[0].id), 'identifier_number': 'ID-1'},
+        ])
+        self.assertEqual(response.status_code, 207)
+        results = response.data['results']
+        self.assertEqual([result['status'] for result in results], ['error', 'created', 'error', 'error'])
+        self.assertIn('license_plate', results[0]['errors'])
+        self.assertEqual(results[2]['errors']['chassis_number'], ['Valor duplicado en la solicitud (elemento 1).'])
+        self.assertIn('identifier_number', results[3]['errors'])
+
+        response = self.post([self.new_vehicle(20), self.new_vehicle(21, license_plate='ABC-0020')], atomic=True)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Vehicle.objects.filter(identifier_number='ID-20').exists())
+
+    def test_license_plate_swap(self):
+        first, second = self.vehicles
+        response = self.post([
+            {'id': str(first.id), 'license_plate': second.license_plate},
+            {'id': str(second.id), 'license_plate': first.license_plate},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            dict(Vehicle.objects.values_list('id', 'license_plate')),
+            {first.id: second.license_plate, second.id: first.license_plate}
+        )
+
+        # Si una de las actualizaciones no es válida, la otra choca con el valor que se mantiene
+        response = self.post([
+            {'id': str(first.id), 'license_plate': first.license_plate},
+            {'id': str(second.id), 'license_plate': second.license_plate, 'year': 'nuevo'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.data['results'][0]['errors']), ['license_plate'])
+
+
+
+@override_settings(TENANT_BASE_DOMAIN='fleethub.test', ALLOWED_HOSTS=['.fleethub.test'])
+class VehicleBulkTenantTests(TestCase):
+    """Con subdominio, el alta/actualización masiva solo afecta a la compañía del tenant."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, cls.other = [
+            Company.objects.create(
+                name=name, subdomain=name.lower(), legal_name=f'{name} S.A.', tax_id=f'000000000000{i}'
+            )
+            for i, name in enumerate(('Acme', 'Otra'), start=1)
+        ]
+        cls.other_vehicle = Vehicle.objects.create(
+            company=cls.other, identifier_number='ID-1', license_plate='ABC-0001', chassis_number='CH-1',
+            brand='Honda', model='Wave', year=2020, color='Rojo', engine_displacement=125
+        )
+
+    def setUp(self):
+        tenant_cache.invalidate()
+        self.client = APIClient()
+
+    def post(self, vehicles):
+        return self.client.post('/api/vehicles/bulk/', {'vehicles': vehicles}, format='json',
+                                HTTP_HOST='acme.fleethub.test')
+
+    def test_other_tenant_vehicles_are_not_updated(self):
+        response = self.post([{'id': str(self.other_vehicle.id), 'color': 'Verde'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['results'][0]['errors'], {'id': ['Vehículo no encontrado.']})
+        self.other_vehicle.refresh_from_db()
+        self.assertEqual(self.other_vehicle.color, 'Rojo')
+
+    def test_items_are_created_in_the_tenant_company(self):
+        fields = {
+            'identifier_number': 'ID-2', 'license_plate': 'ABC-0002', 'chassis_number': 'CH-2', 'brand': 'Bajaj',
+            'model': 'RE', 'year': 2022, 'color': 'Azul', 'engine_displacement': 200
+        }
+        response = self.post([{'company': str(self.other.id), **fields}, fields])
+        self.assertEqual(response.status_code, 207)
+        self.assertIn('company', response.data['results'][0]['errors'])
+        self.assertEqual(response.data['results'][1]['status'], 'created')
+        self.assertEqual(Vehicle.objects.get(license_plate='ABC-0002').company_id, self.company.id)
+        self.assertEqual(Vehicle.objects.filter(company=self.other).count(), 1)
+
+class VehicleStatsRollupTests(TestCase):
+    """Las estadísticas por compañía se sirven del resumen y se invalidan con cada cambio."""
+
+    url = '/api/vehicles/stats/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(
+            name='Compañía', subdomain='compania', legal_name='Compañía S.A.', tax_id='0000000000001'
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def create_vehicle(self, i):
+        return Vehicle.objects.create(
+            company=self.company, identifier_number=f'ID-{i}', license_plate=f'ABC-{i:04d}',
+            chassis_number=f'CH-{i}', brand='Honda', model='Wave', year=2020, color='Rojo',
+            engine_displacement=125
+        )
+
+    def stats(self):
+        response = self.client.get(self.url, {'company': str(self.company.id)})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_rollup_is_invalidated_by_changes(self):
+        vehicle = self.create_vehicle(1)
+        self.assertEqual(self.stats()['total_vehicles'], 1)
+        with self.assertNumQueries(1):
+            self.stats()
+
+        self.create_vehicle(2)
+        self.assertEqual(self.stats()['total_vehicles'], 2)
+
+        vehicle.status = 'suspended'
+        vehicle.save()
+        self.assertEqual(self.stats()['status_breakdown'], {'active': 1, 'suspended': 1})
+
+        vehicle.soft_delete()
+        self.assertEqual(self.stats()['total_vehicles'], 1)
+
+        self.client.post('/api/vehicles/bulk_soft_delete/', {'ids': [str(vehicle.id) for vehicle in Vehicle.objects.all()]},
+                         format='json')
+        self.assertEqual(self.stats()['total_vehicles'], 0)
+
+    def test_unknown_company_returns_empty_stats(self):
+        response = self.client.get(self.url, {'company': str(uuid.uuid4())})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_vehicles'], 0)
+        self.assertFalse(VehicleStatsRollup.objects.exists())
+
+    @override_settings(DATABASE_ROUTERS=['apps.core.db_router.ReplicaRouter'])
+    def test_rollup_refresh_is_not_a_client_write(self):
+        self.create_vehicle(1)
+        state, token = begin_request(None)
+        try:
+            self.assertEqual(get_company_vehicle_stats(self.company.id, timezone.localdate())['total_vehicles'], 1)
+        finally:
+            end_request(token)
+        # Guardar el resumen no fija al cliente a la base principal
+        self.assertFalse(state.wrote)
+        self.assertFalse(VehicleStatsRollup.objects.get(company=self.company).is_stale)
+
+
+class KeysetPaginationTests(TestCase):
+    """La paginación por cursor recorre todas las filas en ambos sentidos, incluso con fechas repetidas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        company = Company.objects.create(
+            name='Compañía', subdomain='compania', legal_name='Compañía S.A.', tax_id='0000000000001'
+        )
+        now = timezone.now()
+        for i in range(7):
+            vehicle = Vehicle.objects.create(
+                company=company, identifier_number=f'ID-{i}', license_plate=f'ABC-{i:04d}',
+                chassis_number=f'CH-{i}', brand='Honda', model='Wave', year=2020, color='Rojo',
+                engine_displacement=125
+            )
+            # Tres grupos con la misma fecha de creación
+            Vehicle.objects.filter(id=vehicle.id).update(created_at=now - timedelta(minutes=i // 3))
+        cls.expected = [str(pk) for pk in Vehicle.objects.order_by('-created_at', '-id').values_list('id', flat=True)]
+
+    def test_walk_pages_forward_and_back(self):
+        client = APIClient()
+        pages = []
+        url = '/api/vehicles/?pagination=cursor&page_size=2'
+        while url:
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([item['id'] for item in response.data['results']])
+            previous, url = response.data['previous'], response.data['next']
+
+        self.assertEqual(len(pages), 4)
+        self.assertEqual([pk for page in pages for pk in page], self.expected)
+
+        for page in reversed(pages[:-1]):
+            response = client.get(previous)
+            self.assertEqual([item['id'] for item in response.data['results']], page)
+            previous = response.data['previous']
+        self.assertIsNone(previous)
+
+
+class VehicleSearchTests(TestCase):
+    """La búsqueda encuentra placas parciales y errores de escritura dentro de la compañía."""
+
+    url = '/api/vehicles/search/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.companies = [
+            Company.objects.create(
+                name=f'Compañía {i}', subdomain=f'compania-{i}', legal_name=f'Compañía {i} S.A.', tax_id=f'{i:013d}'
+            )
+            for i in range(2)
+        ]
+        cls.vehicles = [
+            Vehicle.objects.create(
+                company=company, identifier_number=f'ID-{i}', license_plate=plate, chassis_number=f'CH-{i}',
+                brand=brand, model='RE', year=2020, color='Rojo', engine_displacement=125
+            )
+            for i, (company, plate, brand) in enumerate((
+                (cls.companies[0], 'ABC-1234', 'Bajaj'),
+                (cls.companies[0], 'XYZ-9876', 'Honda'),
+                (cls.companies[1], 'ABD-1234', 'Bajaj'),
+            ))
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        ngram_index.reset()
+        self.addCleanup(ngram_index.reset)
+
+    def search(self, query, company=None):
+        params = {'q': query}
+        if company is not None:
+            params['company'] = str(company.id)
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [item['license_plate'] for item in response.data['results']]
+
+    def test_plate_substring_and_prefix(self):
+        self.assertEqual(self.search('1234', self.companies[0]), ['ABC-1234'])
+        self.assertEqual(self.search('abc12'), ['ABC-1234'])
+
+    def test_typo_matches_by_trigrams(self):
+        self.assertEqual(self.search('Bajsj', self.companies[0]), ['ABC-1234'])
+
+    def test_results_are_scoped_to_company(self):
+        self.assertEqual(sorted(self.search('Bajaj')), ['ABC-1234', 'ABD-1234'])
+        self.assertEqual(self.search('Bajaj', self.companies[1]), ['ABD-1234'])
+
+        self.vehicles[2].soft_delete()
+        self.assertEqual(self.search('Bajaj'), ['ABC-1234'])
+
+    def test_other_companies_do_not_crowd_out_candidates(self):
+        for i in range(3):
+            Vehicle.objects.create(
+                company=self.companies[1], identifier_number=f'ID-B{i}', license_plate=f'BCD-{i:04d}',
+                chassis_number=f'CH-B{i}', brand='Bajaj', model='RE', year=2020, color='Rojo', engine_displacement=125
+            )
+
+        # Una consulta por candidato: los de la otra compañía no agotan la búsqueda
+        with mock.patch.object(vehicle_search, 'MAX_NGRAM_CANDIDATES', 1):
+            self.assertEqual(self.search('Bajaj', self.companies[0]), ['ABC-1234'])
+            self.assertEqual(len(self.search('Bajaj')), 5)
+
+
+@override_settings(TENANT_BASE_DOMAIN='fleethub.test', ALLOWED_HOSTS=['.fleethub.test'])
+class TenantMiddlewareTests(TestCase):
+    """El subdominio resuelve la compañía y los cambios de compañías invalidan la caché."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(
+            name='Acme', subdomain='acme', legal_name='Acme S.A.', tax_id='0000000000001'
+        )
+
+    def setUp(self):
+        tenant_cache.invalidate()
+        self.client = APIClient()
+
+    def get(self, subdomain):
+        return self.client.get('/api/vehicles/', HTTP_HOST=f'{subdomain}.fleethub.test')
+
+    def test_deactivated_company_is_not_served(self):
+        self.assertEqual(self.get('acme').status_code, 200)
+        # Resuelta desde la caché: COUNT y página del listado
+        with self.assertNumQueries(2):
+            self.assertEqual(self.get('ACME').status_code, 200)
+
+        self.company.soft_delete()
+        self.assertEqual(self.get('acme').status_code, 404)
+
+        self.company.restore()
+        self.assertEqual(self.get('acme').status_code, 200)
+
+    def test_new_subdomain_replaces_cached_miss(self):
+        self.assertEqual(self.get('nueva').status_code, 404)
+        Company.objects.create(name='Nueva', subdomain='nueva', legal_name='Nueva S.A.', tax_id='0000000000002')
+        self.assertEqual(self.get('nueva').status_code, 200)
+
+    def test_invalidation_is_shared_between_processes(self):
+        # Otra instancia con la misma caché de Django hace las veces de otro worker
+        other = TenantCache()
+        self.assertEqual(other.get('acme'), self.company.id)
+
+        Company.all_objects.filter(id=self.company.id).update(is_active=False)
+        self.assertEqual(other.get('acme'), self.company.id)
+        tenant_cache.invalidate()
+        self.assertIsNone(other.get('acme'))
+
+    def test_writes_are_scoped_to_the_tenant(self):
+        other = Company.objects.create(name='Otra', subdomain='otra', legal_name='Otra S.A.', tax_id='0000000000002')
+        vehicle = Vehicle.objects.create(
+            company=other, identifier_number='ID-1', license_plate='ABC-0001', chassis_number='CH-1',
+            brand='Honda', model='Wave', year=2020, color='Rojo', engine_displacement=125
+        )
+        vehicle.soft_delete()
+        host = {'HTTP_HOST': 'acme.fleethub.test'}
+
+        response = self.client.post(f'/api/vehicles/{vehicle.id}/restore/', **host)
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Vehicle.all_objects.get(id=vehicle.id).is_active)
+
+        # La placa existe en la otra compañía: la unicidad se comprueba en la del subdominio
+        response = self.client.post('/api/vehicles/', {
+            'company': str(other.id), 'identifier_number': 'ID-1', 'license_plate': 'ABC-0001',
+            'chassis_number': 'CH-1', 'brand': 'Bajaj', 'model': 'RE', 'year': 2022, 'color': 'Azul',
+            'engine_displacement': 200
+        }, format='json', **host)
+        self.assertEqual(response.status_code, 201)
+        created = Vehicle.objects.get(company=self.company)
+
+        response = self.client.patch(f'/api/vehicles/{created.id}/', {'company': str(other.id)}, format='json', **host)
+        self.assertEqual(response.status_code, 200)
+        created.refresh_from_db()
+        self.assertEqual(created.company_id, self.company.id)
+
+        response = self.client.post(f'/api/vehicles/{created.id}/restore/', **host)
+        self.assertEqual(response.status_code, 200)
+
+
+class ConditionalGetTests(TestCase):
+    """Los listados responden 304 solo mientras su contenido no cambia."""
+
+    url = '/api/vehicles/'
+
+    @classmethod
+    def setUpTestData(cls):
+        company = Company.objects.create(
+            name='Compañía', subdomain='compania', legal_name='Compañía S.A.', tax_id='0000000000001'
+        )
+        cls.vehicles = [
+            Vehicle.objects.create(
+                company=company, identifier_number=f'ID-{i}', license_plate=f'ABC-{i:04d}',
+                chassis_number=f'CH-{i}', brand='Honda', model='Wave', year=2020, color='Rojo',
+                engine_displacement=125
+            )
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def revalidate(self, etag, **params):
+        return self.client.get(self.url, params, HTTP_IF_NONE_MATCH=etag)
+
+    def test_list_not_modified_until_update(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Last-Modified', response)
+        etag = response['ETag']
+
+        response = self.revalidate(etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        vehicle = self.vehicles[0]
+        vehicle.color = 'Azul'
+        vehicle.save()
+        self.assertEqual(self.revalidate(etag).status_code, 200)
+
+    def test_list_changes_after_soft_delete_and_filter_exit(self):
+        etag = self.client.get(self.url)['ETag']
+        self.vehicles[2].soft_delete()
+        self.assertEqual(self.revalidate(etag).status_code, 200)
+
+        etag = self.client.get(self.url, {'status': 'active'})['ETag']
+        self.client.patch(f'/api/vehicles/{self.vehicles[1].id}/update_status/', {'status': 'suspended'}, format='json')
+        self.assertEqual(self.revalidate(etag, status='active').status_code, 200)
+
+    def test_detail_uses_last_modified(self):
+        url = f'{self.url}{self.vehicles[0].id}/'
+        last_modified = self.client.get(url)['Last-Modified']
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+
+class VehicleListReadSerializerTests(TestCase):
+    """El serializer de listados desde values() produce la misma salida que el ModelSerializer."""
+
+    def test_output_matches_model_serializer(self):
+        company = Company.objects.create(
+            name='Compañía', subdomain='compania', legal_name='Compañía S.A.', tax_id='0000000000001'
+        )
+        today = timezone.localdate()
+        dates = [
+            (None, None, None),
+            (today - timedelta(days=1), today + timedelta(days=10), None),
+            (today + timedelta(days=30), today + timedelta(days=31), today - timedelta(days=400)),
+        ]
+        for i, ((soat, review, permit), vehicle_status) in enumerate(zip(dates, ('active', 'suspended', 'revoked'))):
+            Vehicle.objects.create(
+                company=company, identifier_number=f'ID-{i}', license_plate=f'ABC-{i:04d}',
+                chassis_number=f'CH-{i}', brand='Honda', model='Wave', year=2020, color='Rojo',
+                engine_displacement=125, status=vehicle_status, soat_expiry=soat,
+                technical_review_expiry=review, operation_permit_expiry=permit
+            )
+
+        queryset = Vehicle.objects.order_by('license_plate')
+        expected = VehicleListSerializer(queryset, many=True).data
+        actual = VehicleListReadSerializer(queryset.values(*VehicleListReadSerializer.columns), many=True).data
+
+        self.assertEqual([dict(item) for item in expected], list(actual))
+        self.assertEqual(
+            [item['alert_status'] for item in actual],
+            [[], ['SOAT vencido', 'Revisión técnica próxima a vencer'], ['SOAT próximo a vencer', 'Permiso vencido']]
+        )
+
+
+class ExportTests(TestCase):
+    """Las exportaciones aplican los filtros del listado y escriben CSV o NDJSON."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(
+            name='Compañía', subdomain='compania', legal_name='Compañía S.A.', tax_id='0000000000001'
+        )
+        company_type = ContentType.objects.get_for_model(Company)
+        for i, (brand, city) in enumerate((('Bajaj', 'Manta'), ('Honda', 'Portoviejo'), ('Bajaj', 'Manta'))):
+            Vehicle.objects.create(
+                company=cls.company, identifier_number=f'ID-{i}', license_plate=f'ABC-{i:04d}',
+                chassis_number=f'CH-{i}', brand=brand, model='RE', year=2020, color='Rojo',
+                engine_displacement=125, soat_expiry=date(2030, 1, i + 1) if i else None
+            )
+            Address.objects.create(
+                province='Manabí', city=city, content_type=company_type, object_id=cls.company.id
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def export(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode('utf-8'), response
+
+    def test_vehicle_csv_applies_filters(self):
+        content, response = self.export('/api/vehicles/export/', brand='Bajaj')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('.csv"', response['Content-Disposition'])
+
+        rows = list(csv.DictReader(content.splitlines()))
+        self.assertEqual(sorted(row['license_plate'] for row in rows), ['ABC-0000', 'ABC-0002'])
+        self.assertEqual({row['company_name'] for row in rows}, {'Compañía'})
+        self.assertEqual(sorted(row['soat_expiry'] for row in rows), ['', '2030-01-03'])
+
+    def test_vehicle_ndjson(self):
+        content, response = self.export('/api/vehicles/export/', export_format='ndjson', brand='Bajaj')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+
+        lines = sorted((json.loads(line) for line in content.splitlines()), key=lambda line: line['license_plate'])
+        self.assertEqual(
+            [(line['license_plate'], line['company_id'], line['soat_expiry']) for line in lines],
+            [('ABC-0000', str(self.company.id), None), ('ABC-0002', str(self.company.id), '2030-01-03')]
+        )
+
+    def test_address_export_applies_filters(self):
+        content, _ = self.export('/api/addresses/export/', city='manta')
+        rows = list(csv.DictReader(content.splitlines()))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual({(row['city'], row['content_type']) for row in rows}, {('Manta', 'company')})
+
+    def test_unknown_format_is_rejected(self):
+        for url in ('/api/vehicles/export/', '/api/addresses/export/'):
+            response = self.client.get(url, {'export_format': 'xlsx'})
+            self.assertEqual(response.status_code, 400)
+
+
+class AddressListQueryCountTests(TestCase):
+    """El listado de direcciones resuelve los objetos relacionados por lotes."""
+
+    url = '/api/addresses/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company_type = ContentType.objects.get_for_model(Company)
+        cls.vehicle_type = ContentType.objects.get_for_model(Vehicle)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def create_addresses(self, count):
+        """Crea ``count`` compañías con un vehículo y una dirección para cada uno."""
+        start = Company.objects.count()
+        for i in range(start, start + count):
+            company = Company.objects.create(
+                name=f'Compañía {i}', subdomain=f'compania-{i}', legal_name=f'Compañía {i} S.A.',
+                tax_id=f'{i:013d}'
+            )
+            vehicle = Vehicle.objects.create(
+                company=company, identifier_number=f'ID-{i}', license_plate=f'ABC-{i:04d}',
+                chassis_number=f'CH-{i}', brand='Honda', model='Wave', year=2020, color='Rojo',
+                engine_displacement=125
+            )
+            for content_type, obj in ((self.company_type, company), (self.vehicle_type, vehicle)):
+                Address.objects.create(
+                    province='Manabí', city='Manta', content_type=content_type, object_id=obj.id
+                )
+
+    def test_list_query_count_is_constant(self):
+        # COUNT + página + una consulta por tipo de contenido (Company, Vehicle)
+        self.create_addresses(2)
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 4)
+
+        self.create_addresses(8)
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data['results']), 20)
+
+    def test_related_object_summary(self):
+        self.create_addresses(1)
+        response = self.client.get(self.url)
+
+        summaries = {item['related_object']['type']: item['related_object']['name']
+                     for item in response.data['results']}
+        vehicle = Vehicle.objects.get()
+        self.assertEqual(summaries, {
+            'company': vehicle.company.name,
+            'vehicle': str(vehicle),
+        })
+
+
+class VehicleStatusHistoryTests(TestCase):
+    """Los cambios de estado quedan en el historial y se consultan en fechas pasadas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = timezone.now()
+        cls.company = Company.objects.create(
+            name='Compañía', subdomain='compania', legal_name='Compañía S.A.', tax_id='0000000000001'
+        )
+        cls.vehicles = [
+            Vehicle.objects.create(
+                company=cls.company, identifier_number=f'ID-{i}', license_plate=f'ABC-{i:04d}',
+                chassis_number=f'CH-{i}', brand='Honda', model='Wave', year=2020, color='Rojo',
+                engine_displacement=125
+            )
+            for i in range(3)
+        ]
+        Vehicle.objects.update(created_at=cls.now - timedelta(days=10))
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def change_status(self, vehicle, new_status, days_ago):
+        response = self.client.patch(
+            f'/api/vehicles/{vehicle.id}/update_status/', {'status': new_status, 'reason': 'Auditoría'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        VehicleStatusEvent.objects.filter(vehicle=vehicle, status=new_status).update(
+            changed_at=self.now - timedelta(days=days_ago)
+        )
+
+    def status_as_of(self, days_ago, queries=3, **params):
+        at = (self.now - timedelta(days=days_ago)).isoformat()
+        # Resumen por estado, COUNT de la paginación y página
+        with self.assertNumQueries(queries):
+            response = self.client.get('/api/vehicles/status_as_of/', {'at': at, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_status_as_of_past_moments(self):
+        first, second, _ = self.vehicles
+        self.change_status(first, 'suspended', 5)
+        self.change_status(first, 'active', 2)
+        self.change_status(second, 'suspended', 1)
+
+        event = VehicleStatusEvent.objects.filter(vehicle=first).order_by('changed_at').first()
+        self.assertEqual((event.old_status, event.status, event.reason), ('active', 'suspended', 'Auditoría'))
+
+        data = self.status_as_of(3, status='suspended')
+        self.assertEqual([item['id'] for item in data['results']], [first.id])
+        self.assertEqual(data['counts'], {'active': 2, 'suspended': 1, 'revoked': 0})
+
+        data = self.status_as_of(0, status='suspended')
+        self.assertEqual([item['id'] for item in data['results']], [second.id])
+
+        self.assertEqual(self.status_as_of(20, queries=2)['count'], 0)
+
+    def test_status_as_of_is_paginated_and_skips_deleted_vehicles(self):
+        data = self.status_as_of(0, queries=2, pagination='cursor', page_size=2)
+        self.assertEqual((len(data['results']), data['counts']['active']), (2, 3))
+        response = self.client.get(data['next'])
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next'])
+
+        # Eliminado hace 3 días: cuenta antes de esa fecha, no después
+        deleted = self.vehicles[2]
+        Vehicle.objects.filter(id=deleted.id).soft_delete()
+        Vehicle.all_objects.filter(id=deleted.id).update(updated_at=self.now - timedelta(days=3))
+        self.assertIn(str(deleted.id), [str(item['id']) for item in self.status_as_of(5)['results']])
+        self.assertEqual(self.status_as_of(0)['counts'], {'active': 2, 'suspended': 0, 'revoked': 0})
+
+    def test_status_is_read_only_in_vehicle_updates(self):
+        vehicle = self.vehicles[0]
+        response = self.client.patch(f'/api/vehicles/{vehicle.id}/', {'status': 'revoked', 'color': 'Azul'},
+                                     format='json')
+        self.assertEqual(response.status_code, 200)
+        vehicle.refresh_from_db()
+        self.assertEqual((vehicle.status, vehicle.color), ('active', 'Azul'))
+        self.assertFalse(VehicleStatusEvent.objects.exists())
+
+    def test_status_as_of_requires_valid_moment(self):
+        response = self.client.get('/api/vehicles/status_as_of/', {'at': 'ayer'})
+        self.assertEqual(response.status_code, 400)
+
+
+class VehicleBulkActionTests(TestCase):
+    """Los cambios masivos validan transiciones y solo actualizan las filas revisadas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(
+            name='Compañía', subdomain='compania', legal_name='Compañía S.A.', tax_id='0000000000001'
+        )
+        cls.vehicles = [
+            Vehicle.objects.create(
+                company=cls.company, identifier_number=f'ID-{i}', license_plate=f'ABC-{i:04d}',
+                chassis_number=f'CH-{i}', brand='Bajaj' if i % 2 else 'Honda', model='Wave', year=2020,
+                color='Rojo', engine_displacement=125, status='revoked' if i == 0 else 'active'
+            )
+            for i in range(5)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_bulk_status_reports_invalid_transitions(self):
+        ids = [str(vehicle.id) for vehicle in self.vehicles[:3]]
+        response = self.client.post('/api/vehicles/bulk_status/?atomic=true', {'status': 'suspended', 'ids': ids},
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Vehicle.objects.filter(status='suspended').count(), 0)
+
+        response = self.client.post('/api/vehicles/bulk_status/', {'status': 'suspended', 'ids': ids, 'reason': 'Operativo'},
+                                    format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual((response.data['updated'], response.data['errors']), (2, 1))
+        self.assertEqual(response.data['results'][0]['id'], self.vehicles[0].id)
+        self.assertEqual(
+            set(VehicleStatusEvent.objects.values_list('vehicle_id', 'old_status', 'status', 'reason')),
+            {(vehicle.id, 'active', 'suspended', 'Operativo') for vehicle in self.vehicles[1:3]}
+        )
+
+    def test_bulk_status_by_filter(self):
+        response = self.client.post('/api/vehicles/bulk_status/', {'status': 'suspended'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post('/api/vehicles/bulk_status/?brand=Bajaj', {'status': 'suspended'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(
+            set(Vehicle.objects.filter(status='suspended').values_list('brand', flat=True)), {'Bajaj'}
+        )
+
+    def test_bulk_status_ignores_vehicles_matching_after_lock(self):
+        from apps.core.views import views_vehicle
+
+        check_transition = views_vehicle.vehicle_status_transition_error
+        late = []
+
+        def insert_matching_vehicle(current_status, new_status):
+            if not late:
+                late.append(Vehicle.objects.create(
+                    company=self.company, identifier_number='ID-NUEVO', license_plate='ABC-9999',
+                    chassis_number='CH-NUEVO', brand='Bajaj', model='Wave', year=2020, color='Rojo',
+                    engine_displacement=125, status='active'
+                ))
+            return check_transition(current_status, new_status)
+
+        with mock.patch.object(views_vehicle, 'vehicle_status_transition_error', side_effect=insert_matching_vehicle):
+            response = self.client.post('/api/vehicles/bulk_status/?brand=Bajaj', {'status': 'suspended'},
+                                        format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 2)
+        late[0].refresh_from_db()
+        self.assertEqual(late[0].status, 'active')
+        self.assertEqual(
+            set(VehicleStatusEvent.objects.values_list('vehicle_id', flat=True)),
+            set(Vehicle.objects.filter(status='suspended').values_list('id', flat=True))
+        )
+        self.assertFalse(VehicleStatusEvent.objects.filter(vehicle=late[0]).exists())
+
+    def test_bulk_soft_delete_and_restore(self):
+        ids = [str(vehicle.id) for vehicle in self.vehicles[1:4]]
+        response = self.client.post('/api/vehicles/bulk_soft_delete/', {'ids': ids}, format='json')
+        self.assertEqual(response.data['updated'], 3)
+        self.assertEqual(Vehicle.objects.filter(is_active=True).count(), 2)
+
+        response = self.client.post('/api/vehicles/bulk_restore/?brand=Bajaj', format='json')
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(Vehicle.all_objects.filter(is_active=False).get().id, self.vehicles[2].id)
+
+
+@override_settings(SQL_METRICS_ENABLED=True, SQL_METRICS_N_PLUS_ONE_THRESHOLD=3)
+class SQLMetricsMiddlewareTests(TestCase):
+    """Las métricas de SQL se informan en Server-Timing y se detectan consultas repetidas."""
+
+    def test_server_timing_counts_queries(self):
+        response = APIClient().get('/api/addresses/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('desc="SQL (1 consultas)"', response['Server-Timing'])
+
+    def test_repeated_queries_are_flagged_once_per_view(self):
+        def view(request):
+            for _ in range(3):
+                list(Company.objects.filter(subdomain='compania'))
+            return HttpResponse()
+
+        middleware = SQLMetricsMiddleware(view)
+        with self.assertLogs('apps.core.middleware.sql_metrics', 'INFO') as logs:
+            response = middleware(RequestFactory().get('/reporte/'))
+            middleware(RequestFactory().get('/reporte/'))
+
+        self.assertIn('n1;desc="1 consultas repetidas"', response['Server-Timing'])
+        warnings = [record for record in logs.records if record.levelname == 'WARNING']
+        self.assertEqual(len(warnings), 1)
+        self.assertIn('"queries": 3', logs.records[0].getMessage())
+
+
+class BenchApiCommandTests(TestCase):
+    """bench_api mide las acciones sin dejar datos y falla ante regresiones."""
+
+    def run_bench(self, **options):
+        call_command(
+            'bench_api', companies=1, vehicles=5, iterations=2, warmup=0, only=['vehicles.'], stdout=StringIO(),
+            **options
+        )
+
+    def test_results_are_written_and_compared(self):
+        with tempfile.NamedTemporaryFile('w+', suffix='.json') as output:
+            self.run_bench(output=output.name)
+            results = json.load(output)['results']
+            self.assertEqual(Vehicle.all_objects.count(), 0)
+            self.assertEqual(results['vehicles.list']['statuses'], {'200': 2})
+            self.assertFalse(any(result['errors'] for result in results.values()))
+
+            results['vehicles.list']['queries_max'] -= 1
+            output.seek(0)
+            output.truncate()
+            json.dump({'results': results}, output)
+            output.flush()
+            with self.assertRaisesMessage(CommandError, '1 regresiones'):
+                self.run_bench(compare=output.name, min_delta_ms=1000, allow_drift=True)
+
+    def test_uniform_slowdown_is_a_regression(self):
+        with tempfile.NamedTemporaryFile('w+', suffix='.json') as output:
+            self.run_bench(output=output.name)
+            results = json.load(output)['results']
+
+            # Referencia diez veces más rápida en todas las acciones
+            for result in results.values():
+                for key in ('p50_ms', 'min_ms'):
+                    result[key] /= 10
+            output.seek(0)
+            output.truncate()
+            json.dump({'results': results}, output)
+            output.flush()
+            with self.assertRaisesMessage(CommandError, '1 regresiones'):
+                self.run_bench(compare=output.name, min_delta_ms=1000)
+            self.run_bench(compare=output.name, min_delta_ms=1000, allow_drift=True)
+
+
+class GenerateFleetDataTests(TestCase):
+    """generate_fleet_data crea datos válidos y reproducibles con la misma semilla."""
+
+    def test_generated_vehicles_are_valid(self):
+        call_command('generate_fleet_data', companies=2, vehicles=300, seed=5, stdout=StringIO())
+
+        vehicles = Vehicle.all_objects.all()
+        self.assertEqual(vehicles.count(), 600)
+        self.assertEqual(Address.all_objects.filter(content_type__model='vehicle').count(), 600)
+        for vehicle in vehicles.filter(company__subdomain='flota-5-1'):
+            self.assertRegex(vehicle.license_plate, r'^M[A-Z]{2}-[0-9]{4}$')
+            self.assertEqual(vehicle.next_document_expiry, vehicle.compute_next_document_expiry())
+        self.assertEqual(vehicles.values('license_plate').distinct().count(), 600)
+
+        with self.assertRaisesMessage(CommandError, '--start 3'):
+            call_command('generate_fleet_data', companies=2, vehicles=1, seed=5, stdout=StringIO())
+
+    def test_same_seed_generates_same_rows(self):
+        as_of = timezone.localdate()
+        first = list(FleetGenerator(5, 0, 50, as_of=as_of).vehicle_rows())
+        self.assertEqual(first, list(FleetGenerator(5, 0, 50, as_of=as_of).vehicle_rows()))
+        self.assertNotEqual(first, list(FleetGenerator(6, 0, 50, as_of=as_of).vehicle_rows()))
+
+
+class RewriteCompanyIdsTests(TestCase):
+    """La reescritura de archivos JSON conserva el formato y no deja archivos a medio escribir."""
+
+    def test_rewrite_keeps_format_and_is_atomic(self):
+        records = [{'company_id': None, 'name': 'Compañía'}, {'object_id': None}, {'other': 1}]
+        company_id = '0bc67c25-d56c-479c-b66a-1f94df8a32cb'
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'data.json')
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump(records, file)
+            broken = os.path.join(directory, 'broken.json')
+            with open(broken, 'w', encoding='utf-8') as file:
+                file.write('[{"company_id": 1},')
+
+            result = rewrite_company_ids(path, ['company_id', 'object_id'], [company_id])
+            self.assertEqual((result.status, result.records, result.updated), ('updated', 3, 2))
+            records[0]['company_id'] = records[1]['object_id'] = company_id
+            with open(path, encoding='utf-8') as file:
+                self.assertEqual(file.read(), json.dumps(records, indent=2, ensure_ascii=False))
+
+            self.assertEqual(rewrite_company_ids(broken, ['company_id'], [company_id]).status, 'error')
+            with open(broken, encoding='utf-8') as file:
+                self.assertEqual(file.read(), '[{"company_id": 1},')
+            self.assertEqual(sorted(os.listdir(directory)), ['broken.json', 'data.json'])
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'], REPLICA_PIN_SECONDS=5)
+class ReplicaRoutingTests(SimpleTestCase):
+    """Las lecturas seguras van a la réplica salvo después de escribir."""
+
+    def route(self, method, write=False, cookies=None):
+        """Bases usadas para leer antes y después de una escritura opcional, y la respuesta."""
+        router = ReplicaRouter()
+        used = []
+
+        def view(request):
+            used.append(router.db_for_read(Vehicle))
+            if write:
+                router.db_for_write(Vehicle)
+                used.append(router.db_for_read(Vehicle))
+            return HttpResponse()
+
+        request = getattr(RequestFactory(), method)('/api/vehicles/')
+        request.COOKIES.update(cookies or {})
+        response = ReplicaRoutingMiddleware(view)(request)
+        return used, response
+
+    def test_safe_requests_read_from_replica(self):
+        used, response = self.route('get')
+        self.assertEqual(used, ['replica_1'])
+        self.assertNotIn(PIN_COOKIE_NAME, response.cookies)
+        # Fuera de una solicitud (comandos, tareas) se lee de la base principal
+        self.assertEqual(ReplicaRouter().db_for_read(Vehicle), 'default')
+
+    def test_writes_pin_client_to_primary(self):
+        used, response = self.route('post')
+        self.assertEqual(used, ['default'])
+        self.assertEqual(response.cookies[PIN_COOKIE_NAME]['max-age'], 5)
+
+        used, response = self.route('get', cookies={PIN_COOKIE_NAME: '1'})
+        self.assertEqual(used, ['default'])
+
+        used, response = self.route('get', write=True)
+        self.assertEqual(used, ['replica_1', 'default'])
+        self.assertIn(PIN_COOKIE_NAME, response.cookies)
@@ -3,6 +3,7 @@ from rest_framework.routers import DefaultRouter
 from apps.core.views.views_address import (AddressViewSet)
 from apps.core.views.views_company import (CompanyViewSet)
 from apps.core.views.views_vehicle import (VehicleViewSet)
+from apps.core.views import views_async
 
 # Crear el router para las APIs REST
 router = DefaultRouter()
@@ -10,8 +11,21 @@ router.register(r'companies', CompanyViewSet)
 router.register(r'addresses', AddressViewSet)
 router.register(r'vehicles', VehicleViewSet)
 
+# Vistas async (ASGI) de las lecturas más frecuentes
+async_urlpatterns = [
+    path('vehicles/', views_async.vehicle_list, name='async-vehicle-list'),
+    path('vehicles/search/', views_async.vehicle_search, name='async-vehicle-search'),
+    path('vehicles/stats/', views_async.vehicle_stats, name='async-vehicle-stats'),
+    path('vehicles/<uuid:pk>/', views_async.vehicle_detail, name='async-vehicle-detail'),
+    path('companies/by_subdomain/', views_async.company_by_subdomain, name='async-company-by-subdomain'),
+    path('addresses/countries/', views_async.countries, name='async-address-countries'),
+    path('addresses/regions/', views_async.regions, name='async-address-regions'),
+    path('addresses/cities/', views_async.cities, name='async-address-cities'),
+]
+
 urlpatterns = [
     # API REST endpoints
     path('api/', include(router.urls)),
+    path('api/async/', include(async_urlpatterns)),
 ]
 
@@ -0,0 +1,406 @@
+"""Motor compartido de carga masiva para los comandos de datos de prueba.
+
+Los archivos JSON se leen de forma incremental (un registro a la vez), los
+registros se agrupan en lotes y cada lote se escribe con ``bulk_create`` dentro
+de su propia transacción. La memoria usada depende del tamaño del lote, no del
+tamaño del archivo.
+"""
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+# Directorio por defecto de los archivos de datos de prueba
+TEST_DATA_DIR = os.path.join(settings.BASE_DIR, 'apps', 'core', 'management', 'test')
+
+# Cantidad máxima de mensajes de error que se conservan en memoria
+MAX_STORED_ERRORS = 100
+
+
+class JSONStreamError(ValueError):
+    """Error de formato al leer un arreglo JSON de forma incremental."""
+
+
+class RowError(ValueError):
+    """Error de validación de un registro individual."""
+
+
+def iter_json_array(file_path, chunk_size=64 * 1024):
+    """Itera los elementos de un arreglo JSON sin cargar el archivo completo."""
+    decoder = json.JSONDecoder()
+
+    with open(file_path, 'r', encoding='utf-8') as file:
+        buffer = ''
+        pos = 0
+        eof = False
+        need_more = True
+        expect = '['  # '[' -> inicio, 'first'/'value' -> elemento, ',' -> separador o ']'
+
+        while True:
+            if need_more:
+                if eof:
+                    if expect == '[':
+                        raise JSONStreamError('El archivo JSON debe contener una lista.')
+                    raise JSONStreamError('Fin de archivo inesperado: el arreglo JSON no está cerrado.')
+                chunk = file.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                need_more = False
+
+            # Descartar espacios en blanco (y BOM al inicio)
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n\ufeff':
+                pos += 1
+
+            if pos >= len(buffer):
+                need_more = True
+                continue
+
+            char = buffer[pos]
+
+            if expect == '[':
+                if char != '[':
+                    raise JSONStreamError('El archivo JSON debe contener una lista.')
+                pos += 1
+                expect = 'first'
+                continue
+
+            if char == ']' and expect in ('first', ','):
+                return
+
+            if expect == ',':
+                if char != ',':
+                    raise JSONStreamError(f'Se esperaba "," o "]" y se encontró "{char}".')
+                pos += 1
+                expect = 'value'
+                continue
+
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if not eof:
+                    need_more = True
+                    continue
+                raise JSONStreamError(f'Error al decodificar JSON: {e}') from e
+
+            # Un número al final del buffer podría estar truncado
+            if end == len(buffer) and not eof and isinstance(value, (int, float)):
+                need_more = True
+                continue
+
+            pos = end
+            expect = ','
+            yield value
+
+            # Compactar el buffer para que no crezca con el archivo
+            if pos > chunk_size:
+                buffer = buffer[pos:]
+                pos = 0
+
+
+class LoadStats:
+    """Contadores y errores acumulados durante una carga masiva."""
+
+    def __init__(self):
+        self.created = 0
+        self.existing = 0
+        self.updated = 0
+        self.failed = 0
+        self.batches = 0
+        self.error_count = 0
+        self.errors = []
+        self.started_at = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def processed(self):
+        return self.created + self.existing + self.updated + self.failed
+
+    @property
+    def rate(self):
+        """Filas procesadas por segundo."""
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+    def add_error(self, batch_number, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_STORED_ERRORS:
+            self.errors.append((batch_number, message))
+
+
+class BulkLoader:
+    """Carga registros en lotes con ``bulk_create`` (o upsert) dentro de transacciones.
+
+    ``key_fields`` identifica un registro ya existente; el primer campo se usa
+    para consultar las claves existentes con un único ``__in`` por lote.
+    ``build`` convierte cada registro del archivo en una instancia sin guardar
+    y lanza ``RowError`` si el registro no es válido.
+    """
+
+    def __init__(self, model, key_fields, build, batch_size=1000, upsert=False,
+                 update_fields=None, on_batch=None):
+        self.model = model
+        self.key_fields = list(key_fields)
+        self.build = build
+        self.batch_size = max(1, batch_size)
+        self.upsert = upsert
+        self.on_batch = on_batch
+        self.stats = LoadStats()
+
+        meta = model._meta
+        self._key_model_fields = [meta.get_field(name) for name in self.key_fields]
+        if update_fields is None:
+            update_fields = [
+                f.name for f in meta.concrete_fields
+                if not f.primary_key and f.name not in self.key_fields
+                and f.name not in ('created_at', 'created_by')
+            ]
+        self.update_fields = update_fields
+
+    def run(self, records):
+        """Procesa todos los registros y devuelve las estadísticas de la carga."""
+        batch = []
+        batch_number = 0
+        row_errors = []
+
+        for data in records:
+            try:
+                batch.append(self.build(data))
+            except (RowError, KeyError, TypeError, ValueError) as e:
+                message = f'Campo faltante {e}' if isinstance(e, KeyError) else str(e)
+                row_errors.append(message)
+
+            if len(batch) + len(row_errors) >= self.batch_size:
+                batch_number += 1
+                self._flush(batch_number, batch, row_errors)
+                batch, row_errors = [], []
+
+        if batch or row_errors:
+            batch_number += 1
+            self._flush(batch_number, batch, row_errors)
+
+        self.stats.elapsed = time.perf_counter() - self.stats.started_at
+        return self.stats
+
+    def _key(self, instance):
+        return tuple(
+            field.to_python(getattr(instance, field.attname))
+            for field in self._key_model_fields
+        )
+
+    def _existing_keys(self, keys):
+        """Claves del lote que ya existen en la base de datos (una consulta)."""
+        first = self._key_model_fields[0]
+        values = {key[0] for key in keys}
+        rows = self.model._base_manager.filter(**{f'{first.attname}__in': values}).values_list(
+            *[field.attname for field in self._key_model_fields]
+        )
+        return {
+            tuple(field.to_python(value) for field, value in zip(self._key_model_fields, row))
+            for row in rows
+        }
+
+    def _write(self, instances):
+        """Escribe un lote y devuelve ``(creados, existentes, actualizados, escritos)``."""
+        keys = [self._key(instance) for instance in instances]
+        existing_keys = self._existing_keys(keys) if keys else set()
+
+        # Eliminar duplicados dentro del mismo lote (se conserva el último)
+        unique = {}
+        for key, instance in zip(keys, instances):
+            unique[key] = instance
+        duplicates = len(instances) - len(unique)
+
+        if self.upsert:
+            to_write = list(unique.values())
+            if to_write:
+                self.model.objects.bulk_create(
+                    to_write,
+                    update_conflicts=True,
+                    unique_fields=self.key_fields,
+                    update_fields=self.update_fields,
+                )
+            updated = sum(1 for key in unique if key in existing_keys)
+            return len(unique) - updated, duplicates, updated, to_write
+
+        to_write = [instance for key, instance in unique.items() if key not in existing_keys]
+        if to_write:
+            self.model.objects.bulk_create(to_write)
+        return len(to_write), len(instances) - len(to_write), 0, to_write
+
+    def _write_rows(self, batch_number, instances):
+        """Escribe un lote fallido fila por fila e informa cada registro que no se pudo guardar."""
+        stats = self.stats
+        created = existing = updated = 0
+        written = []
+
+        for instance in instances:
+            try:
+                with transaction.atomic():
+                    row_created, row_existing, row_updated, row_written = self._write([instance])
+            except Exception as e:
+                stats.failed += 1
+                stats.add_error(batch_number, f'Registro descartado ({instance}): {e}')
+                continue
+            created += row_created
+            existing += row_existing
+            updated += row_updated
+            written.extend(row_written)
+        return created, existing, updated, written
+
+    def _flush(self, batch_number, instances, row_errors):
+        batch_started = time.perf_counter()
+        stats = self.stats
+        stats.batches += 1
+
+        for message in row_errors:
+            stats.add_error(batch_number, message)
+        stats.failed += len(row_errors)
+
+        try:
+            with transaction.atomic():
+                created, existing, updated, to_write = self._write(instances)
+        except Exception:
+            # Reintentar fila por fila para descartar solo los registros inválidos
+            created, existing, updated, to_write = self._write_rows(batch_number, instances)
+
+        stats.created += created
+        stats.existing += existing
+        stats.updated += updated
+
+        if self.on_batch:
+            elapsed = time.perf_counter() - batch_started
+            self.on_batch(batch_number, len(instances) + len(row_errors), created, existing,
+                          updated, elapsed, to_write)
+
+
+class BulkLoadCommand(BaseCommand, ABC):
+    """Comando base para cargar datos de prueba con el motor ``BulkLoader``.
+
+    Las subclases definen ``model``, ``key_fields``, ``required_fields``,
+    ``default_file`` y ``build_instance``; ``prepare`` resuelve una sola vez las referencias
+    (compañías, ContentTypes) que necesita ``build_instance``.
+    """
+
+    model = None
+    key_fields = ()
+    required_fields = ()
+    default_file = None
+    label = 'registros'
+    created_label = 'creados'
+    allow_upsert = True
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--delete',
+            action='store_true',
+            help='Elimina todos los datos existentes antes de cargar',
+        )
+        parser.add_argument(
+            '--file',
+            type=str,
+            default=self.default_file,
+            help=f'Nombre del archivo JSON con los datos (por defecto: {self.default_file})',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Cantidad de registros por lote y transacción (por defecto: 1000)',
+        )
+        if self.allow_upsert:
+            parser.add_argument(
+                '--upsert',
+                action='store_true',
+                help='Actualiza los registros existentes en lugar de omitirlos',
+            )
+
+    def prepare(self):
+        """Resolver referencias compartidas antes de la carga."""
+
+    def finish(self, stats):
+        """Acciones posteriores a la carga (``bulk_create`` no emite señales)."""
+
+    @abstractmethod
+    def build_instance(self, data):
+        """Convertir un registro del archivo en una instancia sin guardar (``RowError`` si no es válido)."""
+
+    def _build(self, data):
+        if not isinstance(data, dict):
+            raise RowError(f'Registro inválido: {data}')
+        missing = [field for field in self.required_fields if field not in data]
+        if missing:
+            raise RowError(f'Campo faltante {", ".join(missing)} en registro: {data}')
+        return self.build_instance(data)
+
+    def describe(self, instance):
+        return str(instance)
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+
+        if options['delete']:
+            self.model._default_manager.all().delete()
+            self.stdout.write('Datos existentes eliminados.')
+
+        file_path = os.path.join(TEST_DATA_DIR, options['file'])
+
+        if not os.path.exists(file_path):
+            self.stdout.write(
+                self.style.ERROR(f'❌ Archivo no encontrado: {file_path}')
+            )
+            return
+
+        self.prepare()
+
+        loader = BulkLoader(
+            self.model,
+            self.key_fields,
+            build=self._build,
+            batch_size=options['batch_size'],
+            upsert=options.get('upsert', False),
+            on_batch=self._report_batch,
+        )
+
+        try:
+            stats = loader.run(iter_json_array(file_path))
+        except JSONStreamError as e:
+            self.stdout.write(self.style.ERROR(f'❌ {e}'))
+            stats = loader.stats
+            stats.elapsed = time.perf_counter() - stats.started_at
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'❌ Error inesperado: {e}'))
+            self.finish(loader.stats)
+            return
+
+        self.finish(stats)
+
+        for batch_number, message in stats.errors:
+            self.stdout.write(self.style.WARNING(f'⚠️  Lote {batch_number}: {message}'))
+        if stats.error_count > len(stats.errors):
+            self.stdout.write(
+                self.style.WARNING(f'⚠️  ... y {stats.error_count - len(stats.errors)} errores más.')
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Proceso completado. {stats.created} {self.label} {self.created_label}, '
+                f'{stats.updated} actualizados, {stats.existing} ya existían, '
+                f'{stats.failed} con errores. {stats.processed} filas en {stats.elapsed:.2f}s '
+                f'({stats.rate:.0f} filas/s, {stats.batches} lotes).'
+            )
+        )
+
+    def _report_batch(self, batch_number, rows, created, existing, updated, elapsed, written):
+        if self.verbosity >= 1:
+            rate = rows / elapsed if elapsed else 0.0
+            self.stdout.write(
+                f'📦 Lote {batch_number}: {rows} filas ({created} creados, {updated} actualizados, '
+                f'{existing} existentes) - {rate:.0f} filas/s'
+            )
+        if self.verbosity >= 2:
+            for instance in written:
+                self.stdout.write(f'✅ {self.describe(instance)}')
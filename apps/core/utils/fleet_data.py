@@ -0,0 +1,301 @@
+"""Generador de datos sintéticos de flota a escala de producción.
+
+Los datos dependen solo de la semilla, el índice de la compañía y la fecha de
+referencia: con los mismos parámetros se generan exactamente las mismas filas
+(identificadores incluidos). Las filas se producen de forma perezosa como
+tuplas de texto (``None`` para NULL, ``t``/``f`` para booleanos) ya válidas
+para ``COPY``: los valores salen de tablas fijas y no contienen tabuladores,
+saltos de línea ni barras invertidas. Se escriben sin crear instancias de
+modelo:
+
+* PostgreSQL: ``COPY ... FROM STDIN`` alimentado directamente desde el
+  generador, sin cargar la compañía en memoria.
+* Otros motores: ``INSERT`` por lotes con ``executemany``.
+
+Las placas tienen el formato ``ABC-1234`` que exige ``VehicleCreateSerializer``:
+la primera letra es la de la provincia de la compañía y las demás posiciones
+recorren una permutación del espacio de placas, por lo que no se repiten dentro
+de la compañía. Los números de identificación, chasis y motor se derivan del
+número del vehículo y también son únicos.
+"""
+import random
+import uuid
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from math import gcd
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.core.models import Address, Company, Vehicle
+
+# Provincia, letra de placa y ciudades
+PROVINCES = (
+    ('Manabí', 'M', ('Manta', 'Portoviejo', 'Chone', 'Montecristi', 'Jipijapa', 'El Carmen')),
+    ('Guayas', 'G', ('Guayaquil', 'Durán', 'Milagro', 'Daule', 'Samborondón')),
+    ('Pichincha', 'P', ('Quito', 'Cayambe', 'Sangolquí', 'Machachi')),
+    ('Los Ríos', 'R', ('Babahoyo', 'Quevedo', 'Ventanas', 'Vinces')),
+    ('El Oro', 'O', ('Machala', 'Pasaje', 'Santa Rosa', 'Huaquillas')),
+    ('Esmeraldas', 'E', ('Esmeraldas', 'Quinindé', 'Atacames')),
+    ('Santa Elena', 'Y', ('Santa Elena', 'La Libertad', 'Salinas')),
+    ('Santo Domingo de los Tsáchilas', 'J', ('Santo Domingo', 'La Concordia')),
+    ('Azuay', 'A', ('Cuenca', 'Gualaceo', 'Paute')),
+    ('Loja', 'L', ('Loja', 'Catamayo', 'Macará')),
+)
+SECTORS = ('Centro', 'Norte', 'Sur', 'La Pradera', 'Los Esteros', 'San José', 'Miraflores', 'El Paraíso',
+           'Las Cumbres', 'Tarqui', 'Los Ceibos', 'Santa Martha', 'Urbirríos', 'Jocay', 'Altagracia')
+STREETS = ('Av. Principal', 'Calle 10', 'Av. 4 de Noviembre', 'Calle Bolívar', 'Av. Universitaria',
+           'Calle Sucre', 'Av. Malecón', 'Calle Olmedo', 'Av. Manabí', 'Calle Rocafuerte')
+
+# Marca, modelos y cilindrajes de tricimotos
+BRANDS = (
+    ('Bajaj', ('RE 205', 'Maxima', 'RE Compact'), ('200', '205', '236')),
+    ('TVS', ('King', 'King Deluxe'), ('200',)),
+    ('Piaggio', ('Ape City', 'Ape Xtra'), ('200', '230')),
+    ('Shineray', ('XY200ZH', 'Cargo 200'), ('150', '200')),
+    ('Motor Uno', ('Tricargo', 'T200'), ('150', '200')),
+    ('Daytona', ('Tricimoto 200', 'DY150ZH'), ('150', '200')),
+    ('Lifan', ('LF200ZH', 'LF150ZH'), ('150', '200')),
+)
+COLORS = ('Amarillo', 'Rojo', 'Azul', 'Verde', 'Blanco', 'Negro', 'Naranja', 'Gris')
+# Estado según un número aleatorio en [0, 1): 90 % activos, 7 % suspendidos, 3 % revocados
+STATUS_THRESHOLDS = (('active', 0.90), ('suspended', 0.97), ('revoked', 1.0))
+
+# Espacio de placas por compañía: 2 letras libres × 4 dígitos
+PLATE_SPACE = 26 * 26 * 10000
+# Años de antigüedad máxima de los registros
+HISTORY_DAYS = 3 * 365
+# Fracción de registros eliminados lógicamente
+INACTIVE_RATIO = 0.01
+# Fracción de documentos sin fecha de vencimiento registrada
+MISSING_EXPIRY_RATIO = 0.05
+# Días máximos de vencimiento atrasado respecto de la fecha de referencia
+EXPIRY_PAST_DAYS = 90
+# Bytes enviados por bloque de COPY
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Campos escritos, en el orden de las tuplas de FleetGenerator
+VEHICLE_FIELDS = (
+    'id', 'created_at', 'updated_at', 'created_by_id', 'updated_by_id', 'is_active', 'company_id',
+    'identifier_number', 'license_plate', 'chassis_number', 'engine_number', 'brand', 'model', 'year', 'color',
+    'engine_displacement', 'passenger_capacity', 'status', 'status_changed_at', 'soat_expiry',
+    'technical_review_expiry', 'operation_permit_expiry', 'next_document_expiry',
+)
+ADDRESS_FIELDS = (
+    'id', 'created_at', 'updated_at', 'created_by_id', 'updated_by_id', 'is_active', 'country', 'province', 'city',
+    'sector', 'postal_code', 'reference', 'content_type_id', 'object_id',
+)
+
+def company_profile(seed, index):
+    """Datos de la compañía ``index`` (desde 0) de la semilla ``seed``."""
+    rng = random.Random(f'{seed}:{index}:company')
+    province, letter, cities = PROVINCES[index % len(PROVINCES)]
+    city = rng.choice(cities)
+    number = index + 1
+    return {
+        'id': uuid.UUID(int=rng.getrandbits(128), version=4),
+        'name': f'Cooperativa de Tricimotos {city} {number}',
+        'subdomain': f'flota-{seed}-{number}',
+        'legal_name': f'Cooperativa de Transporte en Tricimotos {city} {number}',
+        'tax_id': f'{rng.randrange(10 ** 9, 10 ** 10)}001',
+        'phone': f'05{rng.randrange(10 ** 6, 10 ** 7)}',
+        'email': f'contacto@flota-{seed}-{number}.ec',
+        'daily_fee': rng.choice(('1.00', '1.50', '2.00')),
+        'province': province,
+        'plate_letter': letter,
+        'cities': cities,
+        'city': city,
+    }
+
+
+class FleetGenerator:
+    """Filas de vehículos y direcciones de una compañía, en orden determinista.
+
+    ``vehicle_rows`` y ``address_rows`` son independientes: las direcciones
+    vuelven a generar los identificadores de los vehículos con su propia
+    secuencia, en lugar de conservarlos en memoria.
+    """
+
+    def __init__(self, seed, index, vehicles, addresses_per_vehicle=1, as_of=None):
+        self.seed = seed
+        self.index = index
+        self.vehicles = vehicles
+        self.addresses_per_vehicle = addresses_per_vehicle
+        self.as_of = as_of or timezone.localdate()
+        self.company = company_profile(seed, index)
+
+        # Permutación afín del espacio de placas: placas únicas y dispersas
+        rng = random.Random(f'{seed}:{index}:plates')
+        self.plate_step = rng.randrange(1, PLATE_SPACE)
+        while gcd(self.plate_step, PLATE_SPACE) != 1:
+            self.plate_step = rng.randrange(1, PLATE_SPACE)
+        self.plate_offset = rng.randrange(PLATE_SPACE)
+
+        # Medianoche de la fecha de referencia (UTC) como instante base de created_at
+        self.until = datetime.combine(self.as_of, time(), tzinfo=dt_timezone.utc)
+
+    def plate(self, number):
+        value = (number * self.plate_step + self.plate_offset) % PLATE_SPACE
+        letters, digits = divmod(value, 10000)
+        first, second = divmod(letters, 26)
+        return f'{self.company["plate_letter"]}{chr(65 + first)}{chr(65 + second)}-{digits:04d}'
+
+    def vehicle_ids(self):
+        rng = random.Random(f'{self.seed}:{self.index}:vehicle-ids')
+        for _ in range(self.vehicles):
+            yield _uuid4(rng.getrandbits(128))
+
+    def vehicle_rows(self):
+        """Tuplas con los campos ``VEHICLE_FIELDS`` de cada vehículo."""
+        rng = random.Random(f'{self.seed}:{self.index}:vehicles')
+        random_value, randrange, choice = rng.random, rng.randrange, rng.choice
+        company_id = str(self.company['id'])
+        code = f'{self.index + 1:04d}'
+        until, history, max_year = self.until, HISTORY_DAYS * 86400, self.as_of.year
+        # Vencimientos como índices sobre fechas precalculadas (SOAT anual, revisión semestral, permiso)
+        days = [(self.as_of + timedelta(days=offset)).isoformat() for offset in range(-EXPIRY_PAST_DAYS, 731)]
+        windows = ((-60, 365), (-30, 180), (-90, 730))
+
+        for number, vehicle_id in enumerate(self.vehicle_ids()):
+            brand, models, displacements = choice(BRANDS)
+            created_at = until - timedelta(seconds=randrange(history))
+            stamp = str(created_at)
+            expiries = [
+                None if random_value() < MISSING_EXPIRY_RATIO
+                else days[EXPIRY_PAST_DAYS + randrange(earliest, latest + 1)]
+                for earliest, latest in windows
+            ]
+            present = [expiry for expiry in expiries if expiry is not None]
+            draw = random_value()
+            status = next(name for name, threshold in STATUS_THRESHOLDS if draw < threshold)
+            yield (
+                vehicle_id, stamp, stamp, None, None, 'f' if random_value() < INACTIVE_RATIO else 't', company_id,
+                f'{code}-{number + 1:07d}', self.plate(number), f'9C{code}{number:011d}',
+                f'{brand[:2].upper()}{code}{number:09d}', brand, choice(models),
+                str(min(max_year, created_at.year + 1) - randrange(7)), choice(COLORS), choice(displacements), '3',
+                status, stamp, expiries[0], expiries[1], expiries[2], min(present) if present else None,
+            )
+
+    def address_rows(self, vehicle_type_id):
+        """Tuplas con los campos ``ADDRESS_FIELDS`` (``addresses_per_vehicle`` por vehículo)."""
+        rng = random.Random(f'{self.seed}:{self.index}:addresses')
+        randrange, choice = rng.randrange, rng.choice
+        province, cities = self.company['province'], self.company['cities']
+        until, history = self.until, HISTORY_DAYS * 86400
+        content_type_id = str(vehicle_type_id)
+
+        for vehicle_id in self.vehicle_ids():
+            for _ in range(self.addresses_per_vehicle):
+                stamp = str(until - timedelta(seconds=randrange(history)))
+                yield (
+                    _uuid4(rng.getrandbits(128)), stamp, stamp, None, None, 't', 'Ecuador', province,
+                    choice(cities), choice(SECTORS), f'{randrange(100000, 240000):06d}',
+                    f'{choice(STREETS)} y {choice(STREETS)}, casa {randrange(1, 1000)}', content_type_id, vehicle_id,
+                )
+
+
+def _uuid4(bits):
+    """UUID versión 4 (texto) a partir de 128 bits aleatorios."""
+    value = '%032x' % (bits & ~(0xF000 << 64 | 0xC000 << 48) | 0x4000 << 64 | 0x8000 << 48)
+    return f'{value[:8]}-{value[8:12]}-{value[12:16]}-{value[16:20]}-{value[20:]}'
+
+
+class _CopyStream:
+    """Objeto de solo lectura con las filas en formato de texto de ``COPY``.
+
+    Cada ``read`` devuelve filas completas hasta reunir al menos ``size`` bytes.
+    """
+
+    def __init__(self, rows):
+        self.rows = iter(rows)
+        self.count = 0
+
+    def read(self, size=-1):
+        lines = []
+        length = 0
+        for row in self.rows:
+            line = '\t'.join([value if value is not None else '\\N' for value in row])
+            lines.append(line)
+            length += len(line) + 1
+            if 0 < size <= length:
+                break
+        self.count += len(lines)
+        return ('\n'.join(lines) + '\n').encode() if lines else b''
+
+
+def _table_sql(model, fields):
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(model._meta.get_field(name).column) for name in fields)
+    return f'{quote(model._meta.db_table)} ({columns})'
+
+
+def copy_rows(model, fields, rows, batch_size=None):
+    """Escribir ``rows`` con un solo ``COPY FROM STDIN``. Devuelve la cantidad de filas.
+
+    ``batch_size`` se ignora: psycopg2 lee el flujo en bloques de ``COPY_CHUNK_SIZE`` bytes.
+    """
+    stream = _CopyStream(rows)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(f'COPY {_table_sql(model, fields)} FROM STDIN', stream, COPY_CHUNK_SIZE)
+    return stream.count
+
+
+def insert_rows(model, fields, rows, batch_size=5000):
+    """Escribir ``rows`` con ``INSERT`` por lotes. Devuelve la cantidad de filas."""
+    model_fields = [model._meta.get_field(name) for name in fields]
+    sql = f'INSERT INTO {_table_sql(model, fields)} VALUES ({", ".join(["%s"] * len(fields))})'
+
+    count = 0
+    batch = []
+    with connection.cursor() as cursor:
+        for row in rows:
+            batch.append([field.get_db_prep_save(value, connection) for field, value in zip(model_fields, row)])
+            if len(batch) >= batch_size:
+                cursor.executemany(sql, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+            count += len(batch)
+    return count
+
+
+def supports_copy():
+    """``COPY FROM STDIN`` disponible (PostgreSQL con psycopg2)."""
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        return hasattr(cursor.cursor, 'copy_expert')
+
+
+def generate_company(generator, batch_size=5000, use_copy=None):
+    """Crear la compañía de ``generator`` con sus vehículos y direcciones en una transacción.
+
+    Devuelve ``(vehículos, direcciones)`` creados.
+    """
+    write = copy_rows if (supports_copy() if use_copy is None else use_copy) else insert_rows
+    profile = generator.company
+    vehicle_type = ContentType.objects.get_for_model(Vehicle)
+    company_type = ContentType.objects.get_for_model(Company)
+
+    with transaction.atomic():
+        company = Company.all_objects.create(**{
+            name: profile[name]
+            for name in ('id', 'name', 'subdomain', 'legal_name', 'tax_id', 'phone', 'email', 'daily_fee')
+        })
+        Address.all_objects.create(
+            province=profile['province'], city=profile['city'], sector='Centro', reference='Oficina principal',
+            content_type=company_type, object_id=company.id,
+        )
+        vehicles = write(Vehicle, VEHICLE_FIELDS, generator.vehicle_rows(), batch_size)
+        addresses = write(Address, ADDRESS_FIELDS, generator.address_rows(vehicle_type.id), batch_size)
+    return vehicles, addresses + 1
+
+
+def analyze():
+    """Actualizar las estadísticas del planificador después de una carga grande (PostgreSQL)."""
+    if connection.vendor == 'postgresql':
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            for model in (Company, Vehicle, Address):
+                cursor.execute(f'ANALYZE {quote(model._meta.db_table)}')
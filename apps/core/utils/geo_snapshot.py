@@ -0,0 +1,115 @@
+"""Snapshot en memoria de los datos geográficos de Cities Light.
+
+Países, provincias y ciudades solo cambian al ejecutar la importación de
+``cities_light``. Las listas que devuelven los selects de direcciones se
+construyen una vez (tres consultas) y se sirven desde memoria con un ETag
+derivado del contenido. El snapshot se descarta con las señales de los
+modelos de Cities Light y se reconstruye cada ``GEO_SNAPSHOT_TTL`` segundos
+para detectar importaciones hechas en otro proceso; si el contenido no
+cambió, la versión (y el ETag) se mantiene.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.http import parse_etags, quote_etag
+
+from cities_light.models import City, Country, Region
+
+# Segundos antes de reconstruir el snapshot
+DEFAULT_GEO_SNAPSHOT_TTL = 600
+# Max-age de Cache-Control para las respuestas de los selects
+DEFAULT_GEO_CACHE_MAX_AGE = 86400
+
+
+class GeoSnapshot:
+    """Versión inmutable de países, provincias por país y ciudades por provincia."""
+
+    def __init__(self, countries, regions, cities):
+        self.countries = countries
+        self.regions = regions  # country_id -> [{'id', 'name'}]
+        self.cities = cities    # region_id -> [{'id', 'name'}]
+
+        digest = hashlib.sha1()
+        for part in (countries, sorted(regions.items()), sorted(cities.items())):
+            digest.update(json.dumps(part, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+        self.version = digest.hexdigest()[:16]
+
+    @classmethod
+    def build(cls):
+        countries = [
+            {'id': pk, 'name': name, 'code': code}
+            for pk, name, code in Country.objects.order_by('name').values_list('id', 'name', 'code2')
+        ]
+
+        regions = defaultdict(list)
+        for pk, name, country_id in Region.objects.order_by('name').values_list('id', 'name', 'country_id'):
+            regions[country_id].append({'id': pk, 'name': name})
+
+        cities = defaultdict(list)
+        for pk, name, region_id in City.objects.order_by('name').values_list('id', 'name', 'region_id'):
+            if region_id is not None:
+                cities[region_id].append({'id': pk, 'name': name})
+
+        return cls(countries, dict(regions), dict(cities))
+
+    def etag(self, resource, key=None):
+        """ETag fuerte para un recurso del snapshot."""
+        return quote_etag(f'{self.version}-{resource}' + (f'-{key}' if key is not None else ''))
+
+
+class GeoSnapshotStore:
+    """Mantiene el snapshot vigente y lo reconstruye de forma perezosa."""
+
+    def __init__(self, ttl=DEFAULT_GEO_SNAPSHOT_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._built_at = None
+
+    def get(self):
+        snapshot, built_at = self._snapshot, self._built_at
+        if snapshot is not None and built_at is not None and time.monotonic() - built_at < self.ttl:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is None or time.monotonic() - self._built_at >= self.ttl:
+                fresh = GeoSnapshot.build()
+                # Mantener la misma instancia (y versión) si el contenido no cambió
+                if self._snapshot is None or fresh.version != self._snapshot.version:
+                    self._snapshot = fresh
+                self._built_at = time.monotonic()
+            return self._snapshot
+
+    async def aget(self):
+        """Versión async de ``get``: solo la reconstrucción pasa a un hilo."""
+        snapshot, built_at = self._snapshot, self._built_at
+        if snapshot is not None and built_at is not None and time.monotonic() - built_at < self.ttl:
+            return snapshot
+        return await sync_to_async(self.get)()
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+            self._built_at = None
+
+
+geo_snapshot = GeoSnapshotStore(ttl=getattr(settings, 'GEO_SNAPSHOT_TTL', DEFAULT_GEO_SNAPSHOT_TTL))
+
+
+def not_modified(request, etag):
+    """Indica si el encabezado If-None-Match del cliente coincide con ``etag``."""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return '*' in etags or etag in etags
+
+
+def cache_control():
+    max_age = getattr(settings, 'GEO_CACHE_MAX_AGE', DEFAULT_GEO_CACHE_MAX_AGE)
+    return f'public, max-age={max_age}'
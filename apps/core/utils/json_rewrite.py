@@ -0,0 +1,135 @@
+"""Reescritura en streaming de archivos JSON de datos de prueba.
+
+Cada archivo se lee registro por registro (``iter_json_array``) y se escribe a
+un archivo temporal en el mismo directorio, que reemplaza al original con
+``os.replace`` solo cuando se escribió completo: una interrupción nunca deja
+un archivo a medio escribir. La salida tiene el mismo formato que
+``json.dump(data, indent=2, ensure_ascii=False)``.
+
+``rewrite_company_ids`` no usa la base de datos ni los modelos, por lo que se
+puede ejecutar en procesos separados (``ProcessPoolExecutor``).
+"""
+import json
+import os
+import random
+import tempfile
+import time
+
+from apps.core.utils.bulk_loader import JSONStreamError, iter_json_array
+
+# UUIDs de compañías del proceso (ver ``init_worker``)
+_company_ids = ()
+
+# Un solo codificador para todo el arreglo, como json.dump
+_ENCODER = json.JSONEncoder(indent=2, ensure_ascii=False)
+_END = object()
+
+
+def init_worker(company_ids):
+    """Inicializador de cada proceso: recibe los UUIDs de compañías una sola vez."""
+    global _company_ids
+    _company_ids = company_ids
+
+
+def cycle_shuffled(items, rng=random):
+    """Cicla indefinidamente por ``items``, mezclándolos al inicio de cada vuelta."""
+    shuffled = list(items)
+    while True:
+        rng.shuffle(shuffled)
+        yield from shuffled
+
+
+class RewriteResult:
+    """Resultado de la reescritura de un archivo (``status``: updated, skipped o error)."""
+
+    def __init__(self, filename, status, records=0, updated=0, fields=(), elapsed=0.0, message=''):
+        self.filename = filename
+        self.status = status
+        self.records = records
+        self.updated = updated
+        self.fields = sorted(fields)
+        self.elapsed = elapsed
+        self.message = message
+
+    @property
+    def rate(self):
+        """Registros leídos por segundo."""
+        return self.records / self.elapsed if self.elapsed else 0.0
+
+
+class _StreamedList(list):
+    """Lista vacía que ``JSONEncoder`` recorre como si contuviera los elementos de un iterador."""
+
+    def __init__(self, first, rest):
+        super().__init__()
+        self.first = first
+        self.rest = rest
+
+    def __iter__(self):
+        yield self.first
+        yield from self.rest
+
+    def __bool__(self):
+        return True
+
+
+def _write_array(records, file):
+    """Escribir ``records`` con el formato de ``json.dump(..., indent=2)``, sin reunirlos en memoria."""
+    records = iter(records)
+    first = next(records, _END)
+    if first is _END:
+        file.write('[]')
+        return
+    for chunk in _ENCODER.iterencode(_StreamedList(first, records)):
+        file.write(chunk)
+
+
+def rewrite_company_ids(file_path, company_fields, company_ids=None):
+    """Asignar UUIDs de compañías a los registros de ``file_path`` que tengan ``company_fields``.
+
+    Solo se actualiza el primer campo presente de cada registro. Los archivos
+    sin registros con esos campos no se modifican.
+    """
+    filename = os.path.basename(file_path)
+    started = time.perf_counter()
+    companies = cycle_shuffled(company_ids if company_ids is not None else _company_ids)
+    stats = {'records': 0, 'updated': 0, 'fields': set()}
+
+    def assign(records):
+        for record in records:
+            stats['records'] += 1
+            if isinstance(record, dict):
+                for field in company_fields:
+                    if field in record:
+                        record[field] = next(companies)
+                        stats['updated'] += 1
+                        stats['fields'].add(field)
+                        break
+            yield record
+
+    if not os.path.exists(file_path):
+        return RewriteResult(filename, 'error', message='Archivo no encontrado')
+
+    directory = os.path.dirname(file_path)
+    descriptor, temp_path = tempfile.mkstemp(prefix=f'.{filename}.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+            _write_array(assign(iter_json_array(file_path)), file)
+            file.flush()
+            os.fsync(file.fileno())
+
+        elapsed = time.perf_counter() - started
+        if not stats['updated']:
+            os.remove(temp_path)
+            return RewriteResult(filename, 'skipped', stats['records'], elapsed=elapsed,
+                                 message='No contiene campos de compañía')
+
+        os.chmod(temp_path, os.stat(file_path).st_mode)
+        os.replace(temp_path, file_path)
+        return RewriteResult(filename, 'updated', stats['records'], stats['updated'], stats['fields'],
+                             time.perf_counter() - started)
+    except (JSONStreamError, OSError, TypeError, ValueError) as e:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return RewriteResult(filename, 'error', stats['records'], elapsed=time.perf_counter() - started,
+                             message=str(e))
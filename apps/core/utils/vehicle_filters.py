@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+
+def filter_vehicles(queryset, params, company_id=None):
+    """Aplicar los filtros de listado de vehículos (compartido por las vistas síncronas y async)."""
+    # Filtrar por compañía
+    if company_id:
+        queryset = queryset.filter(company_id=company_id)
+
+    # Filtrar por estado
+    status_filter = params.get('status')
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+
+    # Filtrar por placa (búsqueda parcial)
+    license_plate = params.get('license_plate')
+    if license_plate:
+        queryset = queryset.filter(license_plate__icontains=license_plate.upper())
+
+    # Filtrar por marca
+    brand = params.get('brand')
+    if brand:
+        queryset = queryset.filter(brand__icontains=brand)
+
+    # Filtrar por año
+    year = params.get('year')
+    if year:
+        try:
+            queryset = queryset.filter(year=int(year))
+        except ValueError:
+            pass
+
+    # Filtrar vehículos con documentos próximos a vencer
+    expiring_soon = params.get('expiring_soon')
+    if expiring_soon:
+        alert_date = timezone.now().date() + timedelta(days=30)
+        queryset = queryset.filter(next_document_expiry__lte=alert_date)
+
+    return queryset.order_by('-created_at')
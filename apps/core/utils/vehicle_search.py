@@ -0,0 +1,275 @@
+"""Motor de búsqueda de vehículos.
+
+En PostgreSQL con la extensión ``pg_trgm`` se usa un índice GIN de trigramas
+sobre los campos buscables y los resultados se ordenan por similitud. En otros
+motores (o si la extensión no está disponible) se usa un índice de trigramas
+en memoria que se mantiene al guardar o eliminar vehículos. Ese índice es
+propio de cada proceso: solo contiene vehículos activos, las señales lo
+actualizan únicamente en el proceso que hizo el cambio y los demás procesos lo
+recargan al vencer ``NGRAM_INDEX_TTL``.
+
+En ambos casos las consultas con forma de placa ("abc12", "ABC-12") se
+convierten al prefijo canónico ``ABC-12`` y las coincidencias por prefijo de
+placa se ubican primero.
+"""
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+
+from django.db import DatabaseError, connections
+from django.db.models import Case, CharField, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+from apps.core.models import Vehicle
+
+logger = logging.getLogger(__name__)
+
+SEARCH_FIELDS = ('license_plate', 'chassis_number', 'identifier_number', 'brand', 'model', 'engine_number')
+SEARCH_INDEX_NAME = 'core_vehicle_search_trgm'
+
+# Bonificación para coincidencias por prefijo de placa
+PLATE_PREFIX_BOOST = 1.0
+# Fracción mínima de trigramas de la consulta presentes en el vehículo (índice en memoria)
+MIN_NGRAM_SCORE = 0.5
+# Candidatos que se cruzan con los filtros del queryset por consulta (índice en memoria)
+MAX_NGRAM_CANDIDATES = 2000
+# Segundos antes de recargar el índice en memoria (cambios hechos por otros procesos)
+NGRAM_INDEX_TTL = 300
+
+_NON_ALNUM = re.compile(r'[^0-9A-Z]')
+_PLATE_PREFIX = re.compile(r'^([A-Z]{1,3})-?([0-9]{0,4})$')
+
+# alias de base de datos -> si pg_trgm está instalada
+_trigram_support = {}
+
+
+def normalize(value):
+    """Mayúsculas y solo caracteres alfanuméricos."""
+    return _NON_ALNUM.sub('', (value or '').upper())
+
+
+def plate_prefix(query):
+    """Prefijo de placa canónico (``ABC-12``) si la consulta tiene forma de placa."""
+    match = _PLATE_PREFIX.match(query.strip().upper().replace(' ', ''))
+    if not match:
+        return None
+
+    letters, digits = match.groups()
+    if not digits:
+        return letters
+    if len(letters) == 3:
+        return f'{letters}-{digits}'
+    return None
+
+
+def _search_document_sql(connection, qualified=True):
+    """Expresión SQL con los campos buscables concatenados (usada por el índice GIN)."""
+    quote = connection.ops.quote_name
+    prefix = f'{quote(Vehicle._meta.db_table)}.' if qualified else ''
+    columns = [f'{prefix}{quote(Vehicle._meta.get_field(name).column)}' for name in SEARCH_FIELDS]
+    return 'upper(' + " || ' ' || ".join(columns) + ')'
+
+
+def has_trigram_support(connection):
+    """Indica si la base de datos es PostgreSQL con ``pg_trgm`` instalada."""
+    if connection.vendor != 'postgresql':
+        return False
+
+    if connection.alias not in _trigram_support:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_support[connection.alias] = cursor.fetchone() is not None
+
+    return _trigram_support[connection.alias]
+
+
+def ensure_vehicle_search_indexes(sender, using='default', **kwargs):
+    """Crear la extensión ``pg_trgm`` y el índice GIN de búsqueda (receptor de post_migrate)."""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+
+    table = connection.ops.quote_name(Vehicle._meta.db_table)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {SEARCH_INDEX_NAME} ON {table} '
+                f'USING gin (({_search_document_sql(connection, qualified=False)}) gin_trgm_ops)'
+            )
+    except DatabaseError as e:
+        logger.warning('No se pudo crear el índice de búsqueda de vehículos (pg_trgm): %s', e)
+    finally:
+        _trigram_support.pop(using, None)
+
+
+def _trigrams(token, pad_end=True):
+    padded = f'  {token} ' if pad_end else f'  {token}'
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NgramIndex:
+    """Índice invertido de trigramas en memoria para la búsqueda de vehículos.
+
+    Se carga de forma perezosa con una sola consulta (solo vehículos activos)
+    y luego se actualiza con las señales de guardado/eliminación de
+    ``Vehicle``. Cada proceso tiene su propio índice: ``reset`` y las señales
+    solo afectan al proceso actual, y los cambios hechos por otros procesos
+    (o por UPDATE masivos) se ven al recargarlo cada ``ttl`` segundos.
+    """
+
+    def __init__(self, ttl=NGRAM_INDEX_TTL):
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._postings = defaultdict(set)
+        self._documents = {}
+        self._loaded_at = None
+
+    @staticmethod
+    def _document_grams(values):
+        grams = set()
+        for value in values:
+            for token in (value or '').split():
+                token = normalize(token)
+                if token:
+                    grams |= _trigrams(token)
+        return grams
+
+    def reset(self):
+        with self._lock:
+            self._postings = defaultdict(set)
+            self._documents = {}
+            self._loaded_at = None
+
+    def _ensure_loaded(self, using):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return
+
+        with self._lock:
+            self.reset()
+            rows = Vehicle.objects.using(using).values_list('pk', *SEARCH_FIELDS)
+            for pk, *values in rows.iterator(chunk_size=2000):
+                self._add(pk, values)
+            self._loaded_at = time.monotonic()
+
+    def _add(self, pk, values):
+        grams = self._document_grams(values)
+        self._documents[pk] = (grams, normalize(values[0]))
+        for gram in grams:
+            self._postings[gram].add(pk)
+
+    def _remove(self, pk):
+        grams, _ = self._documents.pop(pk, (set(), ''))
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(pk)
+                if not postings:
+                    del self._postings[gram]
+
+    def update(self, vehicle):
+        """Reindexar un vehículo (solo si el índice ya está cargado); los inactivos se quitan."""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._remove(vehicle.pk)
+            if vehicle.is_active:
+                self._add(vehicle.pk, [getattr(vehicle, name) for name in SEARCH_FIELDS])
+
+    def remove(self, pk):
+        with self._lock:
+            if self._loaded_at is not None:
+                self._remove(pk)
+
+    def search(self, query, using='default'):
+        """Lista de ``(pk, puntaje)`` ordenada de mayor a menor puntaje."""
+        self._ensure_loaded(using)
+
+        query_grams = set()
+        for token in query.split():
+            token = normalize(token)
+            if token:
+                query_grams |= _trigrams(token, pad_end=False)
+        if not query_grams:
+            return []
+
+        plate = normalize(query)
+
+        with self._lock:
+            counts = defaultdict(int)
+            for gram in query_grams:
+                for pk in self._postings.get(gram, ()):
+                    counts[pk] += 1
+
+            scored = []
+            for pk, count in counts.items():
+                score = count / len(query_grams)
+                if plate and self._documents[pk][1].startswith(plate):
+                    score += PLATE_PREFIX_BOOST
+                if score >= MIN_NGRAM_SCORE:
+                    scored.append((pk, score))
+
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored
+
+
+ngram_index = NgramIndex()
+
+
+def search_vehicles(queryset, query, limit=20, columns=None):
+    """Buscar vehículos dentro de ``queryset`` ordenados por relevancia.
+
+    Con ``columns`` se devuelven diccionarios de ``values(*columns)`` en lugar
+    de instancias del modelo.
+    """
+    connection = connections[queryset.db]
+    prefix = plate_prefix(query)
+
+    if has_trigram_support(connection):
+        from django.contrib.postgres.lookups import TrigramWordSimilar
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        term = query.upper()
+        document = RawSQL(_search_document_sql(connection), (), output_field=CharField())
+        condition = Q(TrigramWordSimilar(document, Value(term)))
+        rank = TrigramWordSimilarity(term, document)
+
+        if prefix:
+            condition |= Q(license_plate__startswith=prefix)
+            rank = rank + Case(
+                When(license_plate__startswith=prefix, then=Value(PLATE_PREFIX_BOOST)),
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+
+        results = queryset.filter(condition).annotate(search_rank=rank).order_by('-search_rank', '-created_at')
+        if columns:
+            results = results.values(*columns)
+        return list(results[:limit])
+
+    scored = ngram_index.search(prefix or query, using=queryset.db)
+    if not scored:
+        return []
+
+    scores = dict(scored)
+    if columns:
+        columns = set(columns) | {'pk', 'created_at'}
+        key = lambda row: (scores[row['pk']], row['created_at'])  # noqa: E731
+    else:
+        key = lambda vehicle: (scores[vehicle.pk], vehicle.created_at)  # noqa: E731
+
+    # El índice cubre todas las compañías: el ranking se recorre por ventanas hasta
+    # reunir ``limit`` filas que pasen los filtros del queryset. Una ventana que
+    # empieza con el mismo puntaje que la última fila se lee (desempate por fecha).
+    vehicles = []
+    for start in range(0, len(scored), MAX_NGRAM_CANDIDATES):
+        window = scored[start:start + MAX_NGRAM_CANDIDATES]
+        if len(vehicles) >= limit and window[0][1] < key(vehicles[-1])[0]:
+            break
+        rows = queryset.filter(pk__in=[pk for pk, _ in window])
+        vehicles.extend(rows.values(*columns) if columns else rows)
+        vehicles.sort(key=key, reverse=True)
+        del vehicles[limit:]
+    return vehicles
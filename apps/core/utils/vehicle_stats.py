@@ -0,0 +1,81 @@
+"""Cálculo de estadísticas de vehículos y resúmenes por compañía."""
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, Q
+
+from apps.core.models import Company, Vehicle, VehicleStatsRollup
+
+
+def compute_vehicle_stats(queryset, today):
+    """Calcular las estadísticas de un queryset de vehículos.
+
+    Totales, estados y documentos vencidos se obtienen en una sola consulta
+    con agregación condicional; marcas y años requieren un GROUP BY cada uno.
+    """
+    queryset = queryset.order_by()
+
+    aggregates = {
+        'total_vehicles': Count('id'),
+        'expired_soat': Count('id', filter=Q(soat_expiry__lt=today)),
+        'expired_technical': Count('id', filter=Q(technical_review_expiry__lt=today)),
+        'expired_permits': Count('id', filter=Q(operation_permit_expiry__lt=today)),
+    }
+    for value, _ in Vehicle.STATUS_CHOICES:
+        aggregates[f'status_{value}'] = Count('id', filter=Q(status=value))
+
+    totals = queryset.aggregate(**aggregates)
+
+    # Estadísticas por marca
+    brand_stats = queryset.values('brand').annotate(count=Count('id')).order_by('-count')[:10]
+
+    # Estadísticas por año
+    year_stats = queryset.values('year').annotate(count=Count('id')).order_by('-year')
+
+    return {
+        'total_vehicles': totals['total_vehicles'],
+        'status_breakdown': {
+            value: totals[f'status_{value}']
+            for value, _ in Vehicle.STATUS_CHOICES if totals[f'status_{value}']
+        },
+        'top_brands': list(brand_stats),
+        'by_year': list(year_stats),
+        'expired_documents': {
+            'soat': totals['expired_soat'],
+            'technical_review': totals['expired_technical'],
+            'operation_permits': totals['expired_permits']
+        }
+    }
+
+
+def get_company_vehicle_stats(company_id, today):
+    """Estadísticas de la compañía servidas desde su resumen precalculado.
+
+    Si el resumen está vigente se responde con una sola consulta; si no, se
+    recalcula y se guarda solo si no hubo invalidaciones mientras tanto. Para
+    una compañía inexistente se devuelven estadísticas vacías sin guardar nada.
+
+    El resumen es una caché interna: se escribe con ``using`` explícito en la
+    base principal, sin pasar por el router, para que la solicitud no cuente
+    como escritura del cliente (seguir leyendo de la réplica y no fijarlo a la
+    base principal).
+    """
+    rollup = VehicleStatsRollup.objects.filter(company_id=company_id).first()
+
+    if rollup and not rollup.is_stale and rollup.computed_on == today:
+        return rollup.data
+
+    if rollup is None:
+        # Sin compañía no se guarda resumen: se responden las estadísticas vacías
+        if not Company.all_objects.filter(id=company_id).exists():
+            return compute_vehicle_stats(Vehicle.objects.none(), today)
+        rollup, _ = VehicleStatsRollup.objects.using(DEFAULT_DB_ALIAS).get_or_create(company_id=company_id)
+
+    version = rollup.version
+    data = compute_vehicle_stats(
+        Vehicle.objects.filter(company_id=company_id), today
+    )
+
+    VehicleStatsRollup.objects.using(DEFAULT_DB_ALIAS).filter(company_id=company_id, version=version).update(
+        data=data, computed_on=today, is_stale=False
+    )
+
+    return data
@@ -2,23 +2,44 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 
+from apps.core.bulk_actions import BulkSoftDeleteMixin
 from apps.core.models import (Address)
+from apps.core.pagination import KeysetPaginationMixin
 from apps.core.serializers.serializer_address import (AddressSerializer, AddressCreateSerializer, AddressListSerializer)
+from apps.core.utils.export import EXPORT_FORMATS, export_queryset
 
-# Importar Cities Light models
+# Cities Light (geo_snapshot importa sus modelos)
 try:
-    from cities_light.models import Country, Region, City, SubRegion
+    from apps.core.utils.geo_snapshot import cache_control, geo_snapshot, not_modified
 
     CITIES_LIGHT_AVAILABLE = True
 except ImportError:
     CITIES_LIGHT_AVAILABLE = False
 
 
-class AddressViewSet(viewsets.ModelViewSet):
+# Columnas de la exportación: (lookup, encabezado)
+ADDRESS_EXPORT_COLUMNS = (
+    ('id', 'id'),
+    ('content_type__model', 'content_type'),
+    ('object_id', 'object_id'),
+    ('country', 'country'),
+    ('province', 'province'),
+    ('city', 'city'),
+    ('sector', 'sector'),
+    ('postal_code', 'postal_code'),
+    ('reference', 'reference'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+)
+
+
+class AddressViewSet(BulkSoftDeleteMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     """ViewSet para gestión de direcciones."""
 
-    queryset = Address.objects.filter(is_active=True)
+    queryset = Address.objects.all()
+    bulk_filter_params = ('content_type', 'object_id', 'city')
 
     # permission_classes = [IsAuthenticated]  # Comentado para pruebas
 
@@ -32,7 +53,11 @@ class AddressViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Filtrar direcciones por parámetros."""
-        queryset = self.queryset
+        queryset = self.queryset.select_related('content_type')
+
+        # Objetos relacionados agrupados por tipo de contenido: una consulta por tipo
+        if self.action == 'list':
+            queryset = queryset.prefetch_related('content_object')
 
         # Filtrar por tipo de contenido
         content_type = self.request.query_params.get('content_type')
@@ -85,10 +110,30 @@ class AddressViewSet(viewsets.ModelViewSet):
             'address_id': address.id
         })
 
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Exportar direcciones (CSV o NDJSON) en streaming con los filtros del listado."""
+        export_format = request.query_params.get('export_format', 'csv').lower()
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f'Formato no soportado. Opciones: {", ".join(EXPORT_FORMATS)}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        filename = f'direcciones-{timezone.localdate():%Y%m%d}'
+        return export_queryset(self.get_queryset(), ADDRESS_EXPORT_COLUMNS, filename, export_format)
+
     # ===========================================
     # ENDPOINTS PARA CITIES LIGHT (SELECTS)
     # ===========================================
 
+    def geo_response(self, request, etag, get_data):
+        """Respuesta con ETag y Cache-Control; 304 si el cliente ya tiene la versión."""
+        headers = {'ETag': etag, 'Cache-Control': cache_control()}
+        if not_modified(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(get_data(), headers=headers)
+
     @action(detail=False, methods=['get'])
     def countries(self, request):
         """Obtener lista de países para selects."""
@@ -98,10 +143,8 @@ class AddressViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_503_SERVICE_UNAVAILABLE
             )
 
-        countries = Country.objects.all().order_by('name')
-        data = [{'id': c.id, 'name': c.name, 'code': c.code2} for c in countries]
-
-        return Response(data)
+        snapshot = geo_snapshot.get()
+        return self.geo_response(request, snapshot.etag('countries'), lambda: snapshot.countries)
 
     @action(detail=False, methods=['get'])
     def regions(self, request):
@@ -120,15 +163,18 @@ class AddressViewSet(viewsets.ModelViewSet):
             )
 
         try:
-            regions = Region.objects.filter(country_id=country_id).order_by('name')
-            data = [{'id': r.id, 'name': r.name} for r in regions]
-            return Response(data)
-        except Exception as e:
+            country_id = int(country_id)
+        except ValueError as e:
             return Response(
                 {'error': f'Error al obtener regiones: {str(e)}'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        snapshot = geo_snapshot.get()
+        return self.geo_response(
+            request, snapshot.etag('regions', country_id), lambda: snapshot.regions.get(country_id, [])
+        )
+
     @action(detail=False, methods=['get'])
     def cities(self, request):
         """Obtener ciudades filtradas por provincia."""
@@ -146,11 +192,14 @@ class AddressViewSet(viewsets.ModelViewSet):
             )
 
         try:
-            cities = City.objects.filter(region_id=region_id).order_by('name')
-            data = [{'id': c.id, 'name': c.name} for c in cities]
-            return Response(data)
-        except Exception as e:
+            region_id = int(region_id)
+        except ValueError as e:
             return Response(
                 {'error': f'Error al obtener ciudades: {str(e)}'},
                 status=status.HTTP_400_BAD_REQUEST
-            )
\ No newline at end of file
+            )
+
+        snapshot = geo_snapshot.get()
+        return self.geo_response(
+            request, snapshot.etag('cities', region_id), lambda: snapshot.cities.get(region_id, [])
+        )
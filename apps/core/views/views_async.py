@@ -0,0 +1,230 @@
+"""Vistas async (ASGI) para las lecturas más frecuentes.
+
+Django REST Framework no ejecuta vistas async, por lo que estas son vistas de
+Django que reutilizan los filtros, serializadores y cachés de los ViewSets y
+producen las mismas respuestas JSON. Bajo ASGI (uvicorn) la espera de la base
+de datos no bloquea un hilo por solicitud: listados, detalle, subdominio y
+selects usan el ORM async; búsqueda y estadísticas reutilizan la lógica
+síncrona existente mediante ``sync_to_async``.
+
+Solo se admite autenticación por sesión (``AuthenticationMiddleware``).
+"""
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework.exceptions import NotAuthenticated, NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from apps.core.models import Company, Vehicle
+from apps.core.serializers.serializer_company import CompanySerializer
+from apps.core.serializers.serializer_vehicle import VehicleListReadSerializer, VehicleSerializer
+from apps.core.utils.vehicle_filters import filter_vehicles
+from apps.core.utils.vehicle_search import search_vehicles
+from apps.core.utils.vehicle_stats import compute_vehicle_stats, get_company_vehicle_stats
+from apps.core.views.views_vehicle import VEHICLE_STATS_FILTERS
+
+try:
+    from apps.core.utils.geo_snapshot import cache_control, geo_snapshot, not_modified
+
+    CITIES_LIGHT_AVAILABLE = True
+except ImportError:
+    CITIES_LIGHT_AVAILABLE = False
+
+_renderer = JSONRenderer()
+
+
+def json_response(data, status=200, headers=None):
+    """Respuesta JSON con el mismo formato que ``JSONRenderer`` de DRF."""
+    return HttpResponse(
+        _renderer.render(data), content_type='application/json', status=status, headers=headers
+    )
+
+
+def method_not_allowed(request):
+    return json_response({'detail': f'Método "{request.method}" no permitido.'}, status=405,
+                         headers={'Allow': 'GET'})
+
+
+def get_company_id(request):
+    """Compañía del subdominio (``TenantMiddleware``) o el parámetro ``company``."""
+    company_id = getattr(request, 'company_id', None)
+    if company_id is not None:
+        return company_id
+    return request.GET.get('company')
+
+
+def vehicle_queryset(request):
+    queryset = Vehicle.objects.select_related('company')
+    return filter_vehicles(queryset, request.GET, get_company_id(request))
+
+
+# ===========================================
+# VEHÍCULOS
+# ===========================================
+
+async def vehicle_list(request):
+    """Listado paginado de vehículos (misma salida que ``GET /api/vehicles/``)."""
+    if request.method != 'GET':
+        return method_not_allowed(request)
+
+    page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE') or 20
+    try:
+        page = int(request.GET.get('page', 1))
+        if page < 1:
+            raise ValueError
+    except ValueError:
+        return json_response({'detail': str(PageNumberPagination.invalid_page_message)}, status=404)
+
+    queryset = vehicle_queryset(request)
+    count = await queryset.acount()
+    if page > 1 and (page - 1) * page_size >= count:
+        return json_response({'detail': str(PageNumberPagination.invalid_page_message)}, status=404)
+
+    offset = (page - 1) * page_size
+    rows = [row async for row in queryset.values(*VehicleListReadSerializer.columns)[offset:offset + page_size]]
+
+    url = request.build_absolute_uri()
+    next_link = replace_query_param(url, 'page', page + 1) if offset + page_size < count else None
+    if page == 1:
+        previous_link = None
+    elif page == 2:
+        previous_link = remove_query_param(url, 'page')
+    else:
+        previous_link = replace_query_param(url, 'page', page - 1)
+
+    return json_response({
+        'count': count,
+        'next': next_link,
+        'previous': previous_link,
+        'results': VehicleListReadSerializer(rows, many=True).data,
+    })
+
+
+async def vehicle_detail(request, pk):
+    """Detalle de un vehículo (misma salida que ``GET /api/vehicles/{id}/``)."""
+    if request.method != 'GET':
+        return method_not_allowed(request)
+
+    vehicle = await vehicle_queryset(request).filter(pk=pk).afirst()
+    if vehicle is None:
+        return json_response({'detail': str(NotFound.default_detail)}, status=404)
+
+    return json_response(VehicleSerializer(vehicle).data)
+
+
+async def vehicle_search(request):
+    """Búsqueda de vehículos (misma salida que ``GET /api/vehicles/search/``)."""
+    if request.method != 'GET':
+        return method_not_allowed(request)
+
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return json_response({'error': 'Parámetro de búsqueda "q" es requerido.'}, status=400)
+
+    # El motor de búsqueda (índice en memoria / pg_trgm) es síncrono
+    vehicles = await sync_to_async(search_vehicles)(
+        vehicle_queryset(request), query, limit=20, columns=VehicleListReadSerializer.columns
+    )
+
+    return json_response({
+        'query': query,
+        'count': len(vehicles),
+        'results': VehicleListReadSerializer(vehicles, many=True).data,
+    })
+
+
+async def vehicle_stats(request):
+    """Estadísticas de vehículos (misma salida que ``GET /api/vehicles/stats/``)."""
+    if request.method != 'GET':
+        return method_not_allowed(request)
+
+    today = timezone.now().date()
+    company_id = get_company_id(request)
+
+    has_filters = any(request.GET.get(param) for param in VEHICLE_STATS_FILTERS)
+    if company_id and not has_filters:
+        try:
+            company_uuid = uuid.UUID(str(company_id))
+        except ValueError:
+            return json_response({'error': 'Parámetro company inválido.'}, status=400)
+        return json_response(await sync_to_async(get_company_vehicle_stats)(company_uuid, today))
+
+    return json_response(await sync_to_async(compute_vehicle_stats)(vehicle_queryset(request), today))
+
+
+# ===========================================
+# COMPAÑÍAS
+# ===========================================
+
+async def company_by_subdomain(request):
+    """Compañía por subdominio (misma salida que ``GET /api/companies/by_subdomain/``)."""
+    if request.method != 'GET':
+        return method_not_allowed(request)
+
+    is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+    if not is_authenticated:
+        return json_response({'detail': str(NotAuthenticated.default_detail)}, status=403)
+
+    subdomain = request.GET.get('subdomain') or getattr(request, 'tenant_subdomain', None)
+    if not subdomain:
+        return json_response({'error': 'Parámetro subdomain es requerido.'}, status=400)
+
+    company = await Company.objects.filter(subdomain=subdomain.lower()).afirst()
+    if company is None:
+        return json_response({'error': 'Compañía no encontrada.'}, status=404)
+
+    return json_response(CompanySerializer(company).data)
+
+
+# ===========================================
+# SELECTS DE DIRECCIONES (CITIES LIGHT)
+# ===========================================
+
+async def _geo_response(request, resource, param=None, label=None):
+    if request.method != 'GET':
+        return method_not_allowed(request)
+
+    if not CITIES_LIGHT_AVAILABLE:
+        return json_response({'error': 'Cities Light no está disponible.'}, status=503)
+
+    key = None
+    if param:
+        value = request.GET.get(param)
+        if not value:
+            return json_response({'error': f'Parámetro {param} es requerido.'}, status=400)
+        try:
+            key = int(value)
+        except ValueError as e:
+            return json_response({'error': f'Error al obtener {label}: {str(e)}'}, status=400)
+
+    snapshot = await geo_snapshot.aget()
+    etag = snapshot.etag(resource, key)
+    headers = {'ETag': etag, 'Cache-Control': cache_control()}
+    if not_modified(request, etag):
+        return HttpResponse(status=304, headers=headers)
+
+    if resource == 'countries':
+        data = snapshot.countries
+    else:
+        data = getattr(snapshot, resource).get(key, [])
+    return json_response(data, headers=headers)
+
+
+async def countries(request):
+    """Países para selects (misma salida que ``GET /api/addresses/countries/``)."""
+    return await _geo_response(request, 'countries')
+
+
+async def regions(request):
+    """Provincias de un país (misma salida que ``GET /api/addresses/regions/``)."""
+    return await _geo_response(request, 'regions', 'country_id', 'regiones')
+
+
+async def cities(request):
+    """Ciudades de una provincia (misma salida que ``GET /api/addresses/cities/``)."""
+    return await _geo_response(request, 'cities', 'region_id', 'ciudades')
@@ -2,15 +2,19 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 
+from apps.core.bulk_actions import BulkSoftDeleteMixin
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.middleware.tenant import tenant_cache
 from apps.core.models import (Company, Address, Vehicle)
 from apps.core.serializers.serializer_company import (CompanySerializer, CompanyCreateSerializer)
 
-class CompanyViewSet(viewsets.ModelViewSet):
+class CompanyViewSet(BulkSoftDeleteMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet para gestión de compañías."""
 
-    queryset = Company.objects.filter(is_active=True)
+    queryset = Company.objects.all()
     permission_classes = [IsAuthenticated]
 
     def get_serializer_class(self):
@@ -27,6 +31,12 @@ class CompanyViewSet(viewsets.ModelViewSet):
         """Establecer el usuario que actualiza el registro."""
         serializer.save(updated_by=self.request.user)
 
+    def perform_bulk_set_active(self, queryset, is_active, user):
+        """Las compañías solo se seleccionan por ``ids``; la caché de tenants se vacía al confirmar."""
+        updated = super().perform_bulk_set_active(queryset, is_active, user)
+        transaction.on_commit(tenant_cache.invalidate)
+        return updated
+
     @action(detail=True, methods=['post'])
     def soft_delete(self, request, pk=None):
         """Eliminación lógica de la compañía."""
@@ -49,8 +59,8 @@ class CompanyViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def by_subdomain(self, request):
-        """Obtener compañía por subdominio."""
-        subdomain = request.query_params.get('subdomain')
+        """Obtener compañía por subdominio (por defecto, la del Host de la solicitud)."""
+        subdomain = request.query_params.get('subdomain') or getattr(request, 'tenant_subdomain', None)
 
         if not subdomain:
             return Response(
@@ -58,16 +68,16 @@ class CompanyViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        try:
-            company = Company.objects.get(subdomain=subdomain, is_active=True)
-            serializer = self.get_serializer(company)
-            return Response(serializer.data)
-        except Company.DoesNotExist:
+        company = Company.objects.filter(subdomain=subdomain.lower()).first()
+        if company is None:
             return Response(
                 {'error': 'Compañía no encontrada.'},
                 status=status.HTTP_404_NOT_FOUND
             )
 
+        serializer = self.get_serializer(company)
+        return Response(serializer.data)
+
     @action(detail=True, methods=['get'])
     def stats(self, request, pk=None):
         """Estadísticas básicas de la compañía."""
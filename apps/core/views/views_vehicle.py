@@ -1,20 +1,89 @@
-from rest_framework import viewsets, status
+from rest_framework import viewsets, status, serializers
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.db.models import Q, Count
-from datetime import timedelta
+from django.utils.dateparse import parse_date, parse_datetime
+from django.db import transaction, IntegrityError
+from django.db.models import Count
+from datetime import datetime, time, timedelta
+import uuid
 
-from apps.core.models import (Vehicle)
+from apps.core.models import (Company, Vehicle, VehicleStatsRollup, VehicleStatusEvent)
 from apps.core.serializers.serializer_vehicle import (VehicleSerializer, VehicleCreateSerializer, VehicleListSerializer,
-                                                      VehicleStatusUpdateSerializer)
+                                                      VehicleListReadSerializer, VehicleStatusUpdateSerializer,
+                                                      VehicleBulkItemSerializer, VehicleBulkStatusSerializer,
+                                                      VEHICLE_UNIQUE_FIELDS,
+                                                      find_vehicle_uniqueness_conflicts, vehicle_status_transition_error)
+from apps.core.bulk_actions import BulkSoftDeleteMixin
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.pagination import KeysetPaginationMixin
+from apps.core.utils.export import EXPORT_FORMATS, export_queryset
+from apps.core.utils.vehicle_filters import filter_vehicles
+from apps.core.utils.vehicle_search import ngram_index, search_vehicles
+from apps.core.utils.vehicle_stats import compute_vehicle_stats, get_company_vehicle_stats
+
+# Límites del alta/actualización masiva
+BULK_MAX_ITEMS = 10000
+BULK_BATCH_SIZE = 500
+
+# Columnas de la exportación: (lookup, encabezado)
+VEHICLE_EXPORT_COLUMNS = (
+    ('id', 'id'),
+    ('company_id', 'company_id'),
+    ('company__name', 'company_name'),
+    ('identifier_number', 'identifier_number'),
+    ('license_plate', 'license_plate'),
+    ('chassis_number', 'chassis_number'),
+    ('engine_number', 'engine_number'),
+    ('brand', 'brand'),
+    ('model', 'model'),
+    ('year', 'year'),
+    ('color', 'color'),
+    ('engine_displacement', 'engine_displacement'),
+    ('passenger_capacity', 'passenger_capacity'),
+    ('status', 'status'),
+    ('status_changed_at', 'status_changed_at'),
+    ('soat_expiry', 'soat_expiry'),
+    ('technical_review_expiry', 'technical_review_expiry'),
+    ('operation_permit_expiry', 'operation_permit_expiry'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+)
+
+# Filtros de get_queryset que impiden usar el resumen precalculado de stats
+VEHICLE_STATS_FILTERS = ('status', 'license_plate', 'brand', 'year', 'expiring_soon')
+
+
+def release_unique_values(vehicles, held):
+    """Liberar los valores únicos que otro vehículo del lote pasa a usar (intercambios y cadenas).
+
+    La unicidad se verifica fila por fila durante el UPDATE, así que antes de
+    escribir los valores finales se asigna un valor temporal a cada vehículo
+    cuyo valor actual toma otro vehículo del lote (un UPDATE por campo).
+    ``held`` relaciona ``(campo, compañía, valor)`` con el vehículo que lo tiene.
+    """
+    for field in VEHICLE_UNIQUE_FIELDS:
+        holders = set()
+        for vehicle in vehicles:
+            holder = held.get((field, vehicle.company_id, getattr(vehicle, field)))
+            if holder is not None and holder != vehicle.id:
+                holders.add(holder)
+        if holders:
+            Vehicle.objects.bulk_update(
+                [Vehicle(id=holder, **{field: f'~{holder.hex[:9]}'}) for holder in holders], [field]
+            )
+
 
-class VehicleViewSet(viewsets.ModelViewSet):
+class VehicleViewSet(BulkSoftDeleteMixin, ConditionalGetMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     """ViewSet para gestión de vehículos."""
 
-    queryset = Vehicle.objects.filter(is_active=True)
+    queryset = Vehicle.objects.all()
+    bulk_filter_params = ('company', 'status', 'license_plate', 'brand', 'year', 'expiring_soon')
+
+    # GET condicional: la respuesta incluye el nombre de la compañía y días hasta vencimientos
+    conditional_related_fields = ('company__updated_at',)
+    conditional_depends_on_date = True
 
     # permission_classes = [IsAuthenticated]  # Comentado para pruebas
 
@@ -23,54 +92,47 @@ class VehicleViewSet(viewsets.ModelViewSet):
         if self.action == 'create':
             return VehicleCreateSerializer
         elif self.action == 'list':
-            return VehicleListSerializer
+            return VehicleListReadSerializer
         elif self.action == 'update_status':
             return VehicleStatusUpdateSerializer
+        elif self.action == 'bulk':
+            return VehicleBulkItemSerializer
+        elif self.action == 'bulk_status':
+            return VehicleBulkStatusSerializer
         return VehicleSerializer
 
     def get_queryset(self):
         """Filtrar vehículos por parámetros."""
         queryset = self.queryset.select_related('company')
-
-        # Filtrar por compañía
-        company_id = self.request.query_params.get('company')
-        if company_id:
-            queryset = queryset.filter(company_id=company_id)
-
-        # Filtrar por estado
-        status_filter = self.request.query_params.get('status')
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-
-        # Filtrar por placa (búsqueda parcial)
-        license_plate = self.request.query_params.get('license_plate')
-        if license_plate:
-            queryset = queryset.filter(license_plate__icontains=license_plate.upper())
-
-        # Filtrar por marca
-        brand = self.request.query_params.get('brand')
-        if brand:
-            queryset = queryset.filter(brand__icontains=brand)
-
-        # Filtrar por año
-        year = self.request.query_params.get('year')
-        if year:
-            try:
-                queryset = queryset.filter(year=int(year))
-            except ValueError:
-                pass
-
-        # Filtrar vehículos con documentos próximos a vencer
-        expiring_soon = self.request.query_params.get('expiring_soon')
-        if expiring_soon:
-            alert_date = timezone.now().date() + timedelta(days=30)
-            queryset = queryset.filter(
-                Q(soat_expiry__lte=alert_date) |
-                Q(technical_review_expiry__lte=alert_date) |
-                Q(operation_permit_expiry__lte=alert_date)
-            )
-
-        return queryset.order_by('-created_at')
+        # La compañía del subdominio tiene prioridad sobre el parámetro
+        return filter_vehicles(queryset, self.request.query_params, self.get_company_id())
+
+    def get_company_id(self):
+        """Compañía resuelta por ``TenantMiddleware`` o, si no hay, el parámetro ``company``."""
+        company_id = getattr(self.request, 'company_id', None)
+        if company_id is not None:
+            return company_id
+        return self.request.query_params.get('company')
+
+    def get_serializer(self, *args, **kwargs):
+        """Con subdominio, las altas y modificaciones quedan en la compañía del tenant.
+
+        La compañía se fija antes de validar para que la unicidad por compañía
+        se compruebe en la del tenant.
+        """
+        company_id = getattr(self.request, 'company_id', None)
+        data = kwargs.get('data')
+        if company_id is not None and isinstance(data, dict) and self.action in ('create', 'update', 'partial_update'):
+            data = data.copy()
+            data['company'] = str(company_id)
+            kwargs['data'] = data
+        return super().get_serializer(*args, **kwargs)
+
+    def paginate_queryset(self, queryset):
+        # El listado se serializa desde diccionarios con solo las columnas necesarias
+        if self.action == 'list':
+            queryset = queryset.values(*VehicleListReadSerializer.columns)
+        return super().paginate_queryset(queryset)
 
     def perform_create(self, serializer):
         """Establecer el usuario que crea el registro."""
@@ -86,6 +148,13 @@ class VehicleViewSet(viewsets.ModelViewSet):
         else:
             serializer.save()
 
+    def perform_bulk_set_active(self, queryset, is_active, user):
+        """Invalidar los resúmenes de las compañías afectadas (el UPDATE no emite señales)."""
+        company_ids = set(queryset.values_list('company_id', flat=True).distinct())
+        updated = super().perform_bulk_set_active(queryset, is_active, user)
+        VehicleStatsRollup.invalidate(company_ids)
+        return updated
+
     @action(detail=True, methods=['post'])
     def soft_delete(self, request, pk=None):
         """Eliminación lógica del vehículo."""
@@ -100,7 +169,9 @@ class VehicleViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def restore(self, request, pk=None):
         """Restaurar vehículo eliminado lógicamente."""
-        vehicle = get_object_or_404(Vehicle, pk=pk)
+        # Incluye los inactivos, con el mismo alcance por compañía que el resto de acciones
+        self.queryset = Vehicle.all_objects.all()
+        vehicle = self.get_object()
         vehicle.restore()
         return Response({
             'message': 'Vehículo restaurado exitosamente.',
@@ -110,37 +181,405 @@ class VehicleViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['patch'])
     def update_status(self, request, pk=None):
-        """Actualizar estado del vehículo."""
+        """Actualizar estado del vehículo y registrar el cambio en su historial."""
         vehicle = self.get_object()
-        serializer = self.get_serializer(
-            data=request.data,
-            context={'instance': vehicle}
-        )
 
-        if serializer.is_valid():
+        with transaction.atomic():
+            # Estado vigente con la fila bloqueada: el historial registra la transición real
+            vehicle.status = Vehicle.objects.select_for_update().values_list('status', flat=True).get(pk=vehicle.pk)
+            serializer = self.get_serializer(
+                data=request.data,
+                context={'instance': vehicle}
+            )
+
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
             old_status = vehicle.status
             new_status = serializer.validated_data['status']
             reason = serializer.validated_data.get('reason', '')
+            user = request.user if hasattr(request, 'user') and request.user.is_authenticated else None
 
             vehicle.status = new_status
             vehicle.status_changed_at = timezone.now()
 
-            if hasattr(request, 'user') and request.user.is_authenticated:
-                vehicle.updated_by = request.user
+            if user is not None:
+                vehicle.updated_by = user
 
             vehicle.save()
+            VehicleStatusEvent.objects.create(
+                company_id=vehicle.company_id, vehicle=vehicle, old_status=old_status, status=new_status,
+                reason=reason, changed_at=vehicle.status_changed_at, changed_by=user
+            )
+
+        return Response({
+            'message': f'Estado cambiado de {old_status} a {new_status}.',
+            'vehicle_id': vehicle.id,
+            'license_plate': vehicle.license_plate,
+            'old_status': old_status,
+            'new_status': new_status,
+            'reason': reason,
+            'changed_at': vehicle.status_changed_at
+        })
+
+    @action(detail=False, methods=['post'])
+    def bulk_status(self, request):
+        """Cambio de estado masivo por ``ids`` o por los filtros del listado.
+
+        Las transiciones se validan con las mismas reglas que ``update_status``
+        sobre las filas bloqueadas; el UPDATE (por lotes de ids) cambia solo esas
+        filas y el historial se escribe con un INSERT por lote, todo en una
+        transacción. Con ``?atomic=true`` no se cambia nada si algún vehículo no
+        admite la transición.
+        """
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        new_status = serializer.validated_data['status']
+        reason = serializer.validated_data.get('reason', '')
+        ids = serializer.validated_data.get('ids')
+
+        vehicles = self.get_bulk_targets(ids)
+        if vehicles is None:
+            return Response(
+                {'error': 'Se requiere una lista de ids o al menos un filtro.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        atomic = request.query_params.get('atomic', '').lower() in ('1', 'true', 'yes')
+        user = request.user if hasattr(request, 'user') and request.user.is_authenticated else None
+
+        with transaction.atomic():
+            rows = list(vehicles.select_for_update(of=('self',)).values_list(
+                'id', 'company_id', 'license_plate', 'status'
+            ))
+
+            found = {row[0] for row in rows}
+            errors = [
+                {'id': vehicle_id, 'status': 'error', 'errors': {'id': ['Vehículo no encontrado.']}}
+                for vehicle_id in ids or () if vehicle_id not in found
+            ]
+            changed = []
+            unchanged = 0
+            for vehicle_id, company_id, license_plate, current_status in rows:
+                if current_status == new_status:
+                    unchanged += 1
+                    continue
+                error = vehicle_status_transition_error(current_status, new_status)
+                if error:
+                    errors.append({'id': vehicle_id, 'license_plate': license_plate, 'status': 'error',
+                                   'errors': {'status': [error]}})
+                    continue
+                changed.append((vehicle_id, company_id, current_status))
+
+            if atomic and errors:
+                return Response({
+                    'updated': 0,
+                    'unchanged': unchanged,
+                    'errors': len(errors),
+                    'results': errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            now = timezone.now()
+            values = {'status': new_status, 'status_changed_at': now, 'updated_at': now}
+            if user is not None:
+                values['updated_by'] = user
+
+            # Solo las filas bloqueadas y validadas: una selección por filtros podría
+            # incluir ahora vehículos que no se revisaron ni tendrían historial
+            changed_ids = [vehicle_id for vehicle_id, _, _ in changed]
+            updated = 0
+            for start in range(0, len(changed_ids), BULK_BATCH_SIZE):
+                updated += Vehicle.all_objects.filter(
+                    pk__in=changed_ids[start:start + BULK_BATCH_SIZE]
+                ).update(**values)
+
+            VehicleStatusEvent.objects.bulk_create([
+                VehicleStatusEvent(
+                    company_id=company_id, vehicle_id=vehicle_id, old_status=old_status, status=new_status,
+                    reason=reason, changed_at=now, changed_by=user
+                )
+                for vehicle_id, company_id, old_status in changed
+            ], batch_size=BULK_BATCH_SIZE)
+            VehicleStatsRollup.invalidate({company_id for _, company_id, _ in changed})
+
+        if errors and not updated:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif errors:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_200_OK
+
+        return Response({
+            'status': new_status,
+            'updated': updated,
+            'unchanged': unchanged,
+            'errors': len(errors),
+            'results': errors
+        }, status=response_status)
+
+    @action(detail=False, methods=['get'])
+    def status_as_of(self, request):
+        """Estado de la flota en una fecha pasada, resuelto desde el historial.
+
+        ``at`` acepta fecha y hora ISO 8601 o solo fecha (se toma el final del
+        día). Con ``status`` se listan solo los vehículos en ese estado. La
+        lista se pagina como el listado; ``counts`` resume toda la flota.
+
+        Se excluyen los vehículos eliminados lógicamente antes de ``at``: los
+        inactivos cuya última modificación (``updated_at``) es anterior a ese
+        momento. Un vehículo editado después de eliminarse se sigue incluyendo.
+        """
+        at = request.query_params.get('at', '').strip()
+        moment = parse_datetime(at) if 'T' in at or ' ' in at else None
+        if moment is None:
+            day = parse_date(at) if at else None
+            if day is None:
+                return Response(
+                    {'error': 'Parámetro "at" inválido. Use una fecha (AAAA-MM-DD) o fecha y hora ISO 8601.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            moment = datetime.combine(day, time.max)
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+
+        status_filter = request.query_params.get('status')
+        if status_filter and status_filter not in dict(Vehicle.STATUS_CHOICES):
+            return Response(
+                {'error': f'Estado no válido: {status_filter}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Vehículos registrados hasta esa fecha, incluidos los eliminados después
+        vehicles = Vehicle.all_objects.filter(created_at__lte=moment).exclude(
+            is_active=False, updated_at__lte=moment
+        )
+        company_id = self.get_company_id()
+        if company_id:
+            vehicles = vehicles.filter(company_id=company_id)
+        vehicles = vehicles.annotate(status_at=VehicleStatusEvent.status_as_of(moment))
+
+        counts = {value: 0 for value, _ in Vehicle.STATUS_CHOICES}
+        for status_at, total in vehicles.values('status_at').annotate(total=Count('id')).order_by().values_list(
+            'status_at', 'total'
+        ):
+            counts[status_at] = total
+
+        if status_filter:
+            vehicles = vehicles.filter(status_at=status_filter)
+        rows = vehicles.values('id', 'license_plate', 'status_at', 'created_at').order_by('license_plate', 'id')
+
+        page = self.paginate_queryset(rows)
+        results = [
+            {'id': row['id'], 'license_plate': row['license_plate'], 'status': row['status_at']}
+            for row in (page if page is not None else rows)
+        ]
+        if page is None:
+            return Response({'at': moment, 'counts': counts, 'count': len(results), 'results': results})
+
+        response = self.get_paginated_response(results)
+        response.data = {'at': moment, 'counts': counts, **response.data}
+        return response
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Alta y actualización masiva de vehículos con validación por lotes.
+
+        Los elementos con ``id`` se actualizan (parcialmente) y los demás se
+        crean. La unicidad por compañía se valida sobre el estado final (se
+        permiten intercambios de placas entre vehículos del lote) con una
+        consulta por campo único, y los cambios se escriben en lotes dentro de
+        una transacción. Solo se actualizan vehículos de la compañía de la
+        solicitud (subdominio o ``company``), que es también la de cada elemento:
+        otro valor de ``company`` es un error del elemento.
+        Con ``?atomic=true`` no se escribe nada si algún elemento es inválido.
+        """
+        items = request.data.get('vehicles') if isinstance(request.data, dict) else request.data
+
+        if not isinstance(items, list) or not items:
+            return Response(
+                {'error': 'Se requiere una lista de vehículos.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if len(items) > BULK_MAX_ITEMS:
+            return Response(
+                {'error': f'Se permiten como máximo {BULK_MAX_ITEMS} vehículos por solicitud.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        company_id = self.get_company_id()
+        try:
+            tenant_id = uuid.UUID(str(company_id)) if company_id else None
+        except ValueError:
+            return Response(
+                {'error': 'Compañía no válida.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
+        atomic = request.query_params.get('atomic', '').lower() in ('1', 'true', 'yes')
+        user = request.user if hasattr(request, 'user') and request.user.is_authenticated else None
+
+        results = [None] * len(items)
+
+        def add_error(index, errors):
+            results[index] = {'index': index, 'status': 'error', 'errors': errors}
+
+        # Validación de campos (sin consultas a la base de datos)
+        context = self.get_serializer_context()
+        create_serializer = VehicleBulkItemSerializer(context=context)
+        update_serializer = VehicleBulkItemSerializer(context=context, partial=True)
+        valid = []
+
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                add_error(index, {'non_field_errors': ['Se esperaba un objeto.']})
+                continue
+
+            serializer = update_serializer if item.get('id') else create_serializer
+            if tenant_id is not None:
+                item = {'company': str(tenant_id), **item}
+            try:
+                attrs = serializer.run_validation(item)
+            except serializers.ValidationError as e:
+                add_error(index, e.detail)
+                continue
+            if tenant_id is not None and attrs['company'] != tenant_id:
+                add_error(index, {'company': ['La compañía no corresponde a la de la solicitud.']})
+                continue
+            valid.append((index, attrs))
+
+        # Resolver compañías y vehículos a actualizar (una consulta cada uno)
+        company_ids = {attrs['company'] for _, attrs in valid if 'company' in attrs}
+        existing_companies = set(
+            Company.objects.filter(id__in=company_ids).values_list('id', flat=True)
+        )
+        # Solo vehículos visibles para la solicitud (compañía del subdominio o ``company``)
+        instances = self.get_queryset().in_bulk(
+            [attrs['id'] for _, attrs in valid if 'id' in attrs]
+        )
+
+        entries = []
+        pending = []
+
+        for index, attrs in valid:
+            instance = None
+            if 'id' in attrs:
+                instance = instances.get(attrs['id'])
+                if instance is None:
+                    add_error(index, {'id': ['Vehículo no encontrado.']})
+                    continue
+
+            company_id = attrs.get('company', instance.company_id if instance else None)
+            if company_id not in existing_companies and (instance is None or 'company' in attrs):
+                add_error(index, {'company': ['Compañía no encontrada.']})
+                continue
+
+            entry = {'index': index, 'id': instance.id if instance else None, 'company_id': company_id}
+            for field in VEHICLE_UNIQUE_FIELDS:
+                entry[field] = attrs.get(field, getattr(instance, field, None))
+            entries.append(entry)
+            pending.append((index, attrs, instance))
+
+        # Unicidad por compañía: contra la base de datos y dentro del lote
+        conflicts = find_vehicle_uniqueness_conflicts(entries) if entries else {}
+
+        to_create = []
+        to_update = []
+        update_fields = {'updated_at'}
+        now = timezone.now()
+        # Valores únicos actuales de los vehículos a actualizar: (campo, compañía, valor) -> id
+        held = {}
+
+        for index, attrs, instance in pending:
+            if index in conflicts:
+                add_error(index, conflicts[index])
+                continue
+
+            attrs = dict(attrs)
+            attrs.pop('id', None)
+            company_id = attrs.pop('company', None)
+
+            if instance is None:
+                vehicle = Vehicle(company_id=company_id, created_by=user, **attrs)
+                vehicle.next_document_expiry = vehicle.compute_next_document_expiry()
+                to_create.append((index, vehicle))
+                continue
+
+            for field in VEHICLE_UNIQUE_FIELDS:
+                held[(field, instance.company_id, getattr(instance, field))] = instance.id
+            for field, value in attrs.items():
+                setattr(instance, field, value)
+            update_fields.update(attrs)
+            if update_fields & set(Vehicle.EXPIRY_FIELDS):
+                instance.next_document_expiry = instance.compute_next_document_expiry()
+                update_fields.add('next_document_expiry')
+            if company_id is not None:
+                instance.company_id = company_id
+                update_fields.add('company')
+            if user is not None:
+                instance.updated_by = user
+                update_fields.add('updated_by')
+            instance.updated_at = now
+            to_update.append((index, instance))
+
+        error_count = sum(1 for result in results if result is not None)
+
+        if atomic and error_count:
             return Response({
-                'message': f'Estado cambiado de {old_status} a {new_status}.',
-                'vehicle_id': vehicle.id,
-                'license_plate': vehicle.license_plate,
-                'old_status': old_status,
-                'new_status': new_status,
-                'reason': reason,
-                'changed_at': vehicle.status_changed_at
-            })
+                'created': 0,
+                'updated': 0,
+                'errors': error_count,
+                'results': [result for result in results if result is not None]
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                if to_create:
+                    Vehicle.objects.bulk_create([vehicle for _, vehicle in to_create], batch_size=BULK_BATCH_SIZE)
+                if to_update:
+                    release_unique_values([vehicle for _, vehicle in to_update], held)
+                    Vehicle.objects.bulk_update(
+                        [vehicle for _, vehicle in to_update], sorted(update_fields), batch_size=BULK_BATCH_SIZE
+                    )
+
+                # bulk_create/bulk_update no emiten señales: invalidar los resúmenes aquí
+                VehicleStatsRollup.invalidate(
+                    {vehicle.company_id for _, vehicle in to_create + to_update}
+                    | {vehicle._loaded_company_id for _, vehicle in to_update}
+                )
+
+            for _, vehicle in to_create + to_update:
+                ngram_index.update(vehicle)
+        except IntegrityError as e:
+            return Response(
+                {'error': f'Conflicto al guardar los vehículos: {str(e)}'},
+                status=status.HTTP_409_CONFLICT
+            )
 
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        for index, vehicle in to_create:
+            results[index] = {'index': index, 'status': 'created', 'id': vehicle.id,
+                              'license_plate': vehicle.license_plate}
+        for index, vehicle in to_update:
+            results[index] = {'index': index, 'status': 'updated', 'id': vehicle.id,
+                              'license_plate': vehicle.license_plate}
+
+        if not to_create and not to_update:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif error_count:
+            response_status = status.HTTP_207_MULTI_STATUS
+        elif to_create:
+            response_status = status.HTTP_201_CREATED
+        else:
+            response_status = status.HTTP_200_OK
+
+        return Response({
+            'created': len(to_create),
+            'updated': len(to_update),
+            'errors': error_count,
+            'results': results
+        }, status=response_status)
 
     @action(detail=False, methods=['get'])
     def search(self, request):
@@ -153,24 +592,33 @@ class VehicleViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Buscar en múltiples campos
-        vehicles = self.get_queryset().filter(
-            Q(license_plate__icontains=query) |
-            Q(chassis_number__icontains=query) |
-            Q(identifier_number__icontains=query) |
-            Q(brand__icontains=query) |
-            Q(model__icontains=query) |
-            Q(engine_number__icontains=query)
-        )[:20]  # Limitar a 20 resultados
+        # Buscar en múltiples campos (índice de trigramas, limitado a 20 resultados)
+        vehicles = search_vehicles(self.get_queryset(), query, limit=20, columns=VehicleListReadSerializer.columns)
 
-        serializer = VehicleListSerializer(vehicles, many=True)
+        serializer = VehicleListReadSerializer(vehicles, many=True)
 
         return Response({
             'query': query,
-            'count': vehicles.count(),
+            'count': len(vehicles),
             'results': serializer.data
         })
 
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Exportar el registro completo de vehículos (CSV o NDJSON) en streaming.
+
+        Aplica los mismos filtros que el listado (compañía, estado, placa, etc.).
+        """
+        export_format = request.query_params.get('export_format', 'csv').lower()
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f'Formato no soportado. Opciones: {", ".join(EXPORT_FORMATS)}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        filename = f'vehiculos-{timezone.localdate():%Y%m%d}'
+        return export_queryset(self.get_queryset(), VEHICLE_EXPORT_COLUMNS, filename, export_format)
+
     @action(detail=False, methods=['get'])
     def expiring_documents(self, request):
         """Vehículos con documentos próximos a vencer."""
@@ -178,28 +626,21 @@ class VehicleViewSet(viewsets.ModelViewSet):
         alert_date = timezone.now().date() + timedelta(days=days)
         today = timezone.now().date()
 
-        vehicles = self.get_queryset().filter(
-            Q(soat_expiry__lte=alert_date) |
-            Q(technical_review_expiry__lte=alert_date) |
-            Q(operation_permit_expiry__lte=alert_date)
-        )
-
-        expired = vehicles.filter(
-            Q(soat_expiry__lt=today) |
-            Q(technical_review_expiry__lt=today) |
-            Q(operation_permit_expiry__lt=today)
-        )
+        # Un solo rango sobre el vencimiento más próximo; la separación se hace en memoria
+        vehicles = self.get_queryset().filter(next_document_expiry__lte=alert_date)
 
-        expiring = vehicles.filter(
-            Q(soat_expiry__range=[today, alert_date]) |
-            Q(technical_review_expiry__range=[today, alert_date]) |
-            Q(operation_permit_expiry__range=[today, alert_date])
-        ).exclude(pk__in=expired)
+        expired = []
+        expiring = []
+        for vehicle in vehicles:
+            if vehicle.next_document_expiry < today:
+                expired.append(vehicle)
+            else:
+                expiring.append(vehicle)
 
         return Response({
             'alert_days': days,
-            'expired_count': expired.count(),
-            'expiring_count': expiring.count(),
+            'expired_count': len(expired),
+            'expiring_count': len(expiring),
             'expired_vehicles': VehicleListSerializer(expired, many=True).data,
             'expiring_vehicles': VehicleListSerializer(expiring, many=True).data
         })
@@ -207,34 +648,21 @@ class VehicleViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Estadísticas de vehículos."""
-        queryset = self.get_queryset()
-
-        # Estadísticas por estado
-        status_stats = queryset.values('status').annotate(count=Count('id'))
-
-        # Estadísticas por marca
-        brand_stats = queryset.values('brand').annotate(count=Count('id')).order_by('-count')[:10]
-
-        # Estadísticas por año
-        year_stats = queryset.values('year').annotate(count=Count('id')).order_by('-year')
-
-        # Documentos vencidos
         today = timezone.now().date()
-        expired_soat = queryset.filter(soat_expiry__lt=today).count()
-        expired_technical = queryset.filter(technical_review_expiry__lt=today).count()
-        expired_permits = queryset.filter(operation_permit_expiry__lt=today).count()
+        company_id = self.get_company_id()
 
-        return Response({
-            'total_vehicles': queryset.count(),
-            'status_breakdown': {item['status']: item['count'] for item in status_stats},
-            'top_brands': list(brand_stats),
-            'by_year': list(year_stats),
-            'expired_documents': {
-                'soat': expired_soat,
-                'technical_review': expired_technical,
-                'operation_permits': expired_permits
-            }
-        })
+        # Sin otros filtros, la compañía se responde desde su resumen precalculado
+        has_filters = any(request.query_params.get(param) for param in VEHICLE_STATS_FILTERS)
+        if company_id and not has_filters:
+            try:
+                return Response(get_company_vehicle_stats(uuid.UUID(str(company_id)), today))
+            except ValueError:
+                return Response(
+                    {'error': 'Parámetro company inválido.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        return Response(compute_vehicle_stats(self.get_queryset(), today))
 
     @action(detail=True, methods=['get'])
     def full_details(self, request, pk=None):
@@ -0,0 +1,82 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.finance.models import DailyFeeRun
+from apps.finance.utils.daily_fees import day_range, generate_daily_fees, pending_days
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera los cargos diarios de todos los vehículos activos (idempotente, con backfill de días '
+        'faltantes; los días pasados se cobran según el estado de cada vehículo ese día)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            type=date.fromisoformat,
+            help='Generar solo este día (AAAA-MM-DD)',
+        )
+        parser.add_argument(
+            '--from',
+            dest='start',
+            type=date.fromisoformat,
+            help='Primer día a generar (AAAA-MM-DD)',
+        )
+        parser.add_argument(
+            '--to',
+            dest='end',
+            type=date.fromisoformat,
+            help='Último día a generar (AAAA-MM-DD, por defecto: hoy)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Volver a procesar días ya completados (solo crea los cargos faltantes)',
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+
+        if options['date']:
+            days = [options['date']]
+        elif options['start']:
+            end = options['end'] or today
+            if end < options['start']:
+                raise CommandError('--to debe ser posterior o igual a --from')
+            days = list(day_range(options['start'], end))
+        else:
+            # Días sin generar desde el primer día generado hasta hoy (incluye huecos)
+            days = pending_days(today)
+
+        if not options['force']:
+            completed = set(
+                DailyFeeRun.objects.filter(charge_date__in=days).values_list('charge_date', flat=True)
+            )
+            days = [day for day in days if day not in completed]
+
+        if not days:
+            self.stdout.write(self.style.SUCCESS('✅ No hay días pendientes de generar.'))
+            return
+
+        self.stdout.write(f'📋 Generando cargos diarios de {len(days)} día(s): {days[0]} a {days[-1]}')
+
+        total = 0
+        started = time.perf_counter()
+        # Un día a la vez: cada día actualiza los saldos de los mismos vehículos
+        for day in days:
+            day_started = time.perf_counter()
+            created = generate_daily_fees(day)
+            total += created
+            self.report_day(day, created, time.perf_counter() - day_started)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(f'Proceso completado. {total} cargos creados en {elapsed:.2f} s.')
+        )
+
+    def report_day(self, day, created, elapsed):
+        self.stdout.write(f'   {day}: {created} cargos ({elapsed * 1000:.0f} ms)')
@@ -0,0 +1,37 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.core.models import Company
+from apps.finance.utils.balances import take_balance_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Guarda el saldo de cada vehículo al cierre de una fecha (snapshots para consultas históricas)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            type=date.fromisoformat,
+            help='Fecha de cierre del snapshot (AAAA-MM-DD, por defecto: ayer)',
+        )
+        parser.add_argument(
+            '--company',
+            type=str,
+            help='UUID de la compañía (por defecto: todas)',
+        )
+
+    def handle(self, *args, **options):
+        snapshot_date = options['date'] or timezone.localdate() - timedelta(days=1)
+
+        company_id = options.get('company')
+        if company_id and not Company.all_objects.filter(id=company_id).exists():
+            self.stdout.write(self.style.ERROR(f'❌ Compañía no encontrada: {company_id}'))
+            return
+
+        saved = take_balance_snapshots(snapshot_date, company_id=company_id)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Proceso completado. {saved} snapshots de saldo al {snapshot_date}.')
+        )
@@ -1,3 +1,237 @@
-from django.db import models
+from decimal import Decimal
 
-# Create your models here.
+from django.db import models, router, transaction
+from django.utils import timezone
+
+from apps.core.models import TenantBaseModel
+
+
+class LedgerEntry(TenantBaseModel):
+    """Movimiento abstracto que modifica el saldo de un vehículo.
+
+    Al guardar o eliminar un movimiento, el saldo (``VehicleBalance``) y los
+    snapshots posteriores a su fecha se ajustan en la misma transacción.
+    ``balance_sign`` es 1 para cargos (aumentan la deuda) y -1 para pagos.
+    """
+    balance_sign = 1
+    date_field = None
+
+    # Sin índices propios: los índices compuestos de cada modelo los cubren y
+    # cada índice adicional encarece la inserción masiva de movimientos
+    company = models.ForeignKey('core.Company', on_delete=models.CASCADE, db_index=False, help_text="Compañía a la que pertenece este registro")
+    vehicle = models.ForeignKey('core.Vehicle', on_delete=models.CASCADE, db_index=False, related_name='%(class)ss', help_text="Vehículo al que se aplica el movimiento")
+    amount = models.DecimalField(max_digits=7, decimal_places=2, help_text="Monto del movimiento")
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def counted(cls):
+        """Filtro de los movimientos que cuentan para el saldo."""
+        return models.Q(is_active=True)
+
+    def balance_entry(self):
+        """``(vehicle_id, company_id, fecha, monto con signo)`` que aporta al saldo."""
+        counts = self.is_active and getattr(self, 'status', None) != 'waived'
+        amount = self.balance_sign * Decimal(self.amount) if counts else Decimal('0')
+        return self.vehicle_id, self.company_id, getattr(self, self.date_field), amount
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        deferred = instance.get_deferred_fields()
+        if not deferred & {'vehicle_id', 'company_id', cls.date_field, 'amount', 'is_active', 'status'}:
+            instance._loaded_entry = instance.balance_entry()
+        return instance
+
+    def _stored_entry(self, using):
+        if self._state.adding:
+            return None
+        if hasattr(self, '_loaded_entry'):
+            return self._loaded_entry
+        stored = type(self)._base_manager.using(using).filter(pk=self.pk).first()
+        return stored.balance_entry() if stored else None
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            old = self._stored_entry(using)
+            super().save(*args, **kwargs)
+            new = self.balance_entry()
+            if old != new:
+                if old is not None:
+                    VehicleBalance.apply(*old[:3], -old[3], using=using)
+                VehicleBalance.apply(*new, using=using)
+        self._loaded_entry = new
+
+    def delete(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            old = self._stored_entry(using)
+            result = super().delete(*args, **kwargs)
+            if old is not None:
+                VehicleBalance.apply(*old[:3], -old[3], using=using)
+        return result
+
+
+class DailyFee(LedgerEntry):
+    """Cargo diario de la tarifa de la compañía a un vehículo."""
+    STATUS_CHOICES = [('pending', 'Pendiente'), ('paid', 'Pagado'), ('waived', 'Condonado')]
+    date_field = 'charge_date'
+
+    charge_date = models.DateField(help_text="Día cobrado")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', help_text="Estado del cargo")
+    paid_at = models.DateTimeField(null=True, blank=True, help_text="Fecha y hora del pago")
+
+    @classmethod
+    def counted(cls):
+        return super().counted() & ~models.Q(status='waived')
+
+    def __str__(self):
+        return f"{self.vehicle_id} - {self.charge_date} - {self.amount}"
+
+    class Meta:
+        verbose_name = "Cargo diario"
+        verbose_name_plural = "Cargos diarios"
+        ordering = ['-charge_date']
+        # Un solo cargo por vehículo y día: la generación es idempotente
+        unique_together = [['vehicle', 'charge_date']]
+        indexes = [
+            models.Index(fields=['company', 'charge_date'], name='finance_fee_co_date_idx'),
+        ]
+
+
+class Fine(LedgerEntry):
+    """Multa aplicada a un vehículo."""
+    STATUS_CHOICES = [('pending', 'Pendiente'), ('paid', 'Pagada'), ('waived', 'Condonada')]
+    date_field = 'fine_date'
+
+    fine_date = models.DateField(help_text="Fecha de la multa")
+    reason = models.CharField(max_length=200, help_text="Motivo de la multa")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', help_text="Estado de la multa")
+
+    @classmethod
+    def counted(cls):
+        return super().counted() & ~models.Q(status='waived')
+
+    def __str__(self):
+        return f"{self.vehicle_id} - {self.fine_date} - {self.reason}"
+
+    class Meta:
+        verbose_name = "Multa"
+        verbose_name_plural = "Multas"
+        ordering = ['-fine_date']
+        indexes = [
+            models.Index(fields=['vehicle', 'fine_date'], name='finance_fine_vehicle_date_idx'),
+            models.Index(fields=['company', 'fine_date'], name='finance_fine_co_date_idx'),
+        ]
+
+
+class Payment(LedgerEntry):
+    """Pago realizado por el socio de un vehículo."""
+    METHOD_CHOICES = [('cash', 'Efectivo'), ('transfer', 'Transferencia'), ('deposit', 'Depósito')]
+    balance_sign = -1
+    date_field = 'payment_date'
+
+    payment_date = models.DateField(help_text="Fecha del pago")
+    method = models.CharField(max_length=20, choices=METHOD_CHOICES, default='cash', help_text="Forma de pago")
+    reference = models.CharField(max_length=100, blank=True, help_text="Número de comprobante o referencia")
+
+    def __str__(self):
+        return f"{self.vehicle_id} - {self.payment_date} - {self.amount}"
+
+    class Meta:
+        verbose_name = "Pago"
+        verbose_name_plural = "Pagos"
+        ordering = ['-payment_date']
+        indexes = [
+            models.Index(fields=['vehicle', 'payment_date'], name='finance_pay_vehicle_date_idx'),
+            models.Index(fields=['company', 'payment_date'], name='finance_pay_co_date_idx'),
+        ]
+
+
+# Movimientos que componen el saldo de un vehículo
+LEDGER_MODELS = (DailyFee, Fine, Payment)
+
+
+class VehicleBalance(models.Model):
+    """Saldo vigente de un vehículo (cargos + multas - pagos); positivo = deuda.
+
+    Se actualiza en la misma transacción que cada movimiento, por lo que
+    consultar el saldo es leer una fila y no sumar todo el historial.
+    """
+    vehicle = models.OneToOneField('core.Vehicle', on_delete=models.CASCADE, primary_key=True, related_name='balance', help_text="Vehículo del saldo")
+    company = models.ForeignKey('core.Company', on_delete=models.CASCADE, related_name='vehicle_balances', help_text="Compañía del vehículo")
+    balance = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0'), help_text="Saldo pendiente")
+    updated_at = models.DateTimeField(auto_now=True, help_text="Fecha y hora de la última actualización")
+
+    def __str__(self):
+        return f"Saldo {self.vehicle_id}: {self.balance}"
+
+    @classmethod
+    def apply(cls, vehicle_id, company_id, entry_date, amount, using=None):
+        """Sumar ``amount`` al saldo y a los snapshots desde ``entry_date``."""
+        if not amount:
+            return
+        manager = cls.objects.db_manager(using)
+        updated = manager.filter(vehicle_id=vehicle_id).update(
+            balance=models.F('balance') + amount, updated_at=timezone.now()
+        )
+        if not updated:
+            manager.get_or_create(vehicle_id=vehicle_id, defaults={'company_id': company_id})
+            manager.filter(vehicle_id=vehicle_id).update(
+                balance=models.F('balance') + amount, updated_at=timezone.now()
+            )
+        # Movimientos con fecha pasada corrigen los snapshots ya tomados
+        BalanceSnapshot.objects.db_manager(using).filter(
+            vehicle_id=vehicle_id, snapshot_date__gte=entry_date
+        ).update(balance=models.F('balance') + amount)
+
+    class Meta:
+        verbose_name = "Saldo de vehículo"
+        verbose_name_plural = "Saldos de vehículos"
+
+
+class BalanceSnapshot(models.Model):
+    """Saldo de un vehículo al cierre de ``snapshot_date``.
+
+    El saldo en cualquier fecha pasada se reconstruye con el snapshot anterior
+    más cercano y los movimientos posteriores a él (ver ``balance_at``).
+    """
+    vehicle = models.ForeignKey('core.Vehicle', on_delete=models.CASCADE, db_index=False, related_name='balance_snapshots', help_text="Vehículo del snapshot")
+    company = models.ForeignKey('core.Company', on_delete=models.CASCADE, db_index=False, help_text="Compañía del vehículo")
+    snapshot_date = models.DateField(help_text="Fecha de cierre del snapshot")
+    balance = models.DecimalField(max_digits=12, decimal_places=2, help_text="Saldo al cierre de la fecha")
+    created_at = models.DateTimeField(auto_now_add=True, help_text="Fecha y hora de creación")
+
+    def __str__(self):
+        return f"Saldo {self.vehicle_id} al {self.snapshot_date}: {self.balance}"
+
+    class Meta:
+        verbose_name = "Snapshot de saldo"
+        verbose_name_plural = "Snapshots de saldos"
+        ordering = ['-snapshot_date']
+        unique_together = [['vehicle', 'snapshot_date']]
+        indexes = [
+            models.Index(fields=['company', 'snapshot_date'], name='finance_snap_co_date_idx'),
+        ]
+
+
+class DailyFeeRun(models.Model):
+    """Registro de los días cuyos cargos diarios ya fueron generados.
+
+    Se guarda en la misma transacción que los cargos del día: si la generación
+    se interrumpe, el día queda sin registro y se vuelve a procesar en la
+    siguiente ejecución.
+    """
+    charge_date = models.DateField(primary_key=True, help_text="Día generado")
+    charges_created = models.PositiveIntegerField(default=0, help_text="Cargos creados para el día (suma de todas las generaciones)")
+    completed_at = models.DateTimeField(auto_now=True, help_text="Fecha y hora de la última generación")
+
+    def __str__(self):
+        return f"Cargos diarios - {self.charge_date}"
+
+    class Meta:
+        verbose_name = "Generación de cargos diarios"
+        verbose_name_plural = "Generaciones de cargos diarios"
+        ordering = ['-charge_date']
@@ -1,3 +1,171 @@
+from datetime import timedelta
+from decimal import Decimal
+
 from django.test import TestCase
+from django.utils import timezone
+
+from apps.core.models import Company, Vehicle, VehicleStatusEvent
+from apps.finance.models import DailyFee, DailyFeeRun, Fine, Payment, VehicleBalance
+from apps.finance.utils.balances import balance_at, get_balance, refresh_vehicle_balances, take_balance_snapshots
+from apps.finance.utils.daily_fees import generate_daily_fees, pending_days
+
+
+class FinanceTestMixin:
+    @classmethod
+    def create_company(cls):
+        return Company.objects.create(
+            name='Compañía', subdomain='compania', legal_name='Compañía S.A.', tax_id='0000000000001',
+            daily_fee=Decimal('1.50')
+        )
+
+    @classmethod
+    def create_vehicle(cls, i, **kwargs):
+        return Vehicle.objects.create(
+            company=cls.company, identifier_number=f'ID-{i}', license_plate=f'ABC-{i:04d}',
+            chassis_number=f'CH-{i}', brand='Honda', model='Wave', year=2020, color='Rojo',
+            engine_displacement=125, **kwargs
+        )
+
+
+class DailyFeeGenerationTests(FinanceTestMixin, TestCase):
+    """La generación de cargos diarios es idempotente y respeta los vehículos cobrables."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = timezone.localdate()
+        cls.company = cls.create_company()
+        cls.vehicles = [cls.create_vehicle(i) for i in range(3)]
+        # No cobrables: suspendido e inactivo
+        cls.create_vehicle(3, status='suspended')
+        cls.create_vehicle(4, is_active=False)
+
+    def test_generation_is_idempotent(self):
+        self.assertEqual(generate_daily_fees(self.today), 3)
+        self.assertEqual(generate_daily_fees(self.today), 0)
+
+        fees = DailyFee.objects.filter(charge_date=self.today)
+        self.assertEqual(set(fees.values_list('vehicle_id', flat=True)), {v.id for v in self.vehicles})
+        self.assertEqual(set(fees.values_list('amount', flat=True)), {Decimal('1.50')})
+        self.assertEqual(DailyFeeRun.objects.get(charge_date=self.today).charges_created, 3)
+
+        # Reproceso tras registrar otro vehículo: se suman los cargos nuevos
+        self.create_vehicle(5)
+        self.assertEqual(generate_daily_fees(self.today), 1)
+        self.assertEqual(DailyFeeRun.objects.get(charge_date=self.today).charges_created, 4)
+        self.assertEqual(get_balance(self.vehicles[0].id), Decimal('1.50'))
+
+    def test_vehicles_are_not_charged_before_registration(self):
+        self.assertEqual(generate_daily_fees(self.today - timedelta(days=1)), 0)
+
+    def test_past_days_use_the_status_on_that_day(self):
+        Vehicle.all_objects.update(created_at=timezone.now() - timedelta(days=5))
+        now = timezone.now()
+        # Suspendido hace 2 días; suspendido hace 4 días y reactivado hace 2
+        for vehicle, changes in ((self.vehicles[0], [('active', 'suspended', 2)]),
+                                 (self.vehicles[1], [('active', 'suspended', 4), ('suspended', 'active', 2)])):
+            for old_status, status, days in changes:
+                VehicleStatusEvent.objects.create(
+                    company=self.company, vehicle=vehicle, old_status=old_status, status=status,
+                    changed_at=now - timedelta(days=days)
+                )
+        Vehicle.objects.filter(id=self.vehicles[0].id).update(status='suspended')
+        deleted = Vehicle.all_objects.get(identifier_number='ID-4')
+
+        for offset, charged in ((3, {self.vehicles[0].id, self.vehicles[2].id, deleted.id}),
+                                (1, {self.vehicles[1].id, self.vehicles[2].id, deleted.id})):
+            day = self.today - timedelta(days=offset)
+            self.assertEqual(generate_daily_fees(day), 3)
+            self.assertEqual(set(DailyFee.objects.filter(charge_date=day).values_list('vehicle_id', flat=True)), charged)
+
+    def test_pending_days_backfills_from_last_run(self):
+        self.assertEqual(pending_days(self.today), [self.today])
+
+        DailyFeeRun.objects.create(charge_date=self.today - timedelta(days=3))
+        self.assertEqual(
+            pending_days(self.today), [self.today - timedelta(days=2), self.today - timedelta(days=1), self.today]
+        )
+
+    def test_pending_days_include_gaps_before_last_run(self):
+        for offset in (6, 3, 1):
+            DailyFeeRun.objects.create(charge_date=self.today - timedelta(days=offset))
+        self.assertEqual(
+            pending_days(self.today),
+            [self.today - timedelta(days=offset) for offset in (5, 4, 2, 0)]
+        )
+
+
+class VehicleBalanceTests(FinanceTestMixin, TestCase):
+    """El saldo se mantiene con cada movimiento y se reconstruye en fechas pasadas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = timezone.localdate()
+        cls.company = cls.create_company()
+        cls.vehicle = cls.create_vehicle(0)
+
+    def day(self, offset):
+        return self.today - timedelta(days=offset)
+
+    def add_fee(self, offset, amount='1.00', **kwargs):
+        return DailyFee.objects.create(
+            company=self.company, vehicle=self.vehicle, charge_date=self.day(offset), amount=Decimal(amount), **kwargs
+        )
+
+    def add_payment(self, offset, amount):
+        return Payment.objects.create(
+            company=self.company, vehicle=self.vehicle, payment_date=self.day(offset), amount=Decimal(amount)
+        )
+
+    def ledger_balance(self, on_date):
+        """Saldo sumando todo el historial (referencia de las pruebas)."""
+        total = Decimal('0')
+        for fee in DailyFee.objects.filter(DailyFee.counted(), charge_date__lte=on_date):
+            total += fee.amount
+        for fine in Fine.objects.filter(Fine.counted(), fine_date__lte=on_date):
+            total += fine.amount
+        for payment in Payment.objects.filter(Payment.counted(), payment_date__lte=on_date):
+            total -= payment.amount
+        return total
+
+    def test_running_balance_follows_entries(self):
+        fee = self.add_fee(2)
+        Fine.objects.create(
+            company=self.company, vehicle=self.vehicle, fine_date=self.day(1), amount=Decimal('5.00'), reason='Exceso'
+        )
+        payment = self.add_payment(0, '3.00')
+        self.assertEqual(get_balance(self.vehicle.id), Decimal('3.00'))
+
+        fee.status = 'waived'
+        fee.save(update_fields=['status', 'updated_at'])
+        self.assertEqual(get_balance(self.vehicle.id), Decimal('2.00'))
+
+        payment.soft_delete()
+        self.assertEqual(get_balance(self.vehicle.id), Decimal('5.00'))
+
+        Payment.all_objects.get(pk=payment.pk).restore()
+        Fine.objects.get().delete()
+        self.assertEqual(get_balance(self.vehicle.id), Decimal('-3.00'))
+
+    def test_balance_at_uses_snapshot_and_backdated_entries(self):
+        for offset in range(10, 0, -1):
+            self.add_fee(offset)
+        self.add_payment(8, '4.00')
+        take_balance_snapshots(self.day(5))
+
+        # Pago con fecha anterior al snapshot: el snapshot se corrige
+        self.add_payment(7, '2.00')
+        self.add_fee(0, '1.00')
+
+        for offset in range(12, -1, -1):
+            self.assertEqual(balance_at(self.vehicle.id, self.day(offset)), self.ledger_balance(self.day(offset)))
+
+        with self.assertNumQueries(4):
+            balance_at(self.vehicle.id, self.day(2))
+
+    def test_refresh_rebuilds_balance_from_ledger(self):
+        self.add_fee(1)
+        self.add_payment(0, '0.25')
+        VehicleBalance.objects.update(balance=Decimal('99'))
 
-# Create your tests here.
+        refresh_vehicle_balances(Vehicle.objects.all())
+        self.assertEqual(get_balance(self.vehicle.id), Decimal('0.75'))
@@ -0,0 +1,137 @@
+"""Saldos de vehículos: consulta histórica, snapshots y recálculo.
+
+``VehicleBalance`` guarda el saldo vigente y se actualiza con cada movimiento
+(ver ``LedgerEntry``). ``BalanceSnapshot`` guarda el saldo al cierre de una
+fecha: el saldo en una fecha pasada es el snapshot anterior más cercano más
+los movimientos entre ambas fechas, sin recorrer todo el historial.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.finance.models import LEDGER_MODELS, BalanceSnapshot, VehicleBalance
+
+ZERO = Decimal('0')
+# Filas escritas por lote al guardar snapshots o saldos recalculados
+BALANCE_BATCH_SIZE = 2000
+
+
+def _signed_total(vehicle_ref, **date_filters):
+    """Expresión con la suma con signo de los movimientos de ``vehicle_ref``.
+
+    ``date_filters`` usa los sufijos de lookup (``gt``, ``lte``) sobre el campo
+    de fecha de cada tipo de movimiento.
+    """
+    output_field = DecimalField(max_digits=12, decimal_places=2)
+    total = Value(ZERO, output_field=output_field)
+    for model in LEDGER_MODELS:
+        filters = {f'{model.date_field}__{lookup}': value for lookup, value in date_filters.items()}
+        entries = model.objects.filter(model.counted(), vehicle_id=OuterRef(vehicle_ref), **filters)
+        subtotal = Coalesce(
+            Subquery(entries.order_by().values('vehicle_id').annotate(total=Sum('amount')).values('total')),
+            Value(ZERO, output_field=output_field),
+            output_field=output_field,
+        )
+        total = total + subtotal if model.balance_sign > 0 else total - subtotal
+    return total
+
+
+def get_balance(vehicle_id):
+    """Saldo vigente de un vehículo (una sola fila)."""
+    balance = VehicleBalance.objects.filter(vehicle_id=vehicle_id).values_list('balance', flat=True).first()
+    return balance if balance is not None else ZERO
+
+
+def balance_at(vehicle_id, on_date):
+    """Saldo de un vehículo al cierre de ``on_date``.
+
+    Lee el snapshot anterior más cercano y suma solo los movimientos entre ese
+    snapshot y ``on_date``.
+    """
+    snapshot = BalanceSnapshot.objects.filter(
+        vehicle_id=vehicle_id, snapshot_date__lte=on_date
+    ).order_by('-snapshot_date').values_list('snapshot_date', 'balance').first()
+    since, balance = snapshot if snapshot else (None, ZERO)
+
+    for model in LEDGER_MODELS:
+        entries = model.objects.filter(model.counted(), vehicle_id=vehicle_id, **{f'{model.date_field}__lte': on_date})
+        if since is not None:
+            entries = entries.filter(**{f'{model.date_field}__gt': since})
+        total = entries.aggregate(total=Sum('amount'))['total']
+        if total:
+            balance += model.balance_sign * total
+    return balance
+
+
+def take_balance_snapshots(snapshot_date, company_id=None, using='default'):
+    """Guardar el saldo de cada vehículo al cierre de ``snapshot_date``.
+
+    Se parte del saldo vigente y se descuentan los movimientos posteriores a la
+    fecha. Devuelve la cantidad de snapshots guardados (nuevos o reemplazados).
+    """
+    balances = VehicleBalance.objects.using(using)
+    if company_id:
+        balances = balances.filter(company_id=company_id)
+
+    with transaction.atomic(using=using):
+        # Bloquear los saldos: los movimientos concurrentes esperan a que termine
+        # la toma y no quedan fuera del saldo ni del snapshot
+        list(balances.select_for_update().values_list('pk', flat=True))
+
+        rows = balances.annotate(
+            closing=F('balance') - _signed_total('vehicle_id', gt=snapshot_date)
+        ).values_list('vehicle_id', 'company_id', 'closing').iterator(chunk_size=BALANCE_BATCH_SIZE)
+
+        saved = 0
+        batch = []
+        for vehicle_id, company_id, closing in rows:
+            batch.append(BalanceSnapshot(
+                vehicle_id=vehicle_id, company_id=company_id, snapshot_date=snapshot_date, balance=closing
+            ))
+            if len(batch) >= BALANCE_BATCH_SIZE:
+                saved += _save_snapshots(using, batch)
+                batch = []
+        if batch:
+            saved += _save_snapshots(using, batch)
+    return saved
+
+
+def _save_snapshots(using, snapshots):
+    BalanceSnapshot.objects.using(using).bulk_create(
+        snapshots, update_conflicts=True, unique_fields=['vehicle', 'snapshot_date'], update_fields=['balance']
+    )
+    return len(snapshots)
+
+
+def refresh_vehicle_balances(vehicles, using='default'):
+    """Recalcular desde el historial el saldo vigente de ``vehicles``.
+
+    Para reparar saldos o inicializarlos con movimientos cargados antes de
+    existir ``VehicleBalance``. Devuelve la cantidad de saldos guardados.
+    """
+    rows = vehicles.using(using).annotate(
+        ledger_total=_signed_total('pk')
+    ).values_list('pk', 'company_id', 'ledger_total').iterator(chunk_size=BALANCE_BATCH_SIZE)
+
+    now = timezone.now()
+    saved = 0
+    with transaction.atomic(using=using):
+        batch = []
+        for vehicle_id, company_id, total in rows:
+            batch.append(VehicleBalance(vehicle_id=vehicle_id, company_id=company_id, balance=total, updated_at=now))
+            if len(batch) >= BALANCE_BATCH_SIZE:
+                saved += _save_balances(using, batch)
+                batch = []
+        if batch:
+            saved += _save_balances(using, batch)
+    return saved
+
+
+def _save_balances(using, balances):
+    VehicleBalance.objects.using(using).bulk_create(
+        balances, update_conflicts=True, unique_fields=['vehicle'], update_fields=['balance', 'updated_at']
+    )
+    return len(balances)
@@ -0,0 +1,193 @@
+"""Generación de los cargos diarios (``DailyFee``) de todos los vehículos.
+
+Cada día se genera con una sola sentencia en la base de datos: en PostgreSQL
+un ``INSERT ... SELECT ... ON CONFLICT DO NOTHING`` sobre los vehículos
+cobrables; en otros motores, ``bulk_create`` por lotes de los vehículos sin cargo.
+Los días pasados (backfill) se cobran según el estado de cada vehículo ese día,
+resuelto desde su historial (``VehicleStatusEvent``).
+La restricción única (vehículo, día) hace la generación idempotente y el
+registro ``DailyFeeRun`` se guarda en la misma transacción, por lo que un día
+interrumpido se vuelve a procesar completo en la siguiente ejecución.
+Los saldos (``VehicleBalance``) y los snapshots posteriores al día se
+actualizan en la misma transacción con los cargos realmente insertados.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import connections, models, transaction
+from django.utils import timezone
+
+from apps.core.models import Vehicle, VehicleStatusEvent
+from apps.finance.models import BalanceSnapshot, DailyFee, DailyFeeRun, VehicleBalance
+
+# Estados de vehículo a los que se cobra la tarifa diaria
+CHARGEABLE_STATUSES = ('active',)
+# Filas por lote de bulk_create (motores distintos de PostgreSQL)
+DAILY_FEE_BATCH_SIZE = 5000
+
+
+def day_range(start, end):
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+def pending_days(today=None):
+    """Días sin generar desde el primer día generado hasta ``today`` (backfill).
+
+    Incluye los huecos: días anteriores al último completado que fallaron o se
+    omitieron. Sin generaciones previas solo está pendiente ``today``.
+    """
+    today = today or timezone.localdate()
+    first = DailyFeeRun.objects.order_by('charge_date').values_list('charge_date', flat=True).first()
+    start = min(first, today) if first else today
+    completed = set(
+        DailyFeeRun.objects.filter(charge_date__range=(start, today)).values_list('charge_date', flat=True)
+    )
+    return [day for day in day_range(start, today) if day not in completed]
+
+
+def _day_end(charge_date):
+    """Fin del día ``charge_date`` en la zona horaria actual."""
+    return timezone.make_aware(datetime.combine(charge_date + timedelta(days=1), time.min))
+
+
+def chargeable_vehicles(charge_date, today=None):
+    """Vehículos cobrables en ``charge_date`` en compañías con tarifa.
+
+    Hoy se usan el estado y ``is_active`` vigentes. Para un día pasado se usa
+    el estado de ese día según el historial (como ``status_as_of``) y se
+    incluyen los vehículos eliminados lógicamente después de ese día
+    (``updated_at`` posterior); la compañía se evalúa con su estado actual.
+    """
+    today = today or timezone.localdate()
+    day_end = _day_end(charge_date)
+    vehicles = Vehicle.all_objects.filter(
+        created_at__lt=day_end,
+        company__is_active=True,
+        company__daily_fee__gt=0,
+    )
+    if charge_date >= today:
+        return vehicles.filter(is_active=True, status__in=CHARGEABLE_STATUSES)
+
+    return vehicles.exclude(is_active=False, updated_at__lt=day_end).annotate(
+        status_on_day=VehicleStatusEvent.status_as_of(day_end)
+    ).filter(status_on_day__in=CHARGEABLE_STATUSES)
+
+
+def _insert_select(connection, charge_date):
+    quote = connection.ops.quote_name
+    fee = DailyFee._meta
+    vehicle = Vehicle._meta
+    balance = VehicleBalance._meta
+    snapshot = BalanceSnapshot._meta
+    now = timezone.now()
+
+    def column(meta, name):
+        return quote(meta.get_field(name).column)
+
+    columns = ', '.join(column(fee, name) for name in (
+        'id', 'created_at', 'updated_at', 'is_active', 'company', 'vehicle', 'charge_date', 'amount', 'status',
+    ))
+    # La selección es la misma consulta del ORM que usan los demás motores
+    vehicles = chargeable_vehicles(charge_date).annotate(fee_amount=models.F('company__daily_fee')).order_by()
+    select_sql, select_params = vehicles.values('pk', 'company_id', 'fee_amount').query.get_compiler(
+        connection=connection
+    ).as_sql()
+    # Los CTE de modificación se ejecutan juntos: los saldos y los snapshots
+    # solo reciben los cargos que el ON CONFLICT dejó insertar
+    sql = f"""
+        WITH inserted AS (
+            INSERT INTO {quote(fee.db_table)} ({columns})
+            SELECT gen_random_uuid(), %s, %s, TRUE, v.{column(vehicle, 'company')},
+                   v.{quote(vehicle.pk.column)}, %s, v.fee_amount, %s
+            FROM ({select_sql}) v
+            ON CONFLICT ({column(fee, 'vehicle')}, {column(fee, 'charge_date')}) DO NOTHING
+            RETURNING {column(fee, 'vehicle')} AS vehicle_id, {column(fee, 'company')} AS company_id,
+                      {column(fee, 'amount')} AS amount
+        ), balances AS (
+            INSERT INTO {quote(balance.db_table)} AS b
+                ({column(balance, 'vehicle')}, {column(balance, 'company')}, {column(balance, 'balance')},
+                 {column(balance, 'updated_at')})
+            SELECT vehicle_id, company_id, amount, %s FROM inserted
+            ON CONFLICT ({column(balance, 'vehicle')}) DO UPDATE
+            SET {column(balance, 'balance')} = b.{column(balance, 'balance')} + EXCLUDED.{column(balance, 'balance')},
+                {column(balance, 'updated_at')} = EXCLUDED.{column(balance, 'updated_at')}
+        ), snapshots AS (
+            UPDATE {quote(snapshot.db_table)} s
+            SET {column(snapshot, 'balance')} = s.{column(snapshot, 'balance')} + i.amount
+            FROM inserted i
+            WHERE s.{column(snapshot, 'vehicle')} = i.vehicle_id AND s.{column(snapshot, 'snapshot_date')} >= %s
+        )
+        SELECT COUNT(*) FROM inserted
+    """
+    params = [now, now, charge_date, 'pending', *select_params, now, charge_date]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchone()[0]
+
+
+def _bulk_create(using, charge_date, batch_size):
+    charged = set(
+        DailyFee.all_objects.using(using).filter(charge_date=charge_date).values_list('vehicle_id', flat=True)
+    )
+    rows = chargeable_vehicles(charge_date).using(using).values_list(
+        'id', 'company_id', 'company__daily_fee'
+    ).iterator(chunk_size=batch_size)
+
+    created = 0
+    batch = []
+    for vehicle_id, company_id, amount in rows:
+        if vehicle_id in charged:
+            continue
+        batch.append(DailyFee(company_id=company_id, vehicle_id=vehicle_id, charge_date=charge_date, amount=amount))
+        if len(batch) >= batch_size:
+            created += _create_batch(using, charge_date, batch)
+            batch = []
+    if batch:
+        created += _create_batch(using, charge_date, batch)
+    return created
+
+
+def _create_batch(using, charge_date, fees):
+    """Insertar los cargos y sumarlos a los saldos (un UPDATE por monto)."""
+    DailyFee.objects.using(using).bulk_create(fees)
+    VehicleBalance.objects.using(using).bulk_create(
+        [VehicleBalance(vehicle_id=fee.vehicle_id, company_id=fee.company_id) for fee in fees],
+        ignore_conflicts=True,
+    )
+
+    by_amount = {}
+    for fee in fees:
+        by_amount.setdefault(fee.amount, []).append(fee.vehicle_id)
+    for amount, vehicle_ids in by_amount.items():
+        VehicleBalance.objects.using(using).filter(vehicle_id__in=vehicle_ids).update(
+            balance=models.F('balance') + amount, updated_at=timezone.now()
+        )
+        BalanceSnapshot.objects.using(using).filter(
+            vehicle_id__in=vehicle_ids, snapshot_date__gte=charge_date
+        ).update(balance=models.F('balance') + amount)
+    return len(fees)
+
+
+def generate_daily_fees(charge_date, using='default', batch_size=DAILY_FEE_BATCH_SIZE):
+    """Generar los cargos de ``charge_date`` y marcar el día como completado.
+
+    Devuelve la cantidad de cargos creados; los existentes no se modifican.
+    """
+    connection = connections[using]
+    with transaction.atomic(using=using):
+        if connection.vendor == 'postgresql':
+            created = _insert_select(connection, charge_date)
+        else:
+            created = _bulk_create(using, charge_date, batch_size)
+
+        # Un día reprocesado (--force) suma sus cargos a los de la generación original
+        _, run_created = DailyFeeRun.objects.using(using).get_or_create(
+            charge_date=charge_date, defaults={'charges_created': created}
+        )
+        if not run_created:
+            DailyFeeRun.objects.using(using).filter(charge_date=charge_date).update(
+                charges_created=models.F('charges_created') + created, completed_at=timezone.now()
+            )
+    return created
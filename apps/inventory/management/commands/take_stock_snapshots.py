@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.models import Company
+from apps.inventory.utils.stock import take_stock_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Guarda la existencia vigente de cada producto (snapshots para consultas históricas)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--company',
+            type=str,
+            help='UUID de la compañía (por defecto: todas)',
+        )
+
+    def handle(self, *args, **options):
+        company_id = options.get('company')
+        if company_id and not Company.all_objects.filter(id=company_id).exists():
+            self.stdout.write(self.style.ERROR(f'❌ Compañía no encontrada: {company_id}'))
+            return
+
+        saved = take_stock_snapshots(company_id=company_id)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Proceso completado. {saved} snapshots de existencias.')
+        )
@@ -1,3 +1,106 @@
+from decimal import Decimal
+
 from django.db import models
 
-# Create your models here.
+from apps.core.models import TenantBaseModel
+
+
+class Product(TenantBaseModel):
+    """Producto o repuesto del inventario de la compañía."""
+    UNIT_CHOICES = [('unit', 'Unidad'), ('liter', 'Litro'), ('kilogram', 'Kilogramo'), ('meter', 'Metro')]
+
+    sku = models.CharField(max_length=50, help_text="Código interno del producto")
+    name = models.CharField(max_length=200, help_text="Nombre del producto")
+    unit = models.CharField(max_length=20, choices=UNIT_CHOICES, default='unit', help_text="Unidad de medida")
+    min_stock = models.DecimalField(max_digits=12, decimal_places=3, default=Decimal('0'), help_text="Existencia mínima antes de reabastecer")
+
+    def __str__(self):
+        return f"{self.sku} - {self.name}"
+
+    class Meta(TenantBaseModel.Meta):
+        verbose_name = "Producto"
+        verbose_name_plural = "Productos"
+        ordering = ['name']
+        unique_together = [['company', 'sku']]
+
+
+class Stock(models.Model):
+    """Existencia vigente de un producto.
+
+    Solo se modifica con ``UPDATE ... SET quantity = quantity + delta`` en la
+    misma transacción que el movimiento (ver ``record_movement``): no hay
+    lectura-modificación-escritura y las salidas se validan en el propio UPDATE.
+    """
+    product = models.OneToOneField('Product', on_delete=models.CASCADE, primary_key=True, related_name='stock', help_text="Producto")
+    company = models.ForeignKey('core.Company', on_delete=models.CASCADE, related_name='stocks', help_text="Compañía del producto")
+    quantity = models.DecimalField(max_digits=12, decimal_places=3, default=Decimal('0'), help_text="Cantidad disponible")
+    updated_at = models.DateTimeField(auto_now=True, help_text="Fecha y hora del último movimiento")
+
+    def __str__(self):
+        return f"{self.product_id}: {self.quantity}"
+
+    class Meta:
+        verbose_name = "Existencia"
+        verbose_name_plural = "Existencias"
+
+
+class Movement(TenantBaseModel):
+    """Movimiento de inventario (solo inserción).
+
+    ``quantity`` lleva signo: positiva para entradas, negativa para salidas.
+    Los errores se corrigen con un movimiento de ajuste, nunca editando o
+    eliminando movimientos.
+    """
+    TYPE_CHOICES = [('in', 'Entrada'), ('out', 'Salida'), ('adjustment', 'Ajuste')]
+
+    company = models.ForeignKey('core.Company', on_delete=models.CASCADE, db_index=False, help_text="Compañía a la que pertenece este registro")
+    product = models.ForeignKey('Product', on_delete=models.PROTECT, db_index=False, related_name='movements', help_text="Producto movido")
+    movement_type = models.CharField(max_length=20, choices=TYPE_CHOICES, help_text="Tipo de movimiento")
+    quantity = models.DecimalField(max_digits=12, decimal_places=3, help_text="Cantidad con signo (+ entrada, - salida)")
+    vehicle = models.ForeignKey('core.Vehicle', on_delete=models.SET_NULL, null=True, blank=True, related_name='inventory_movements', help_text="Vehículo en el que se usó el repuesto")
+    reference = models.CharField(max_length=100, blank=True, help_text="Factura, orden de trabajo u otra referencia")
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('Los movimientos de inventario no se modifican; registre un ajuste.')
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError('Los movimientos de inventario no se eliminan; registre un ajuste.')
+
+    def __str__(self):
+        return f"{self.get_movement_type_display()} {self.quantity} - {self.product_id}"
+
+    class Meta:
+        verbose_name = "Movimiento de inventario"
+        verbose_name_plural = "Movimientos de inventario"
+        ordering = ['-created_at']
+        indexes = [
+            # Movimientos de un producto posteriores a un snapshot
+            models.Index(fields=['product', 'created_at'], name='inv_movement_product_time_idx'),
+            models.Index(fields=['company', '-created_at'], name='inv_movement_co_time_idx'),
+        ]
+
+
+class StockSnapshot(models.Model):
+    """Existencia de un producto en ``taken_at``.
+
+    La existencia en cualquier momento pasado se obtiene con el snapshot
+    anterior más cercano y los movimientos posteriores a él (ver ``stock_at``).
+    """
+    product = models.ForeignKey('Product', on_delete=models.CASCADE, db_index=False, related_name='snapshots', help_text="Producto")
+    company = models.ForeignKey('core.Company', on_delete=models.CASCADE, db_index=False, help_text="Compañía del producto")
+    taken_at = models.DateTimeField(help_text="Momento del snapshot")
+    quantity = models.DecimalField(max_digits=12, decimal_places=3, help_text="Existencia en el momento del snapshot")
+
+    def __str__(self):
+        return f"{self.product_id} al {self.taken_at}: {self.quantity}"
+
+    class Meta:
+        verbose_name = "Snapshot de existencia"
+        verbose_name_plural = "Snapshots de existencias"
+        ordering = ['-taken_at']
+        indexes = [
+            models.Index(fields=['product', '-taken_at'], name='inv_snapshot_product_time_idx'),
+            models.Index(fields=['company', '-taken_at'], name='inv_snapshot_co_time_idx'),
+        ]
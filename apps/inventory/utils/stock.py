@@ -0,0 +1,111 @@
+"""Registro de movimientos de inventario y consulta de existencias.
+
+Cada movimiento ajusta ``Stock`` con un UPDATE atómico (``F('quantity') +
+delta``) antes de insertar la fila del movimiento, ambos en la misma
+transacción. Las salidas solo se aplican si el UPDATE encuentra existencia
+suficiente (``quantity >= cantidad``), por lo que varios usuarios pueden
+registrar consumos del mismo producto a la vez sin perder actualizaciones ni
+dejar existencias negativas. El bloqueo de la fila de ``Stock`` dura solo lo
+que tarda la transacción del movimiento.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from apps.inventory.models import Movement, Stock, StockSnapshot
+
+ZERO = Decimal('0')
+# Filas escritas por lote al tomar snapshots
+SNAPSHOT_BATCH_SIZE = 2000
+
+
+class InsufficientStock(Exception):
+    """La salida supera la existencia disponible del producto."""
+
+    def __init__(self, product, requested):
+        self.product = product
+        self.requested = requested
+        super().__init__(f'Existencia insuficiente de {product} para retirar {requested}.')
+
+
+def record_movement(product, movement_type, quantity, vehicle=None, reference='', user=None, allow_negative=False):
+    """Registrar un movimiento y actualizar la existencia de ``product``.
+
+    ``quantity`` es positiva para entradas y salidas; en los ajustes lleva el
+    signo del cambio. Lanza ``InsufficientStock`` si una salida (o un ajuste
+    negativo) deja la existencia bajo cero, salvo con ``allow_negative``.
+    """
+    quantity = Decimal(quantity)
+    if movement_type == 'adjustment':
+        delta = quantity
+    elif quantity <= 0:
+        raise ValueError('La cantidad debe ser mayor que cero.')
+    else:
+        delta = quantity if movement_type == 'in' else -quantity
+
+    with transaction.atomic():
+        # El UPDATE toma el bloqueo de la fila: los movimientos concurrentes del
+        # mismo producto esperan a que esta transacción termine
+        stock = Stock.objects.filter(product_id=product.pk)
+        if delta < 0 and not allow_negative:
+            stock = stock.filter(quantity__gte=-delta)
+        updated = stock.update(quantity=F('quantity') + delta, updated_at=timezone.now())
+
+        if not updated:
+            _, created = Stock.objects.get_or_create(product_id=product.pk, defaults={'company_id': product.company_id})
+            if not created and delta < 0 and not allow_negative:
+                raise InsufficientStock(product, -delta)
+            updated = stock.update(quantity=F('quantity') + delta, updated_at=timezone.now())
+            if not updated:
+                raise InsufficientStock(product, -delta)
+
+        return Movement.objects.create(
+            company_id=product.company_id, product=product, movement_type=movement_type, quantity=delta,
+            vehicle=vehicle, reference=reference, created_by=user, updated_by=user,
+        )
+
+
+def get_stock(product_id):
+    """Existencia vigente de un producto (una sola fila)."""
+    quantity = Stock.objects.filter(product_id=product_id).values_list('quantity', flat=True).first()
+    return quantity if quantity is not None else ZERO
+
+
+def stock_at(product_id, moment):
+    """Existencia de un producto en ``moment``.
+
+    Lee el snapshot anterior más cercano y suma solo los movimientos entre ese
+    snapshot y ``moment``.
+    """
+    snapshot = StockSnapshot.objects.filter(
+        product_id=product_id, taken_at__lte=moment
+    ).order_by('-taken_at').values_list('taken_at', 'quantity').first()
+    since, quantity = snapshot if snapshot else (None, ZERO)
+
+    movements = Movement.all_objects.filter(product_id=product_id, created_at__lte=moment)
+    if since is not None:
+        movements = movements.filter(created_at__gt=since)
+    return quantity + (movements.aggregate(total=Sum('quantity'))['total'] or ZERO)
+
+
+def take_stock_snapshots(company_id=None):
+    """Guardar la existencia vigente de cada producto. Devuelve la cantidad de snapshots."""
+    stocks = Stock.objects.all()
+    if company_id:
+        stocks = stocks.filter(company_id=company_id)
+
+    with transaction.atomic():
+        # Con las filas bloqueadas, todo movimiento con created_at anterior a
+        # taken_at ya está incluido en la existencia leída
+        rows = list(stocks.select_for_update().values_list('product_id', 'company_id', 'quantity'))
+        taken_at = timezone.now()
+        StockSnapshot.objects.bulk_create(
+            [
+                StockSnapshot(product_id=product_id, company_id=company_id, taken_at=taken_at, quantity=quantity)
+                for product_id, company_id, quantity in rows
+            ],
+            batch_size=SNAPSHOT_BATCH_SIZE,
+        )
+    return len(rows)
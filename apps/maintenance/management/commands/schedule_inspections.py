@@ -0,0 +1,54 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.maintenance.utils.inspection_scheduler import (
+    DEFAULT_DAILY_CAPACITY,
+    DEFAULT_HORIZON_DAYS,
+    schedule_inspections,
+)
+
+
+class Command(BaseCommand):
+    help = 'Programa las revisiones semestrales vencidas y por vencer de todas las compañías según el cupo diario'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--capacity',
+            type=int,
+            default=DEFAULT_DAILY_CAPACITY,
+            help=f'Revisiones por día y compañía (por defecto: {DEFAULT_DAILY_CAPACITY})',
+        )
+        parser.add_argument(
+            '--horizon',
+            type=int,
+            default=DEFAULT_HORIZON_DAYS,
+            help=f'Días hacia adelante para incluir revisiones por vencer (por defecto: {DEFAULT_HORIZON_DAYS})',
+        )
+        parser.add_argument(
+            '--start',
+            type=date.fromisoformat,
+            help='Primer día disponible para revisiones (AAAA-MM-DD, por defecto: mañana)',
+        )
+
+    def handle(self, *args, **options):
+        if options['capacity'] < 1:
+            raise CommandError('--capacity debe ser mayor que 0')
+
+        started = time.perf_counter()
+        result = schedule_inspections(
+            start=options['start'], capacity=options['capacity'], horizon_days=options['horizon']
+        )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f'📋 {result["scheduled"]} revisiones programadas ({result["overdue"]} vencidas), '
+            f'último día asignado: {result["last_day"] or "-"}'
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Proceso completado. {result["created"]} creadas, {result["updated"]} reprogramadas, '
+                f'{result["cancelled"]} canceladas en {elapsed:.2f} s.'
+            )
+        )
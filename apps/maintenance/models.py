@@ -1,3 +1,43 @@
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+from apps.core.models import TenantBaseModel
+
+
+class Inspection(TenantBaseModel):
+    """Revisión semestral de un vehículo.
+
+    Las revisiones ``scheduled`` las calcula y reasigna cada noche el
+    planificador (``schedule_inspections``); cada vehículo tiene como máximo
+    una revisión abierta.
+    """
+    STATUS_CHOICES = [('scheduled', 'Programada'), ('completed', 'Realizada'), ('cancelled', 'Cancelada')]
+
+    # Sin índice propio: (vehicle, status) y la restricción de revisión abierta lo cubren
+    vehicle = models.ForeignKey('core.Vehicle', on_delete=models.CASCADE, db_index=False, related_name='inspections', help_text="Vehículo a revisar")
+    due_date = models.DateField(help_text="Fecha límite de la revisión (vencimiento de la revisión técnica)")
+    scheduled_date = models.DateField(null=True, blank=True, help_text="Día asignado para la revisión")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='scheduled', help_text="Estado de la revisión")
+    completed_at = models.DateTimeField(null=True, blank=True, help_text="Fecha y hora en que se realizó la revisión")
+    notes = models.TextField(blank=True, help_text="Observaciones de la revisión")
+
+    @property
+    def is_overdue(self):
+        return self.status == 'scheduled' and self.due_date < timezone.localdate()
+
+    def __str__(self):
+        return f"{self.vehicle_id} - {self.scheduled_date or self.due_date} - {self.get_status_display()}"
+
+    class Meta:
+        verbose_name = "Revisión"
+        verbose_name_plural = "Revisiones"
+        ordering = ['scheduled_date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['vehicle'], condition=models.Q(status='scheduled'), name='maint_inspection_open_uq'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['vehicle', 'status'], name='maint_insp_vehicle_status_idx'),
+            models.Index(fields=['company', 'scheduled_date'], name='maint_insp_co_sched_idx'),
+        ]
@@ -1,3 +1,65 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+
+from apps.core.models import Company, Vehicle
+from apps.maintenance.models import Inspection
+from apps.maintenance.utils.inspection_scheduler import INSPECTION_WEEKDAYS, schedule_inspections
+
+
+class InspectionSchedulerTests(TestCase):
+    """El planificador prioriza por vencimiento y respeta el cupo diario de cada compañía."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = timezone.localdate()
+        cls.companies = [
+            Company.objects.create(
+                name=f'Compañía {i}', subdomain=f'compania-{i}', legal_name=f'Compañía {i} S.A.', tax_id=f'{i:013d}'
+            )
+            for i in range(2)
+        ]
+        cls.expiries = {}
+        for c, company in enumerate(cls.companies):
+            for i in range(5):
+                vehicle = Vehicle.objects.create(
+                    company=company, identifier_number=f'ID-{c}-{i}', license_plate=f'AB{c}-{i:04d}',
+                    chassis_number=f'CH-{c}-{i}', brand='Honda', model='Wave', year=2020, color='Rojo',
+                    engine_displacement=125, technical_review_expiry=cls.today + timedelta(days=10 - 5 * i)
+                )
+                cls.expiries[vehicle.id] = vehicle.technical_review_expiry
+        # Fuera del horizonte: no se programa
+        Vehicle.objects.create(
+            company=cls.companies[0], identifier_number='ID-far', license_plate='FAR-0001', chassis_number='CH-far',
+            brand='Honda', model='Wave', year=2020, color='Rojo', engine_displacement=125,
+            technical_review_expiry=cls.today + timedelta(days=90)
+        )
+
+    def test_schedules_by_expiry_within_capacity(self):
+        start = self.today + timedelta(days=1)
+        result = schedule_inspections(start=start, capacity=2, horizon_days=30)
+        self.assertEqual((result['scheduled'], result['created'], result['overdue']), (10, 10, 4))
+
+        for company in self.companies:
+            inspections = list(Inspection.objects.filter(company=company).order_by('due_date'))
+            self.assertEqual(len(inspections), 5)
+            days = [inspection.scheduled_date for inspection in inspections]
+            # Los más urgentes primero y como máximo dos por día de revisión
+            self.assertEqual(days, sorted(days))
+            self.assertTrue(all(days.count(day) <= 2 for day in days))
+            self.assertTrue(all(day >= start and day.weekday() in INSPECTION_WEEKDAYS for day in days))
+            self.assertTrue(all(i.due_date == self.expiries[i.vehicle_id] for i in inspections))
+
+    def test_rerun_only_writes_changes(self):
+        schedule_inspections(capacity=2)
+        result = schedule_inspections(capacity=2)
+        self.assertEqual((result['created'], result['updated'], result['cancelled']), (0, 0, 0))
 
-# Create your tests here.
+        # Revisión técnica renovada: la revisión abierta se cancela
+        renewed = Inspection.objects.order_by('due_date').first().vehicle
+        renewed.technical_review_expiry = self.today + timedelta(days=365)
+        renewed.save()
+        result = schedule_inspections(capacity=2)
+        self.assertEqual(result['cancelled'], 1)
+        self.assertEqual(Inspection.objects.get(vehicle=renewed).status, 'cancelled')
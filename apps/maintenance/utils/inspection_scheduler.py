@@ -0,0 +1,160 @@
+"""Planificación de las revisiones semestrales de todos los vehículos.
+
+En una sola consulta se obtienen los vehículos de todas las compañías con la
+revisión técnica vencida o por vencer, y se calcula su fecha límite. Luego
+una cola de prioridad ordenada por fecha límite asigna a cada vehículo el
+primer día de revisión de su compañía con cupo disponible (primero los más
+urgentes). Las revisiones abiertas se actualizan en bloque: solo se escriben
+las que cambian de fecha, con un UPDATE por fecha.
+"""
+import heapq
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
+
+from apps.core.models import Vehicle
+from apps.maintenance.models import Inspection
+
+# Periodo entre revisiones (semestral)
+INSPECTION_INTERVAL = timedelta(days=182)
+# Días de la semana con revisiones (lunes a sábado)
+INSPECTION_WEEKDAYS = (0, 1, 2, 3, 4, 5)
+# Revisiones por día y compañía
+DEFAULT_DAILY_CAPACITY = 20
+# Días hacia adelante en los que se buscan revisiones por vencer
+DEFAULT_HORIZON_DAYS = 30
+# Estados de vehículo que deben revisarse
+INSPECTED_STATUSES = ('active', 'suspended')
+# Filas leídas y escritas por lote
+INSPECTION_BATCH_SIZE = 2000
+
+
+def due_vehicles(today, horizon_end):
+    """``(fecha límite, company_id, vehicle_id)`` de los vehículos a revisar hasta ``horizon_end``.
+
+    La fecha límite es la posterior entre el vencimiento de la revisión técnica
+    y la última revisión realizada más ``INSPECTION_INTERVAL``; un vehículo sin
+    ninguna de las dos debe revisarse ``today``.
+    """
+    last_inspection = Subquery(
+        Inspection.objects.filter(vehicle_id=OuterRef('pk'), status='completed')
+        .order_by('-completed_at').values('completed_at')[:1]
+    )
+    rows = Vehicle.objects.filter(
+        Q(technical_review_expiry__lte=horizon_end) | Q(technical_review_expiry__isnull=True),
+        status__in=INSPECTED_STATUSES,
+        company__is_active=True,
+    ).annotate(last_inspection=last_inspection).values_list(
+        'id', 'company_id', 'technical_review_expiry', 'last_inspection'
+    ).iterator(chunk_size=INSPECTION_BATCH_SIZE)
+
+    for vehicle_id, company_id, expiry, inspected_at in rows:
+        candidates = [expiry] if expiry else []
+        if inspected_at:
+            candidates.append(timezone.localtime(inspected_at).date() + INSPECTION_INTERVAL)
+        due = max(candidates) if candidates else today
+        if due <= horizon_end:
+            yield due, company_id, vehicle_id
+
+
+def inspection_days(start):
+    """Días de revisión a partir de ``start`` (inclusive)."""
+    day = start
+    while True:
+        if day.weekday() in INSPECTION_WEEKDAYS:
+            yield day
+        day += timedelta(days=1)
+
+
+def plan_inspections(due, start, capacity=DEFAULT_DAILY_CAPACITY):
+    """Asignar un día a cada vehículo de ``due`` respetando el cupo diario por compañía.
+
+    ``due`` es un iterable de ``(fecha límite, company_id, vehicle_id)``. Devuelve
+    un diccionario ``vehicle_id -> (company_id, fecha límite, día asignado)``.
+    """
+    heap = list(due)
+    heapq.heapify(heap)
+
+    # Por compañía: días de revisión, día actual y cupo usado
+    calendars = {}
+    plan = {}
+    while heap:
+        due_date, company_id, vehicle_id = heapq.heappop(heap)
+        calendar = calendars.get(company_id)
+        if calendar is None:
+            days = inspection_days(start)
+            calendar = calendars[company_id] = [days, next(days), 0]
+        if calendar[2] >= capacity:
+            calendar[1] = next(calendar[0])
+            calendar[2] = 0
+        calendar[2] += 1
+        plan[vehicle_id] = (company_id, due_date, calendar[1])
+    return plan
+
+
+def schedule_inspections(start=None, capacity=DEFAULT_DAILY_CAPACITY, horizon_days=DEFAULT_HORIZON_DAYS):
+    """Recalcular las revisiones abiertas de todas las compañías.
+
+    Devuelve un diccionario con las revisiones creadas, reprogramadas,
+    canceladas (el vehículo ya no está por vencer), el total programado y
+    cuántas están vencidas.
+    """
+    today = timezone.localdate()
+    start = start or today + timedelta(days=1)
+    horizon_end = today + timedelta(days=horizon_days)
+
+    plan = plan_inspections(due_vehicles(today, horizon_end), start, capacity)
+
+    with transaction.atomic():
+        open_inspections = Inspection.all_objects.select_for_update().filter(status='scheduled')
+        existing = {
+            vehicle_id: (pk, due_date, scheduled_date)
+            for pk, vehicle_id, due_date, scheduled_date in open_inspections.values_list(
+                'pk', 'vehicle_id', 'due_date', 'scheduled_date'
+            )
+        }
+
+        now = timezone.now()
+        to_create = []
+        # Cambios agrupados por fecha: pocos UPDATE con listas de ids en lugar
+        # de un UPDATE ... CASE por fila
+        new_due_dates = {}
+        new_scheduled_dates = {}
+        for vehicle_id, (company_id, due_date, scheduled_date) in plan.items():
+            current = existing.get(vehicle_id)
+            if current is None:
+                to_create.append(Inspection(
+                    company_id=company_id, vehicle_id=vehicle_id, due_date=due_date, scheduled_date=scheduled_date
+                ))
+                continue
+            pk, current_due_date, current_scheduled_date = current
+            if current_due_date != due_date:
+                new_due_dates.setdefault(due_date, []).append(pk)
+            if current_scheduled_date != scheduled_date:
+                new_scheduled_dates.setdefault(scheduled_date, []).append(pk)
+
+        stale = [pk for vehicle_id, (pk, _, _) in existing.items() if vehicle_id not in plan]
+
+        Inspection.objects.bulk_create(to_create, batch_size=INSPECTION_BATCH_SIZE)
+        for field, groups in (('due_date', new_due_dates), ('scheduled_date', new_scheduled_dates)):
+            for value, pks in groups.items():
+                _update_in_batches(pks, **{field: value, 'updated_at': now})
+        _update_in_batches(stale, status='cancelled', updated_at=now)
+
+        updated = set().union(*new_due_dates.values(), *new_scheduled_dates.values())
+
+    return {
+        'created': len(to_create),
+        'updated': len(updated),
+        'cancelled': len(stale),
+        'scheduled': len(plan),
+        'overdue': sum(1 for _, due_date, _ in plan.values() if due_date < today),
+        'last_day': max((day for _, _, day in plan.values()), default=None),
+    }
+
+
+def _update_in_batches(pks, **values):
+    for i in range(0, len(pks), INSPECTION_BATCH_SIZE):
+        Inspection.all_objects.filter(pk__in=pks[i:i + INSPECTION_BATCH_SIZE]).update(**values)